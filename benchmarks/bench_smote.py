@@ -0,0 +1,64 @@
+"""Compare exact imblearn SMOTE against the approximate batched path.
+
+Each measurement runs in a fresh subprocess so peak RSS is not polluted by the
+previous run. Usage:
+
+    python benchmarks/bench_smote.py --rows 1000000 --cols 20 --minority 0.2
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+CHILD = r"""
+import json, resource, sys, time
+import numpy as np
+from ml_pipeline.sampling import apply_smote, iter_smote_batches
+
+rows, cols, minority, method = int(sys.argv[1]), int(sys.argv[2]), float(sys.argv[3]), sys.argv[4]
+rng = np.random.default_rng(0)
+X = rng.random((rows, cols))
+y = (rng.random(rows) < minority).astype(int)
+base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if method == "generator":
+    n = 0
+    for X_new, _ in iter_smote_batches(X, y):
+        n += len(X_new)
+    out_rows = rows + n
+else:
+    X_res, y_res = apply_smote(X, y, method=method)
+    out_rows = len(y_res)
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == "darwin" else 1024
+print(json.dumps({
+    "method": method,
+    "rows_out": out_rows,
+    "wall_s": round(elapsed, 3),
+    "peak_rss_mb": round(peak * scale / 2**20, 1),
+    "rss_growth_mb": round((peak - base_rss) * scale / 2**20, 1),
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument("--minority", type=float, default=0.2, help="Minority class fraction")
+    parser.add_argument("--methods", default="exact,approximate,generator")
+    args = parser.parse_args()
+    results = []
+    for method in args.methods.split(","):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, str(args.rows), str(args.cols), str(args.minority), method],
+            check=True, capture_output=True, text=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(json.dumps(results[-1]))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,31 @@
 __all__ = [
     "load_data",
     "basic_report",
+    "streaming_report",
     "check_imbalance",
     "apply_smote",
     "train_models",
+    "train_streaming",
+    "train_incremental",
+    "cross_validate_models",
     "__version__"
 ]
 
 __version__ = "0.2.0"
 
-# Re-export from implementation package (currently duplicated module set)
-from ml_pipeline.eda import load_data, basic_report  # noqa: E402
-from ml_pipeline.sampling import check_imbalance, apply_smote  # noqa: E402
-from ml_pipeline.training import train_models  # noqa: E402
+
+# Re-export from implementation package (currently duplicated module set).
+# Resolved on first access so `import ml_autopipeline` and `ml-autopipeline --help`
+# stay fast; see ml_pipeline.__getattr__.
+def __getattr__(name):
+    if name in __all__:
+        import ml_pipeline
+
+        value = getattr(ml_pipeline, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
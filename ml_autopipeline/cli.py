@@ -1,24 +1,87 @@
 import argparse
-import pandas as pd
-from ml_autopipeline import load_data, basic_report, check_imbalance, apply_smote, train_models
-from ml_pipeline.logging_utils import configure_logging, get_logger
+import json
+import logging
+import os
+import sys
+from functools import partial
+# Only light modules at import time: --help, argument errors and config errors
+# must not pay for pandas / scikit-learn / imblearn (see tests/test_startup.py).
+# Pipeline modules are imported inside the functions that run the pipeline.
+from ml_pipeline.constants import (
+    BUILTIN_MODELS, DEFAULT_CHUNKSIZE, DEFAULT_MAX_BYTES, DEFAULT_MODELS, ENCODINGS, EXECUTORS, FEATURE_DTYPES,
+    HIGH_CARDINALITY_STRATEGIES, IMBALANCE_STRATEGIES, SEARCH_STRATEGIES, SPAN_FORMATS, SVM_BACKENDS,
+)
+from ml_pipeline.timing import RECORDER, span
+from ml_pipeline.logging_utils import LOGGER_NAME, configure_logging, get_logger
 from ml_pipeline.config_loader import load_config, merge_config, ConfigError
 
 logger = get_logger("cli")
 
 
-def parse_args():
-    parser = argparse.ArgumentParser(description="ML Auto-Pipeline CLI")
-    parser.add_argument('--file', type=str, help='CSV file path', required=False)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="ML Auto-Pipeline CLI",
+        epilog="Subcommands: benchmark, predict, batch, convert, serve, submit (see 'ml-autopipeline <subcommand> --help')",
+    )
+    parser.add_argument('--file', type=str, help='Input file: CSV, Parquet (.parquet/.pq), Feather/Arrow IPC (.feather/.arrow) or .npy', required=False)
     parser.add_argument('--target', type=str, help='Target column name', required=False)
     parser.add_argument('--apply_smote', action='store_true', help='Apply SMOTE sampling')
+    parser.add_argument('--imbalance-strategy', type=str, choices=list(IMBALANCE_STRATEGIES), help='Imbalance handling on the training split: class_weight / balanced_bagging reweight or bag without copying data, undersample shrinks it, smote / oversample grow it; auto picks from the class ratio and size')
+    parser.add_argument('--smote-method', type=str, choices=['exact', 'approximate'], help='exact: imblearn SMOTE (default); approximate: partitioned neighbour index with batched generation for large data')
     parser.add_argument('-v', '--verbose', action='count', default=0, help='Increase verbosity (-v, -vv for more)')
     parser.add_argument('--config', type=str, help='YAML/JSON config file specifying arguments')
     parser.add_argument('--log-file', type=str, help='Path to log file (appended)')
     parser.add_argument('--json-logs', action='store_true', help='Emit logs in JSON format')
+    parser.add_argument('--queue-logs', action='store_true', help='Format and write logs on a background thread (QueueHandler/QueueListener) with batched log-file writes')
+    parser.add_argument('--log-rate-limit', type=float, help='Max DEBUG messages per second per logger (config files may set log_rate_limits: {logger: rate})')
     parser.add_argument('--progress', action='store_true', help='Show training progress bar (requires tqdm)')
     parser.add_argument('--extended-metrics', action='store_true', help='Include confusion matrix and ROC AUC when possible')
-    return parser.parse_args()
+    parser.add_argument('--optimize-dtypes', action='store_true', help='Load in chunks with downcast numerics and category strings to cut memory')
+    parser.add_argument('--chunksize', type=int, help='Rows per chunk when loading with --optimize-dtypes or training with --streaming')
+    parser.add_argument('--streaming', action='store_true', help='Out-of-core training: partial_fit models on CSV chunks with a hash-based train/test split (memory independent of file size)')
+    parser.add_argument('--incremental', action='store_true', help='Append-only CSV: keep EDA, class counts and partial_fit models in a state file and on later runs only process the rows appended since')
+    parser.add_argument('--state-file', type=str, help='State file for --incremental (default: under --cache-dir)')
+    parser.add_argument('--full-refresh', action='store_true', help='With --incremental: ignore the stored state and process the whole file')
+    parser.add_argument('--epochs', type=int, help='Passes over the training rows with --streaming (default 1)')
+    parser.add_argument('--columns', type=str, help='Comma-separated feature columns to load (target is always included)')
+    parser.add_argument('--filter', type=str, action='append', metavar='EXPR', help='Keep rows matching e.g. "age >= 30" or \'city in ["a", "b"]\' (repeatable, AND-ed; pushed down to Parquet row groups)')
+    parser.add_argument('--sample', type=float, help='Load only this fraction of rows (whole row groups for Parquet)')
+    parser.add_argument('--parquet-cache', action='store_true', help='Convert a CSV --file to Parquet once (under --cache-dir) and load the cached copy on later runs')
+    parser.add_argument('--streaming-eda', action='store_true', help='Compute the EDA report and class distribution in one bounded-memory pass over the file')
+    parser.add_argument('--encoding', type=str, choices=list(ENCODINGS), help='dense: pd.get_dummies; sparse: CSR one-hot/hashing fitted on the train split; binned: uint8 quantile bins with native categoricals (default when every selected model takes binned input)')
+    parser.add_argument('--models', type=str, help=f'Comma-separated models to fit, from {", ".join(BUILTIN_MODELS)} or any registered model (default {",".join(DEFAULT_MODELS)})')
+    parser.add_argument('--max-onehot-cardinality', type=int, help='Sparse encoding: one-hot columns with at most this many distinct values (default 50)')
+    parser.add_argument('--high-cardinality', type=str, choices=list(HIGH_CARDINALITY_STRATEGIES), help='Sparse encoding strategy above the one-hot threshold (default hashing)')
+    parser.add_argument('--hash-features', type=int, help='Sparse encoding: hashed columns per high-cardinality feature (default 1024)')
+    parser.add_argument('--cache-dir', type=str, help='Directory for cached fitted models and metrics (default: ~/.cache/ml-autopipeline)')
+    parser.add_argument('--no-cache', action='store_true', help='Always refit; do not read or write the model cache')
+    parser.add_argument('--cache-max-bytes', type=int, help=f'Evict least recently used cache entries beyond this size (default {DEFAULT_MAX_BYTES})')
+    parser.add_argument('--svm-backend', type=str, choices=list(SVM_BACKENDS), help='SVM implementation; auto picks by training rows (default)')
+    parser.add_argument('--svm-exact-max-rows', type=int, help='Auto SVM backend: largest training set fitted with exact SVC (default 20000)')
+    parser.add_argument('--svm-sgd-min-rows', type=int, help='Auto SVM backend: rows from which SGDClassifier replaces LinearSVC (default 500000)')
+    parser.add_argument('--time-budget', type=float, help='Wall-clock seconds for all model fits; slow fits are cancelled and reported as timed out')
+    parser.add_argument('--model-time-budget', type=float, help='Seconds allowed per model fit (config files may map model names to seconds)')
+    parser.add_argument('--n-jobs', type=int, help='Core budget for model fitting; models fit concurrently when != 1 (-1 = all cores)')
+    parser.add_argument('--executor', type=str, choices=list(EXECUTORS), help='Executor used for concurrent model fitting')
+    parser.add_argument('--cv', type=int, help='Report mean/std over K stratified folds instead of a single split')
+    parser.add_argument('--search', type=str, choices=list(SEARCH_STRATEGIES), help='Hyperparameter search per model (implies --cv 5); config files may set param_grids')
+    parser.add_argument('--n-iter', type=int, help='Candidates per model for --search random (default 10)')
+    parser.add_argument('--scoring', type=str, choices=['Accuracy', 'Precision', 'Recall', 'F1 Score'], help='Metric used to rank search candidates and --progressive rungs (default F1 Score)')
+    parser.add_argument('--progressive', action='store_true', help='Fit models on growing stratified subsamples first, drop clear losers and fit only the rest on the full training split')
+    parser.add_argument('--progressive-start', type=int, help='--progressive: training rows of the first subsample (default 10000; each rung is 4x larger)')
+    parser.add_argument('--halving-factor', type=int, help='--search halving: keep 1/FACTOR candidates per rung (default 3)')
+    parser.add_argument('--feature-dtype', type=str, choices=list(FEATURE_DTYPES), help='dtype of the shared feature matrices handed to every model (float32 halves their memory)')
+    parser.add_argument('--plan', action='store_true', help='Estimate memory and fit time from a sample before loading and choose unset options (dtype downcasting, encoding, feature dtype, SVM backend, n_jobs) to fit the limits')
+    parser.add_argument('--dry-run', action='store_true', help='Print the --plan estimates and chosen settings as JSON without loading or training')
+    parser.add_argument('--memory-limit', type=float, help='GiB the run may use when planning (default: 80%% of available memory; implies --plan)')
+    parser.add_argument('--cpu-limit', type=int, help='Cores the run may use when planning (default: all; implies --plan)')
+    parser.add_argument('--save-model', type=str, help='Save the encoding, scaler and fitted models as one artifact for ml-autopipeline predict (single-split runs only: not with --cv, --search, --streaming or --incremental)')
+    parser.add_argument('--spans-out', type=str, help='Write per-stage spans (wall/CPU time, memory, rows) to this file')
+    parser.add_argument('--spans-format', type=str, choices=list(SPAN_FORMATS), help='json (default), chrome (trace events for chrome://tracing / Perfetto) or prometheus (textfile collector)')
+    parser.add_argument('--cprofile', type=str, action='append', metavar='STAGE', help='Dump cProfile stats for this stage (repeatable), e.g. train')
+    parser.add_argument('--tracemalloc', type=str, action='append', metavar='STAGE', help='Measure this stage\'s peak Python allocations with tracemalloc (repeatable)')
+    parser.add_argument('--profile-dir', type=str, help='Directory for --cprofile output (default: current directory)')
+    return parser.parse_args(argv)
 
 
 def verbosity_to_level(vcount: int) -> int:
@@ -29,8 +92,278 @@ def verbosity_to_level(vcount: int) -> int:
     return 30  # WARNING
 
 
-def main():
-    args = parse_args()
+def _usecols(columns, target):
+    """Parse --columns (comma string or list from config) and always keep the target."""
+    if not columns:
+        return None
+    if isinstance(columns, str):
+        columns = [c.strip() for c in columns.split(',') if c.strip()]
+    return list(dict.fromkeys([*columns, target]))
+
+
+def _model_names(models):
+    """--models as a list (comma string or list from config), or None for the defaults."""
+    if not models:
+        return None
+    if isinstance(models, str):
+        return [m.strip() for m in models.split(',') if m.strip()]
+    return list(models)
+
+
+def _rate_limits(merged):
+    """configure_logging rate_limits from --log-rate-limit and the config's log_rate_limits, or None."""
+    limits = dict(merged.get('log_rate_limits') or {})
+    if merged.get('log_rate_limit'):
+        limits.setdefault(LOGGER_NAME, merged['log_rate_limit'])
+    return limits or None
+
+
+def _svm_options(merged):
+    """train_models SVM keyword arguments that were set on the CLI or in the config."""
+    keys = ('svm_backend', 'svm_exact_max_rows', 'svm_sgd_min_rows')
+    return {k: merged[k] for k in keys if merged.get(k) is not None}
+
+
+def benchmark_main(argv):
+    """``ml-autopipeline benchmark run|compare``: synthetic-data benchmarks with regression gating."""
+    parser = argparse.ArgumentParser(prog="ml-autopipeline benchmark", description="Pipeline benchmarks on synthetic data with regression tracking.")
+    sub = parser.add_subparsers(dest="action", required=True)
+    run = sub.add_parser("run", help="Run all pipeline stages on a synthetic dataset")
+    run.add_argument('--rows', type=int, default=10_000)
+    run.add_argument('--cols', type=int, default=20, help='Numeric feature columns')
+    run.add_argument('--categorical', type=int, default=2, help='Categorical feature columns')
+    run.add_argument('--cardinality', type=int, default=10, help='Distinct values per categorical column')
+    run.add_argument('--imbalance', type=float, default=0.1, help='Share of each minority class')
+    run.add_argument('--classes', type=int, default=2)
+    run.add_argument('--repeat', type=int, default=1, help='Repetitions per stage; best wall time is kept')
+    run.add_argument('--stages', type=str, help='Comma-separated subset of stages')
+    run.add_argument('--no-memory', action='store_true', help='Skip the extra tracemalloc run per stage (no peak_alloc_bytes)')
+    run.add_argument('--output', type=str, help='Write results JSON here (default: stdout)')
+    run.add_argument('--baseline', type=str, help='Compare against this results JSON and exit 1 on regressions')
+    run.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative slowdown / memory growth')
+    cmp_ = sub.add_parser("compare", help="Compare two results JSON files")
+    cmp_.add_argument('current')
+    cmp_.add_argument('baseline')
+    cmp_.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative slowdown / memory growth')
+    args = parser.parse_args(argv)
+    configure_logging(level=20)
+    from ml_pipeline import benchmark
+
+    if args.action == "run":
+        current = benchmark.run_benchmark(
+            rows=args.rows, cols=args.cols, n_categorical=args.categorical, cardinality=args.cardinality,
+            imbalance=args.imbalance, n_classes=args.classes, repeat=args.repeat,
+            stages=args.stages.split(',') if args.stages else None, memory=not args.no_memory,
+        )
+        if args.output:
+            benchmark.save_results(current, args.output)
+        else:
+            print(json.dumps(current, indent=2))
+        if not args.baseline:
+            return 0
+        baseline = benchmark.load_results(args.baseline)
+    else:
+        current = benchmark.load_results(args.current)
+        baseline = benchmark.load_results(args.baseline)
+    regressions = benchmark.compare_results(
+        current, baseline, time_tolerance=args.tolerance, memory_tolerance=args.tolerance
+    )
+    for r in regressions:
+        logger.error(f"Regression in {r['stage']}: {r['metric']} {r['baseline']:.4g} -> {r['current']:.4g}")
+    if regressions:
+        return 1
+    logger.info("No regressions against baseline")
+    return 0
+
+
+def predict_main(argv):
+    """``ml-autopipeline predict``: batch-score a CSV with an artifact saved by ``--save-model``."""
+    parser = argparse.ArgumentParser(prog="ml-autopipeline predict", description="Score a CSV with a saved pipeline artifact")
+    parser.add_argument('--model', type=str, required=True, help='Artifact written by --save-model')
+    parser.add_argument('--input', type=str, required=True, help='CSV with the training feature columns')
+    parser.add_argument('--output', type=str, required=True, help='CSV to write predictions to')
+    parser.add_argument('--model-name', type=str, help='Model in the artifact to use (default: best stored F1 Score)')
+    parser.add_argument('--proba', action='store_true', help='Also write proba_<class> columns')
+    parser.add_argument('--keep-columns', type=str, help='Comma-separated input columns (e.g. an id) copied to the output')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Rows scored per batch')
+    parser.add_argument('--n-jobs', type=int, default=1, help='Score batches in this many worker processes')
+    parser.add_argument('--no-mmap', action='store_true', help='Read the artifact into memory instead of memory-mapping its arrays')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='Increase verbosity (-v, -vv for more)')
+    args = parser.parse_args(argv)
+    configure_logging(level=verbosity_to_level(args.verbose))
+    from ml_pipeline.artifact import predict_csv
+
+    predict_csv(
+        args.model,
+        args.input,
+        args.output,
+        model=args.model_name,
+        proba=args.proba,
+        chunksize=args.chunksize,
+        n_jobs=args.n_jobs,
+        keep_columns=[c.strip() for c in args.keep_columns.split(',')] if args.keep_columns else None,
+        mmap_mode=None if args.no_mmap else "r",
+    )
+    return 0
+
+
+def _batch_job(job):
+    """Run one batch job (a merged option dict) in a worker process; returns its metrics."""
+    with span("pipeline", file=str(job['file']), job=job['name']):
+        return _run_pipeline(job, verbosity_to_level(job.get('verbose', 0)))
+
+
+def batch_main(argv):
+    """``ml-autopipeline batch``: run the jobs listed in a config file on a bounded process pool."""
+    parser = argparse.ArgumentParser(
+        prog="ml-autopipeline batch",
+        description="Run many dataset/target jobs from one config file. The config has 'jobs' (a list of option "
+                    "mappings with at least file and target, or targets) and optional 'defaults' merged into each.",
+    )
+    parser.add_argument('config', help='YAML/JSON batch config')
+    parser.add_argument('--max-workers', type=int, help='Jobs run concurrently (default: CPU count)')
+    parser.add_argument('--memory-budget', type=float, help='GiB the running jobs\' memory estimates may add up to (default: 80%% of available memory)')
+    parser.add_argument('--job-timeout', type=float, help='Seconds after which a job is terminated and reported as timed out')
+    parser.add_argument('--report', type=str, help='Write the aggregated results here (default: stdout as JSON)')
+    parser.add_argument('--report-format', type=str, choices=['json', 'csv'], help='Report format (default: from the --report suffix)')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='Increase verbosity (-v, -vv for more)')
+    args = parser.parse_args(argv)
+    level = verbosity_to_level(args.verbose)
+    configure_logging(level=level)
+    try:
+        cfg = load_config(args.config)
+    except ConfigError as e:
+        raise SystemExit(f"Config error: {e}")
+    from ml_pipeline.batch import expand_jobs, run_batch, write_report
+
+    try:
+        jobs = expand_jobs(cfg)
+    except ValueError as e:
+        raise SystemExit(f"Config error: {e}")
+    missing = [j['name'] for j in jobs if not j.get('file') or not j.get('target')]
+    if missing:
+        raise SystemExit(f"Config error: jobs without file/target: {missing}")
+    # Import the pipeline once here so forked workers inherit it instead of importing per job
+    import ml_pipeline.artifact, ml_pipeline.eda, ml_pipeline.encoding, ml_pipeline.search, ml_pipeline.training  # noqa: F401,E401
+    for job in jobs:
+        job.setdefault('verbose', args.verbose)
+    report = run_batch(
+        jobs,
+        _batch_job,
+        max_workers=args.max_workers or cfg.get('max_workers'),
+        memory_budget=int(args.memory_budget * 2**30) if args.memory_budget else cfg.get('memory_budget'),
+        job_timeout=args.job_timeout or cfg.get('job_timeout'),
+    )
+    if args.report:
+        write_report(report, args.report, args.report_format)
+        logger.info(f"Wrote batch report to {args.report}")
+    else:
+        print(json.dumps(report, indent=2, default=str))
+    failed = [r['name'] for r in report if r['status'] != 'ok']
+    if failed:
+        logger.error(f"{len(failed)} of {len(report)} jobs did not complete: {failed}")
+        return 1
+    return 0
+
+
+def convert_main(argv):
+    """``ml-autopipeline convert``: write a Parquet copy of a CSV so later runs skip CSV parsing."""
+    parser = argparse.ArgumentParser(prog="ml-autopipeline convert", description="Convert a CSV to Parquet chunk by chunk")
+    parser.add_argument('input', help='CSV file')
+    parser.add_argument('--output', type=str, help='Parquet path (default: the --parquet-cache copy under --cache-dir)')
+    parser.add_argument('--cache-dir', type=str, help='Cache directory used when --output is not given')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='CSV rows parsed per chunk')
+    parser.add_argument('--row-group-size', type=int, help='Rows per Parquet row group (default 100000); smaller groups prune filters more finely')
+    parser.add_argument('--compression', type=str, default='snappy', help='Parquet compression codec')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='Increase verbosity (-v, -vv for more)')
+    args = parser.parse_args(argv)
+    configure_logging(level=verbosity_to_level(args.verbose))
+    from ml_pipeline.formats import DEFAULT_ROW_GROUP_SIZE, cached_parquet, convert_to_parquet
+
+    options = dict(chunksize=args.chunksize, row_group_size=args.row_group_size or DEFAULT_ROW_GROUP_SIZE, compression=args.compression)
+    if args.output:
+        path = convert_to_parquet(args.input, args.output, **options)
+    else:
+        path = cached_parquet(args.input, args.cache_dir, **options)
+    print(path)
+    return 0
+
+
+def _address_parser(prog, description):
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument('--socket', type=str, help='Unix socket path (default: TCP on --host/--port)')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='TCP host (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port (default 8765)')
+    return parser
+
+
+def _serve_job(job, datasets):
+    """Run one ``serve`` job on a server worker thread; returns its metrics."""
+    with span("pipeline", file=str(job['file'])):
+        return _run_pipeline(job, verbosity_to_level(job.get('verbose') or 0), datasets=datasets)
+
+
+def serve_main(argv):
+    """``ml-autopipeline serve``: keep the pipeline imported and datasets cached between jobs."""
+    parser = _address_parser("ml-autopipeline serve", "Run pipeline jobs submitted with 'ml-autopipeline submit' in a warm process")
+    parser.add_argument('--max-workers', type=int, default=2, help='Jobs run concurrently (threads sharing the dataset cache)')
+    parser.add_argument('--cache-mb', type=int, default=4096, help='Memory for cached loaded/encoded datasets (LRU)')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='Server log verbosity (job logs go to the submitting client)')
+    args = parser.parse_args(argv)
+    configure_logging(level=verbosity_to_level(args.verbose))
+    import asyncio
+    from ml_pipeline.service import JobServer
+    # Pay for the heavy imports once, before the first job
+    import ml_pipeline.artifact, ml_pipeline.eda, ml_pipeline.encoding, ml_pipeline.search, ml_pipeline.training  # noqa: F401,E401
+
+    server = JobServer(_serve_job, max_workers=args.max_workers, cache_bytes=args.cache_mb * 2**20, on_idle=RECORDER.reset)
+    asyncio.run(server.serve(socket_path=args.socket, host=args.host, port=args.port))
+    return 0
+
+
+# Relative paths in a submitted job are resolved on the client, since the server has its own cwd
+_PATH_OPTIONS = ('file', 'save_model', 'cache_dir')
+
+
+def submit_main(argv):
+    """``ml-autopipeline submit [--socket PATH | --port N] <pipeline options>``: run a job on a ``serve`` process."""
+    parser = _address_parser("ml-autopipeline submit", "Submit a pipeline run (same options as ml-autopipeline) to a running 'ml-autopipeline serve'")
+    address, rest = parser.parse_known_args(argv)
+    job = _merged_options(rest)
+    for key in _PATH_OPTIONS:
+        if job.get(key):
+            job[key] = os.path.abspath(job[key])
+    from ml_pipeline.service import submit
+
+    def on_log(event):
+        print(f"{event['level']} - {event['logger']}: {event['message']}", file=sys.stderr)
+
+    try:
+        reply = submit(job, on_log=on_log, socket_path=address.socket, host=address.host, port=address.port)
+    except OSError as e:
+        raise SystemExit(f"Cannot reach server: {e}")
+    if reply.get('status') != 'ok':
+        if job.get('verbose', 0) >= 2:
+            print(reply.get('traceback', ''), file=sys.stderr)
+        print(f"Job failed: {reply.get('error')}", file=sys.stderr)
+        return 1
+    print(json.dumps(reply['results'], indent=2, default=str))
+    return 0
+
+
+COMMANDS = {
+    "benchmark": benchmark_main,
+    "predict": predict_main,
+    "batch": batch_main,
+    "convert": convert_main,
+    "serve": serve_main,
+    "submit": submit_main,
+}
+
+
+def _merged_options(argv):
+    """Parse pipeline arguments, merge the --config file and check the required fields."""
+    args = parse_args(argv)
     cli_dict = vars(args)
 
     # Load and merge configuration if provided
@@ -48,50 +381,300 @@ def main():
     missing = [f for f in required_fields if not merged.get(f)]
     if missing:
         raise SystemExit(f"Missing required arguments after merge: {missing}. Provide via CLI or config file.")
+    return merged
 
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    merged = _merged_options(argv)
+    try:
+        _check_options(merged)
+    except ValueError as e:
+        raise SystemExit(str(e))
     level = verbosity_to_level(merged.get('verbose', 0))
-    configure_logging(level=level, json_logs=merged.get('json_logs'), log_file=merged.get('log_file'))
+    configure_logging(
+        level=level, json_logs=merged.get('json_logs'), log_file=merged.get('log_file'),
+        queue_mode=bool(merged.get('queue_logs')), rate_limits=_rate_limits(merged),
+    )
     logger.info("Logger configured")
     if merged.get('config'):
         logger.info(f"Loaded config file: {merged['config']}")
 
-    df = load_data(merged['file'])
+    RECORDER.configure_profiling(
+        cprofile=merged.get('cprofile'), tracemalloc_stages=merged.get('tracemalloc'),
+        output_dir=merged.get('profile_dir') or '.',
+    )
+    try:
+        with span("pipeline", file=str(merged['file'])):
+            _run_pipeline(merged, level)
+    finally:
+        if merged.get('spans_out'):
+            RECORDER.export(merged['spans_out'], merged.get('spans_format') or 'json')
+
+
+def _load_uncached(path, loader, **options):
+    return loader()
+
+
+def _load_frame(source, merged, usecols, rows):
+    from ml_autopipeline import load_data
+    from ml_pipeline.loading import load_data_optimized
+
+    if not merged.get('optimize_dtypes'):
+        return load_data(source, usecols=usecols, **rows)
+    df, load_report = load_data_optimized(source, usecols=usecols, chunksize=merged.get('chunksize'), **rows)
+    logger.info(
+        f"Memory {load_report['original_bytes']:,} -> {load_report['optimized_bytes']:,} bytes "
+        f"(saved {load_report['saved_bytes']:,}), peak RSS={load_report['peak_rss_bytes']}"
+    )
+    for col, info in load_report['columns'].items():
+        logger.info(f"  {col}: {info['dtype']} saved {info['saved_bytes']:,} bytes")
+    return df
+
+
+def _check_options(merged):
+    """Raise ValueError for option combinations the pipeline cannot run."""
+    if merged.get('imbalance_strategy') and merged.get('apply_smote'):
+        raise ValueError("--apply_smote and --imbalance-strategy are mutually exclusive; use --imbalance-strategy smote")
+    if merged.get('save_model') and not merged.get('dry_run'):
+        # These modes return before the train_models fit whose models are saved
+        modes = [flag for flag in ('cv', 'search', 'streaming', 'incremental') if merged.get(flag)]
+        if modes:
+            raise ValueError(f"--save-model cannot be combined with {', '.join('--' + m for m in modes)}")
+
+
+def _run_pipeline(merged, level, datasets=None):
+    import pandas as pd
+    from ml_autopipeline import (
+        basic_report, streaming_report, check_imbalance, apply_smote, train_models, train_streaming,
+        train_incremental, cross_validate_models,
+    )
+    from ml_pipeline.artifact import PipelineArtifact
+    from ml_pipeline.binning import FeatureBinner
+    from ml_pipeline.cache import ModelCache
+    from ml_pipeline.encoding import SparseEncoder
+    from ml_pipeline.formats import cached_parquet, detect_format
+    from ml_pipeline.progressive import ProgressiveSampling
+    from ml_pipeline.registry import resolve_models
+    from ml_pipeline.sampling import imbalance_from_counts, resampler_for
+
+    _check_options(merged)
+    usecols = _usecols(merged.get('columns'), merged['target'])
+    source = merged['file']
+    if merged.get('plan') or merged.get('dry_run') or merged.get('memory_limit') or merged.get('cpu_limit'):
+        from ml_pipeline.planner import plan_run
+
+        with span("plan"):
+            plan = plan_run(
+                source, merged['target'], options=merged, usecols=usecols,
+                memory_bytes=int(merged['memory_limit'] * 2**30) if merged.get('memory_limit') else None,
+                n_cpus=merged.get('cpu_limit'),
+            )
+        if merged.get('dry_run'):
+            print(json.dumps(plan, indent=2, default=str))
+            return plan
+        merged.update(plan['settings'])
+    if merged.get('parquet_cache') and detect_format(source) == 'csv':
+        with span("convert"):
+            source = cached_parquet(source, merged.get('cache_dir'))
+    rows = dict(filters=merged.get('filter'), sample=merged.get('sample'))
+    if (merged.get('streaming') or merged.get('streaming_eda') or merged.get('incremental')) and (rows['filters'] or rows['sample']):
+        logger.warning("--filter / --sample only apply to in-memory loading, not to --streaming, --streaming-eda or --incremental passes")
+    if merged.get('incremental'):
+        with span("train"):
+            run = train_incremental(
+                source,
+                merged['target'],
+                state_path=merged.get('state_file'),
+                cache_dir=merged.get('cache_dir'),
+                chunksize=merged.get('chunksize') or DEFAULT_CHUNKSIZE,
+                usecols=usecols,
+                n_hash_features=merged.get('hash_features') or 1024,
+                extended_metrics=merged.get('extended_metrics', False),
+                full=bool(merged.get('full_refresh')),
+            )
+        logger.info(f"Incremental mode={run['mode']}: {run['rows']} rows, {run['new_rows']} processed; state {run['state_path']}")
+        if level <= 20:
+            logger.info(f"Missing values: {run['eda']['missing_values']}")
+        imbalance_report = imbalance_from_counts(run['eda']['class_distribution'])
+        logger.info(f"Class distribution: {imbalance_report['class_distribution']}")
+        if imbalance_report['is_imbalanced']:
+            logger.warning("Dataset is imbalanced")
+        _log_results(run['results'])
+        return run['results']
+    if merged.get('streaming'):
+        with span("train"):
+            results = train_streaming(
+                source,
+                merged['target'],
+                chunksize=merged.get('chunksize') or DEFAULT_CHUNKSIZE,
+                usecols=usecols,
+                epochs=merged.get('epochs') or 1,
+                n_hash_features=merged.get('hash_features') or 1024,
+                extended_metrics=merged.get('extended_metrics', False),
+            )
+        _log_results(results)
+        return results
+    # In ``serve`` mode loaded and encoded frames come from the server's dataset cache
+    cached = datasets.get_or_load if datasets is not None else _load_uncached
+    load_options = dict(usecols=usecols, optimize_dtypes=bool(merged.get('optimize_dtypes')), chunksize=merged.get('chunksize'), **rows)
+    with span("load") as load_span:
+        df = cached(source, partial(_load_frame, source, merged, usecols, rows), stage='load', **load_options)
+    RECORDER.update(load_span, rows=df.shape[0], cols=df.shape[1])
     logger.info(f"Loaded dataset shape={df.shape}")
 
-    eda = basic_report(df)
+    with span("eda", data=df):
+        if merged.get('streaming_eda'):
+            eda = streaming_report(source, target=merged['target'], chunksize=merged.get('chunksize') or DEFAULT_CHUNKSIZE, usecols=usecols)
+        else:
+            eda = basic_report(df)
     logger.info("Generated basic EDA report")
     if level <= 20:
         logger.info(f"Columns: {eda['columns']}")
         logger.info(f"Missing values: {eda['missing_values']}")
         logger.info(f"Data types: {eda['data_types']}")
-    if level <= 10:
-        logger.debug(f"Head: {pd.DataFrame(eda['head'])}")
+    if logger.isEnabledFor(logging.DEBUG):  # skip building the head frame unless it is logged
+        logger.debug("Head:\n%s", pd.DataFrame(eda['head']))
 
-    imbalance_report = check_imbalance(df, merged['target'])
+    with span("imbalance", data=df):
+        if merged.get('streaming_eda'):
+            imbalance_report = imbalance_from_counts(eda['class_distribution'])
+        else:
+            imbalance_report = check_imbalance(df, merged['target'])
     logger.info(f"Class distribution: {imbalance_report['class_distribution']}")
     logger.info(f"Imbalance ratio: {imbalance_report['imbalance_ratio']:.2f}")
     if imbalance_report['is_imbalanced']:
         logger.warning("Dataset is imbalanced")
 
-    X = pd.get_dummies(df.drop(columns=[merged['target']]))
     y = df[merged['target']]
+    encoder = None
+    resampler = None
+    strategy = merged.get('imbalance_strategy')
+    if strategy == 'auto':
+        strategy = imbalance_report['recommended_strategy']
+    if strategy:
+        # Applied to the training split inside train_models / each CV fold
+        logger.info(f"Imbalance strategy: {strategy}")
+        resampler = resampler_for(strategy, smote_method=merged.get('smote_method') or 'exact')
+    model_names = _model_names(merged.get('models'))
+    encoding = merged.get('encoding')
+    if encoding is None:
+        # Tree-only runs never need one-hot columns: bin the raw frame, categoricals included
+        binned_only = all(spec.features == 'binned' for spec in resolve_models(model_names))
+        encoding = 'binned' if binned_only else 'dense'
+    if encoding in ('sparse', 'binned'):
+        # Encoding (and SMOTE) happen inside train_models, fitted on the train split only
+        X = df.drop(columns=[merged['target']])
+        if encoding == 'binned':
+            logger.info("Binned encoding: raw columns are binned to uint8 on the train split, no one-hot encoding")
+            encoder = FeatureBinner()
+        else:
+            encoder = SparseEncoder(
+                max_onehot_cardinality=merged.get('max_onehot_cardinality') or 50,
+                high_cardinality=merged.get('high_cardinality') or 'hashing',
+                n_hash_features=merged.get('hash_features') or 1024,
+            )
+        if imbalance_report['is_imbalanced'] and merged.get('apply_smote'):
+            logger.info("SMOTE oversampling will be applied to the encoded training split")
+            resampler = partial(apply_smote, method=merged.get('smote_method') or 'exact')
+    else:
+        with span("encode", data=df):
+            X = cached(source, lambda: pd.get_dummies(df.drop(columns=[merged['target']])), stage='encode',
+                       target=merged['target'], **load_options)
+        if imbalance_report['is_imbalanced'] and merged.get('apply_smote'):
+            logger.info("Applying SMOTE oversampling")
+            with span("sample", data=X):
+                X, y = apply_smote(X, y, method=merged.get('smote_method') or 'exact')
+            logger.info(f"Post-sampling distribution: {pd.Series(y).value_counts().to_dict()}")
+
+    if merged.get('cv') or merged.get('search'):
+        logger.info("Cross-validating models ...")
+        with span("train", data=X):
+            results = cross_validate_models(
+                X,
+                y,
+                cv=merged.get('cv') or 5,
+                search=merged.get('search'),
+                param_grids=merged.get('param_grids'),
+                n_iter=merged.get('n_iter') or 10,
+                scoring=merged.get('scoring') or 'F1 Score',
+                halving_factor=merged.get('halving_factor') or 3,
+                extended_metrics=merged.get('extended_metrics', False),
+                n_jobs=merged.get('n_jobs') or 1,
+                executor=merged.get('executor'),
+                encoder=encoder,
+                resampler=resampler,
+                feature_dtype=merged.get('feature_dtype') or 'float64',
+                imbalance_strategy=strategy,
+                models=model_names,
+                **_svm_options(merged),
+            )
+        _log_results(results)
+        return results
+
+    cache = None
+    if not merged.get('no_cache'):
+        cache = ModelCache(merged.get('cache_dir'), max_bytes=merged.get('cache_max_bytes') or DEFAULT_MAX_BYTES)
+        logger.info(f"Model cache: {cache.cache_dir}")
 
-    if imbalance_report['is_imbalanced'] and merged.get('apply_smote'):
-        logger.info("Applying SMOTE oversampling")
-        X, y = apply_smote(X, y)
-        logger.info(f"Post-sampling distribution: {pd.Series(y).value_counts().to_dict()}")
+    progressive = None
+    if merged.get('progressive'):
+        progressive = ProgressiveSampling(
+            start=merged.get('progressive_start') or 10_000,
+            scoring=merged.get('scoring') or 'F1 Score',
+        )
 
     logger.info("Training models ...")
-    results = train_models(
-        X,
-        y,
-        show_progress=merged.get('progress', False),
-        extended_metrics=merged.get('extended_metrics', False),
-    )
+    with span("train", data=X):
+        results = train_models(
+            X,
+            y,
+            show_progress=merged.get('progress', False),
+            extended_metrics=merged.get('extended_metrics', False),
+            n_jobs=merged.get('n_jobs') or 1,
+            executor=merged.get('executor'),
+            encoder=encoder,
+            resampler=resampler,
+            cache=cache,
+            time_budget=merged.get('time_budget'),
+            model_time_budget=merged.get('model_time_budget'),
+            feature_dtype=merged.get('feature_dtype') or 'float64',
+            return_models=bool(merged.get('save_model')),
+            imbalance_strategy=strategy,
+            models=model_names,
+            progressive=progressive,
+            **_svm_options(merged),
+        )
+    if merged.get('save_model'):
+        results, models = results
+        features = df.drop(columns=[merged['target']])
+        PipelineArtifact.from_frame(
+            models, features, encoded=X if encoder is None else None, encoder=encoder,
+            target=merged['target'], metrics=results, feature_dtype=merged.get('feature_dtype') or 'float64',
+        ).save(merged['save_model'])
+    _log_results(results)
+    return results
+
+
+def _log_results(results):
+    # One record per model rather than per metric: the lines are formatted only if INFO is enabled
     for model_name, metrics in results.items():
-        logger.info(f"Model: {model_name}")
-        for metric, score in metrics.items():
-            logger.info(f"  {metric}: {score}")
+        logger.info("Model: %s%s", model_name, _MetricLines(metrics))
+
+
+class _MetricLines:
+    """Renders ``metrics`` as indented ``name: value`` lines when a log record is formatted."""
+
+    __slots__ = ("metrics",)
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __str__(self):
+        return "".join(f"\n  {metric}: {score}" for metric, score in self.metrics.items())
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,16 +1,46 @@
-from .eda import load_data, basic_report
-from .sampling import check_imbalance, apply_smote
-from .training import train_models
+import importlib
 
 __all__ = [
     "load_data",
     "basic_report",
+    "streaming_report",
     "check_imbalance",
     "apply_smote",
     "train_models",
+    "train_streaming",
+    "train_incremental",
+    "cross_validate_models",
     "__version__"
 ]
 
+# Public functions are imported on first access (PEP 562) so that importing the
+# package, or a light submodule such as ``constants``, does not load pandas,
+# scikit-learn or imblearn.
+_LAZY = {
+    "load_data": ".eda",
+    "basic_report": ".eda",
+    "streaming_report": ".eda",
+    "check_imbalance": ".sampling",
+    "apply_smote": ".sampling",
+    "train_models": ".training",
+    "train_streaming": ".training",
+    "train_incremental": ".incremental",
+    "cross_validate_models": ".search",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
 # Keep a single source of truth by importing from top-level package if available
 try:
     from ml_autopipeline import __version__  # type: ignore  # circular import safe at runtime
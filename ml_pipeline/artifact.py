@@ -0,0 +1,220 @@
+"""Persisted pipelines and batch scoring.
+
+A ``PipelineArtifact`` bundles everything needed to score raw rows: the
+input columns, the encoding (the ``get_dummies`` column layout or a fitted
+``SparseEncoder``), and the fitted models with their shared scaler. It is
+saved uncompressed with joblib so ``load_artifact(mmap_mode="r")``
+memory-maps its numpy arrays (SVM support vectors, linear coefficients,
+encoder tables) instead of reading them into fresh buffers. Worker
+processes scoring the same artifact then share those pages through the OS
+page cache. RandomForest node tables are still copied, because sklearn's
+``Tree.__setstate__`` copies them into its own buffers.
+
+``predict_csv`` streams a CSV through an artifact in fixed-size chunks and
+appends each scored chunk to the output. With ``n_jobs > 1`` the chunks are
+scored in a process pool whose workers load the artifact once, memory-mapped.
+"""
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import pandas as pd
+
+from .cache import library_versions
+from .loading import DEFAULT_CHUNKSIZE
+from .logging_utils import get_logger
+from .preprocessing import as_model_matrix
+from .timing import timed
+
+logger = get_logger("artifact")
+
+ARTIFACT_VERSION = 1
+
+
+class PipelineArtifact:
+    """Fitted encoding + models for scoring raw feature rows.
+
+    ``dummy_columns`` is the column layout produced by ``pd.get_dummies`` at
+    training time (dense encoding); ``encoder`` is a fitted transformer used
+    instead when set. ``models`` hold estimators that accept the encoded
+    matrix, as returned by ``train_models(return_models=True)``.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, Any],
+        feature_columns: List[str],
+        target: Optional[str] = None,
+        dummy_columns: Optional[List[str]] = None,
+        categorical_columns: Optional[List[str]] = None,
+        encoder=None,
+        metrics: Optional[Dict[str, Dict[str, Any]]] = None,
+        feature_dtype: str = "float64",
+    ):
+        if not models:
+            raise ValueError("PipelineArtifact needs at least one fitted model")
+        if encoder is None and dummy_columns is None:
+            raise ValueError("Provide dummy_columns (dense encoding) or a fitted encoder")
+        self.models = dict(models)
+        self.feature_columns = list(feature_columns)
+        self.target = target
+        self.dummy_columns = list(dummy_columns) if dummy_columns is not None else None
+        self.categorical_columns = list(categorical_columns or [])
+        self.encoder = encoder
+        self.metrics = metrics or {}
+        self.feature_dtype = feature_dtype
+        self.versions = library_versions()
+        self.format_version = ARTIFACT_VERSION
+        self.created = time.time()
+
+    @classmethod
+    def from_frame(cls, models, features: pd.DataFrame, encoded=None, encoder=None, **kwargs):
+        """Build from the raw training features and (dense path) their ``get_dummies`` output."""
+        # The columns pd.get_dummies expands by default
+        categorical = [c for c in features.columns
+                       if not (pd.api.types.is_numeric_dtype(features[c]) or pd.api.types.is_bool_dtype(features[c]))]
+        return cls(
+            models,
+            feature_columns=features.columns.tolist(),
+            dummy_columns=encoded.columns.tolist() if encoded is not None else None,
+            categorical_columns=categorical,
+            encoder=encoder,
+            **kwargs,
+        )
+
+    @property
+    def best_model(self) -> str:
+        """Model with the highest stored F1 Score (first model if metrics are missing)."""
+        scored = {n: m.get("F1 Score") for n, m in self.metrics.items() if n in self.models and m.get("F1 Score") is not None}
+        return max(scored, key=scored.get) if scored else next(iter(self.models))
+
+    def read_dtypes(self) -> Dict[str, Any]:
+        """``read_csv`` dtypes that keep categorical columns as strings, as at training time."""
+        return {c: "object" for c in self.categorical_columns}
+
+    def transform(self, df: pd.DataFrame):
+        missing = [c for c in self.feature_columns if c not in df.columns]
+        if missing:
+            raise KeyError(f"Input is missing feature columns: {missing}")
+        X = df[self.feature_columns]
+        if self.encoder is not None:
+            X = self.encoder.transform(X)
+        else:
+            # Unseen categories are dropped and absent ones zero-filled by aligning to the training layout
+            X = pd.get_dummies(X, columns=self.categorical_columns).reindex(columns=self.dummy_columns, fill_value=0)
+        return as_model_matrix(X, self.feature_dtype)
+
+    def predict(self, df: pd.DataFrame, model: Optional[str] = None, proba: bool = False) -> pd.DataFrame:
+        """Predictions (and ``proba_<class>`` columns) for the rows of ``df``, index preserved."""
+        name = model or self.best_model
+        if name not in self.models:
+            raise KeyError(f"Unknown model {name!r}; artifact has {list(self.models)}")
+        estimator = self.models[name]
+        X = self.transform(df)
+        out = pd.DataFrame({"prediction": estimator.predict(X)}, index=df.index)
+        if proba:
+            if not hasattr(estimator, "predict_proba"):
+                raise ValueError(f"{name} does not provide probabilities")
+            P = estimator.predict_proba(X)
+            for i, cls in enumerate(estimator.classes_):
+                out[f"proba_{cls}"] = P[:, i]
+        return out
+
+    def save(self, path) -> Path:
+        """Write the artifact uncompressed (required for memory-mapped loading)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with timed("artifact_save"):
+            joblib.dump(self, tmp)
+            tmp.replace(path)
+        logger.info(f"Saved pipeline artifact with models {list(self.models)} to {path}")
+        return path
+
+
+def load_artifact(path, mmap_mode: Optional[str] = "r") -> PipelineArtifact:
+    """Load a saved artifact; ``mmap_mode="r"`` maps large arrays read-only instead of copying them."""
+    with timed("artifact_load"):
+        artifact = joblib.load(path, mmap_mode=mmap_mode)
+    if not isinstance(artifact, PipelineArtifact):
+        raise TypeError(f"{path} is not a PipelineArtifact")
+    current = library_versions()
+    if artifact.versions.get("scikit-learn") != current.get("scikit-learn"):
+        logger.warning(
+            f"Artifact was saved with scikit-learn {artifact.versions.get('scikit-learn')}, "
+            f"running {current.get('scikit-learn')}"
+        )
+    return artifact
+
+
+_WORKER_ARTIFACT: Optional[PipelineArtifact] = None
+
+
+def _init_worker(path, mmap_mode):
+    global _WORKER_ARTIFACT
+    _WORKER_ARTIFACT = load_artifact(path, mmap_mode)
+
+
+def _score_chunk(chunk, model, proba, keep_columns):
+    out = _WORKER_ARTIFACT.predict(chunk, model=model, proba=proba)
+    return pd.concat([chunk[keep_columns], out], axis=1) if keep_columns else out
+
+
+def predict_csv(
+    artifact_path,
+    input_path,
+    output_path,
+    model: Optional[str] = None,
+    proba: bool = False,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    n_jobs: int = 1,
+    keep_columns: Optional[List[str]] = None,
+    mmap_mode: Optional[str] = "r",
+) -> int:
+    """Score ``input_path`` chunk by chunk and write CSV predictions to ``output_path``.
+
+    Output rows keep the input order; ``keep_columns`` (e.g. an id) are copied
+    through. At most ``2 * n_jobs`` chunks are in flight, so memory stays
+    bounded by the chunk size. Returns the number of rows scored.
+    """
+    global _WORKER_ARTIFACT
+    _init_worker(artifact_path, mmap_mode)
+    artifact = _WORKER_ARTIFACT
+    model = model or artifact.best_model
+    logger.info(f"Scoring {input_path} with {model} chunksize={chunksize} n_jobs={n_jobs}")
+    reader = pd.read_csv(input_path, chunksize=chunksize, dtype=artifact.read_dtypes())
+    rows = 0
+    header = True
+    pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(artifact_path, mmap_mode)) if n_jobs > 1 else None
+    try:
+        with timed("predict_csv"), open(output_path, "w", encoding="utf-8", newline="") as fh:
+            def write(scored):
+                nonlocal header, rows
+                scored.to_csv(fh, index=False, header=header)
+                header = False
+                rows += len(scored)
+
+            if pool is None:
+                for chunk in reader:
+                    write(_score_chunk(chunk, model, proba, keep_columns))
+            else:
+                pending = deque()
+                for chunk in reader:
+                    pending.append(pool.submit(_score_chunk, chunk, model, proba, keep_columns))
+                    if len(pending) >= 2 * n_jobs:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+            if header:  # empty input: still write the header
+                columns = list(keep_columns or []) + ["prediction"]
+                if proba:
+                    columns += [f"proba_{c}" for c in artifact.models[model].classes_]
+                write(pd.DataFrame(columns=columns))
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+    logger.info(f"Wrote {rows} predictions to {output_path}")
+    return rows
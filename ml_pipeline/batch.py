@@ -0,0 +1,208 @@
+"""Run many pipeline jobs from one process with a bounded, memory-aware scheduler.
+
+Jobs are ordered by estimated cost (input file size, largest first, so long
+jobs do not end up running alone at the end) and started while both a worker
+slot and enough of the memory budget are free. A job that does not fit is
+skipped in favour of smaller ones that do (backfilling) and starts once
+memory is released. A job bigger than the whole budget still runs, alone.
+
+Each job runs in its own process. On platforms with ``fork`` the children
+inherit the parent's already-imported modules, so there is no per-job import
+cost. An exception, a crash or a timeout only fails that one job. Results
+are collected into one report (``write_report``: JSON or CSV).
+"""
+import csv
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+import traceback
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .config_loader import merge_config
+from .logging_utils import get_logger
+from .timing import _max_rss_bytes
+
+logger = get_logger("batch")
+
+# A CSV typically expands 5-10x once parsed, one-hot encoded and copied for training
+MEMORY_FACTOR = 10
+MEMORY_BUDGET_FRACTION = 0.8
+REPORT_FORMATS = ("json", "csv")
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Memory available to new processes (Linux ``MemAvailable``), or None if unknown."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):  # pragma: no cover
+        return None
+
+
+def expand_jobs(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Merge ``defaults`` into every entry of ``jobs`` and assign ids and estimates.
+
+    A job may list several targets (``targets: [a, b]``), which expands into one
+    job per target. ``memory_bytes`` overrides the size-based memory estimate.
+    """
+    defaults = config.get("defaults") or {}
+    jobs = []
+    for entry in config.get("jobs") or []:
+        targets = entry.get("targets") or [entry.get("target")]
+        for target in targets:
+            job = merge_config({k: v for k, v in entry.items() if k != "targets"}, defaults)
+            job["target"] = target
+            try:
+                size = os.path.getsize(job["file"]) if job.get("file") else 0
+            except OSError:
+                size = 0
+            job.setdefault("name", f"{len(jobs)}:{Path(str(job.get('file'))).name}:{target}")
+            job["cost"] = size
+            job["memory_bytes"] = int(job.get("memory_bytes") or size * MEMORY_FACTOR)
+            jobs.append(job)
+    if not jobs:
+        raise ValueError("Batch config has no jobs")
+    return jobs
+
+
+def _child(conn, run_job, job):
+    try:
+        results = run_job(job)
+        conn.send(("ok", results, _max_rss_bytes()))
+    except BaseException as e:  # a failing job is reported, never raised into the batch
+        conn.send(("failed", f"{type(e).__name__}: {e}", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def run_batch(
+    jobs: List[Dict[str, Any]],
+    run_job: Callable[[Dict[str, Any]], Any],
+    max_workers: Optional[int] = None,
+    memory_budget: Optional[int] = None,
+    job_timeout: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Run ``run_job(job)`` for every job and return one report row per job, in input order.
+
+    Parameters:
+        jobs: Dicts from ``expand_jobs`` (``name``, ``cost``, ``memory_bytes`` plus options)
+        run_job: Top-level callable executed in a child process; its return
+            value (e.g. the metrics dict) is stored as ``results``
+        max_workers: Concurrent jobs (default: CPU count)
+        memory_budget: Bytes the running jobs' estimates may add up to
+            (default: 80% of available memory; None if unknown disables the check)
+        job_timeout: Seconds after which a job is terminated (per-job
+            ``timeout`` overrides)
+
+    Each row has ``status`` "ok", "failed", "crashed" (the process died) or
+    "timed_out", plus ``error``, ``elapsed_s`` and ``peak_rss_bytes`` where known.
+    """
+    max_workers = max(1, max_workers or os.cpu_count() or 1)
+    if memory_budget is None:
+        available = available_memory_bytes()
+        memory_budget = int(available * MEMORY_BUDGET_FRACTION) if available else None
+    budget = math.inf if memory_budget is None else memory_budget
+    ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else mp.get_context()
+    queue = sorted(range(len(jobs)), key=lambda i: jobs[i]["cost"], reverse=True)
+    report: Dict[int, Dict[str, Any]] = {}
+    running: Dict[Any, Dict[str, Any]] = {}
+    logger.info(f"Batch: {len(jobs)} jobs, max_workers={max_workers}, memory_budget={memory_budget}")
+
+    def finish(conn, row):
+        r = running.pop(conn)
+        r["proc"].join()
+        conn.close()
+        row.update({"elapsed_s": time.perf_counter() - r["started"]})
+        report[r["index"]] = {**_row(jobs[r["index"]]), **row}
+        level = logger.info if row["status"] == "ok" else logger.error
+        level(f"Job {jobs[r['index']]['name']}: {row['status']} in {row['elapsed_s']:.1f}s"
+              + (f" ({row['error']})" if row.get("error") else ""))
+
+    while queue or running:
+        in_use = sum(r["memory"] for r in running.values())
+        for i in list(queue):
+            if len(running) >= max_workers:
+                break
+            need = jobs[i]["memory_bytes"]
+            if running and in_use + need > budget:
+                continue  # backfill with smaller jobs; retry once memory is released
+            if need > budget:
+                logger.warning(f"Job {jobs[i]['name']} estimate {need:,} B exceeds the memory budget; running it alone")
+            queue.remove(i)
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_child, args=(child_conn, run_job, jobs[i]), daemon=False)
+            proc.start()
+            child_conn.close()
+            timeout = jobs[i].get("timeout", job_timeout)
+            running[parent_conn] = {
+                "index": i, "proc": proc, "memory": need, "started": time.perf_counter(),
+                "deadline": time.perf_counter() + timeout if timeout else math.inf,
+            }
+            in_use += need
+            logger.info(f"Started job {jobs[i]['name']} (estimate {need:,} B, {len(running)} running)")
+            if need > budget:
+                break
+        if not running:
+            continue
+        next_deadline = min(r["deadline"] for r in running.values())
+        timeout = None if math.isinf(next_deadline) else max(0.0, next_deadline - time.perf_counter())
+        for conn in wait(list(running), timeout=timeout):
+            try:
+                kind, payload, extra = conn.recv()
+            except EOFError:
+                code = running[conn]["proc"].exitcode
+                running[conn]["proc"].join()
+                code = running[conn]["proc"].exitcode if code is None else code
+                finish(conn, {"status": "crashed", "error": f"worker exited with code {code}"})
+                continue
+            if kind == "ok":
+                finish(conn, {"status": "ok", "results": payload, "peak_rss_bytes": extra})
+            else:
+                logger.debug(extra)
+                finish(conn, {"status": "failed", "error": payload})
+        now = time.perf_counter()
+        for conn, r in list(running.items()):
+            if now >= r["deadline"] and not conn.poll():
+                r["proc"].terminate()
+                finish(conn, {"status": "timed_out", "error": "job timeout"})
+    return [report[i] for i in range(len(jobs))]
+
+
+def _row(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": job["name"], "file": job.get("file"), "target": job.get("target"),
+            "memory_estimate_bytes": job["memory_bytes"]}
+
+
+def write_report(report: List[Dict[str, Any]], path, fmt: Optional[str] = None) -> None:
+    """Write batch results as JSON (one object per job) or CSV (one row per job and model)."""
+    fmt = fmt or ("csv" if str(path).endswith(".csv") else "json")
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format {fmt!r}; expected one of {REPORT_FORMATS}")
+    if fmt == "json":
+        summary = {s: sum(1 for r in report if r["status"] == s) for s in sorted({r["status"] for r in report})}
+        Path(path).write_text(json.dumps({"summary": summary, "jobs": report}, indent=2, default=str), encoding="utf-8")
+        return
+    rows = []
+    for r in report:
+        base = {k: v for k, v in r.items() if k != "results"}
+        results = r.get("results") or {}
+        if not results:
+            rows.append(base)
+        for model, metrics in results.items():
+            scalar = {k: v for k, v in metrics.items() if isinstance(v, (int, float, str)) or v is None}
+            rows.append({**base, "model": model, **scalar})
+    fields = list(dict.fromkeys(k for row in rows for k in row))
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,185 @@
+"""Pipeline benchmarks on synthetic data with regression tracking.
+
+``run_benchmark`` generates a dataset, runs every pipeline stage and records
+wall time, CPU time, peak traced allocations and throughput per stage.
+``compare_results`` checks a run against a stored baseline so upgrades can be
+gated on it.
+"""
+import json
+import platform
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import library_versions
+from .eda import basic_report, load_data, streaming_report
+from .loading import load_data_optimized
+from .logging_utils import get_logger
+from .sampling import apply_smote, check_imbalance
+from .timing import _max_rss_bytes, traced_peak
+from .training import train_models
+
+logger = get_logger("benchmark")
+
+TARGET = "target"
+
+
+def make_synthetic(
+    rows: int = 10_000,
+    cols: int = 20,
+    n_categorical: int = 2,
+    cardinality: int = 10,
+    imbalance: float = 0.1,
+    n_classes: int = 2,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Synthetic classification frame with a learnable target.
+
+    ``cols`` numeric features (standard normal) plus ``n_categorical`` string
+    columns with ``cardinality`` levels each. ``imbalance`` is the share of
+    every non-majority class, so 0.1 with two classes gives a 1:9 split.
+    """
+    if not 0 < imbalance * (n_classes - 1) < 1:
+        raise ValueError("imbalance * (n_classes - 1) must be between 0 and 1")
+    rng = np.random.default_rng(seed)
+    data = {f"num_{i}": rng.standard_normal(rows) for i in range(cols)}
+    for i in range(n_categorical):
+        data[f"cat_{i}"] = np.char.add("c", rng.integers(0, cardinality, rows).astype(str))
+    df = pd.DataFrame(data)
+    # Rank a noisy linear score so class shares follow `imbalance` exactly
+    score = df[[f"num_{i}" for i in range(min(cols, 5))]].sum(axis=1).to_numpy() + rng.standard_normal(rows)
+    shares = [1 - imbalance * (n_classes - 1)] + [imbalance] * (n_classes - 1)
+    edges = np.quantile(score, np.cumsum(shares)[:-1])
+    df[TARGET] = np.searchsorted(edges, score)
+    return df
+
+
+def _peak_alloc_bytes(fn: Callable[[], Any]) -> int:
+    """Peak bytes allocated by ``fn`` above what was allocated before it (tracemalloc; numpy included)."""
+    with traced_peak() as traced:
+        fn()
+    return traced["bytes"]
+
+
+def _measure(fn: Callable[[], Any], rows: int, repeat: int = 1, memory: bool = True) -> Dict[str, Any]:
+    best = None
+    for _ in range(max(1, repeat)):
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        fn()
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+        if best is None or wall < best["wall_s"]:
+            best = {"wall_s": wall, "cpu_s": cpu}
+    # Tracing slows allocation-heavy code, so memory gets its own run after the timed ones
+    best["peak_alloc_bytes"] = _peak_alloc_bytes(fn) if memory else None
+    best["peak_rss_bytes"] = _max_rss_bytes()
+    best["rows"] = rows
+    best["rows_per_s"] = rows / best["wall_s"] if best["wall_s"] > 0 else None
+    return best
+
+
+def run_benchmark(
+    rows: int = 10_000,
+    cols: int = 20,
+    n_categorical: int = 2,
+    cardinality: int = 10,
+    imbalance: float = 0.1,
+    n_classes: int = 2,
+    seed: int = 0,
+    repeat: int = 1,
+    stages: Optional[List[str]] = None,
+    memory: bool = True,
+) -> Dict[str, Any]:
+    """Run every pipeline stage on a synthetic dataset and return the measurements.
+
+    Wall time is the best of ``repeat`` runs. With ``memory=True`` each stage
+    runs once more under tracemalloc and ``peak_alloc_bytes`` is its own peak
+    allocation (Python objects and numpy buffers; pyarrow's pool is not
+    traced). ``peak_rss_bytes`` is the process high-water mark after the
+    stage, monotonic across stages, and is informational only.
+    """
+    params = {
+        "rows": rows, "cols": cols, "n_categorical": n_categorical, "cardinality": cardinality,
+        "imbalance": imbalance, "n_classes": n_classes, "seed": seed, "repeat": repeat,
+    }
+    logger.info(f"Running benchmark {params}")
+    df = make_synthetic(rows, cols, n_categorical, cardinality, imbalance, n_classes, seed)
+    state: Dict[str, Any] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.csv"
+        df.to_csv(path, index=False)
+
+        def encode():
+            state["X"] = pd.get_dummies(state["df"].drop(columns=[TARGET]))
+            state["y"] = state["df"][TARGET]
+
+        def smote():
+            state["X_res"], state["y_res"] = apply_smote(state["X"], state["y"])
+
+        plan = [
+            ("load_data", lambda: state.__setitem__("df", load_data(path))),
+            ("load_data_optimized", lambda: load_data_optimized(path)),
+            ("basic_report", lambda: basic_report(state["df"])),
+            ("streaming_report", lambda: streaming_report(path, target=TARGET)),
+            ("check_imbalance", lambda: check_imbalance(state["df"], TARGET)),
+            ("encode", encode),
+            ("apply_smote", smote),
+            ("train_models", lambda: train_models(state["X"], state["y"])),
+        ]
+        required = {"load_data", "encode"}  # later stages depend on their outputs
+        for name, fn in plan:
+            if stages and name not in stages and name not in required:
+                continue
+            results[name] = _measure(fn, rows, repeat if name not in required else 1, memory)
+            logger.info(f"{name}: {results[name]['wall_s']:.3f}s")
+    return {
+        "meta": {
+            "params": params,
+            "versions": library_versions(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": results,
+    }
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float = 0.2,
+    memory_tolerance: float = 0.2,
+    min_seconds: float = 0.05,
+) -> List[Dict[str, Any]]:
+    """Return the stages that regressed against ``baseline``.
+
+    A stage regresses when its wall time grows by more than ``time_tolerance``
+    (relative) and ``min_seconds`` (absolute, to ignore timer noise on tiny
+    stages), or its ``peak_alloc_bytes`` grows by more than
+    ``memory_tolerance``. The process-wide ``peak_rss_bytes`` is not compared:
+    it only ever grows, so later stages inherit earlier stages' peaks.
+    """
+    regressions = []
+    for stage, base in baseline.get("stages", {}).items():
+        cur = current.get("stages", {}).get(stage)
+        if cur is None:
+            continue
+        slower = cur["wall_s"] - base["wall_s"]
+        if slower > min_seconds and cur["wall_s"] > base["wall_s"] * (1 + time_tolerance):
+            regressions.append({"stage": stage, "metric": "wall_s", "baseline": base["wall_s"], "current": cur["wall_s"]})
+        b_mem, c_mem = base.get("peak_alloc_bytes"), cur.get("peak_alloc_bytes")
+        if b_mem and c_mem and c_mem > b_mem * (1 + memory_tolerance):
+            regressions.append({"stage": stage, "metric": "peak_alloc_bytes", "baseline": b_mem, "current": c_mem})
+    return regressions
+
+
+def save_results(results: Dict[str, Any], path) -> None:
+    Path(path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+def load_results(path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
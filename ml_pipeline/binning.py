@@ -0,0 +1,121 @@
+"""Histogram binning of features into one shared ``uint8`` matrix.
+
+Tree models only compare feature values with thresholds, so replacing every
+value by its quantile bin (at most 255 per column) barely changes what they
+can learn while cutting the feature matrix to one byte per cell. Every model
+registered with ``features="binned"`` (histogram gradient boosting by
+default) is fitted on the same binned matrix (``preprocessing.SharedFeatures.views("binned")``).
+
+Categorical columns (the ones ``pd.get_dummies`` would expand) are coded
+directly, most frequent value first, without one-hot encoding. The codes are
+handed to ``HistGradientBoostingClassifier(categorical_features=...)`` as
+native categories.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from .encoding import _is_categorical
+from .logging_utils import get_logger
+
+logger = get_logger("binning")
+
+MAX_BINS = 255
+
+
+def _column(X, j):
+    if isinstance(X, pd.DataFrame):
+        return X.iloc[:, j]
+    if sp.issparse(X):
+        return X[:, j].toarray().ravel()
+    return X[:, j]
+
+
+def _as_float(col) -> np.ndarray:
+    if isinstance(col, pd.Series):
+        return col.to_numpy(dtype="float64", na_value=np.nan)
+    return np.asarray(col, dtype="float64")
+
+
+class FeatureBinner(BaseEstimator, TransformerMixin):
+    """Encode a DataFrame, ndarray or CSR matrix as a C-contiguous, read-only ``uint8`` matrix.
+
+    Numeric columns get up to ``max_bins - 1`` quantile bins, with edges computed
+    on at most ``subsample`` training rows. A column with few distinct values
+    gets one bin per value. Categorical columns keep their ``max_bins - 1``
+    most frequent training values. The last code (``max_bins - 1``) holds
+    missing values, plus unseen or rare categories.
+
+    After fitting, ``categorical_mask_`` flags the categorical columns and
+    ``n_bins_`` gives the number of codes each column uses.
+    """
+
+    def __init__(self, max_bins: int = MAX_BINS, subsample: Optional[int] = 200_000, random_state: int = 0):
+        self.max_bins = max_bins
+        self.subsample = subsample
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        if not 2 <= self.max_bins <= MAX_BINS:
+            raise ValueError(f"max_bins must be in [2, {MAX_BINS}], got {self.max_bins}")
+        n_rows, n_cols = X.shape
+        rows = None
+        if self.subsample is not None and n_rows > self.subsample:
+            rows = np.sort(np.random.default_rng(self.random_state).choice(n_rows, self.subsample, replace=False))
+        self.columns_: Optional[List[str]] = list(X.columns) if isinstance(X, pd.DataFrame) else None
+        self.categorical_mask_ = np.zeros(n_cols, dtype=bool)
+        self.edges_: List[Optional[np.ndarray]] = []
+        self.categories_: List[Optional[pd.Index]] = []
+        self.n_bins_ = np.zeros(n_cols, dtype=np.int64)
+        n_codes = self.max_bins - 1  # the last code is reserved for missing / other
+        for j in range(n_cols):
+            col = _column(X, j)
+            if isinstance(col, pd.Series) and _is_categorical(col):
+                counts = col.value_counts(dropna=True)
+                kept = counts.index[:n_codes]
+                if len(counts) > n_codes:
+                    logger.info(f"Column {self.columns_[j]!r}: {len(counts)} categories, {len(counts) - n_codes} rare ones share a code")
+                self.categorical_mask_[j] = True
+                self.categories_.append(pd.Index(kept))
+                self.edges_.append(None)
+                self.n_bins_[j] = len(kept) + 1
+                continue
+            values = _as_float(col if rows is None else col.iloc[rows] if isinstance(col, pd.Series) else col[rows])
+            values = values[~np.isnan(values)]
+            distinct = np.unique(values)
+            if len(distinct) <= n_codes:
+                # One bin per value: thresholds halfway between consecutive values
+                edges = (distinct[:-1] + distinct[1:]) / 2
+            else:
+                edges = np.unique(np.quantile(values, np.linspace(0, 1, n_codes + 1)[1:-1], method="midpoint"))
+            self.categories_.append(None)
+            self.edges_.append(edges)
+            self.n_bins_[j] = len(edges) + 2
+        logger.debug(
+            f"Binned {n_cols} columns ({int(self.categorical_mask_.sum())} categorical), "
+            f"max {int(self.n_bins_.max(initial=0))} codes per column"
+        )
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        if self.columns_ is not None and isinstance(X, pd.DataFrame):
+            X = X[self.columns_]
+        if X.shape[1] != len(self.edges_):
+            raise ValueError(f"Expected {len(self.edges_)} columns, got {X.shape[1]}")
+        missing = self.max_bins - 1
+        out = np.empty(X.shape, dtype=np.uint8)
+        for j in range(X.shape[1]):
+            col = _column(X, j)
+            if self.categorical_mask_[j]:
+                codes = self.categories_[j].get_indexer(col)  # -1 for unseen categories and NaN
+                out[:, j] = np.where(codes < 0, missing, codes)
+            else:
+                values = _as_float(col)
+                codes = np.searchsorted(self.edges_[j], values, side="left")
+                codes[np.isnan(values)] = missing
+                out[:, j] = codes
+        out.flags.writeable = False
+        return out
@@ -0,0 +1,250 @@
+"""Time-budgeted model fitting in cancellable subprocesses.
+
+Each model is fitted in its own ``multiprocessing`` process. The parent waits
+on the result pipes until the model's deadline (the smaller of its own budget
+and what is left of the global budget) and terminates the process when it
+expires. Models that can be grown incrementally (warm-started
+RandomForest / LogisticRegression) send a scored checkpoint whenever a step
+improves on the best one so far, so a timed-out fit still reports its best
+partial state (and, when models are requested, the estimator at that point).
+
+Workers start from a ``forkserver`` (``spawn`` where unavailable), never by
+forking the caller: serve-mode job threads, the queue-log listener or an
+executor may be running in it, and a fork copies their locks mid-use.
+"""
+import math
+import multiprocessing as mp
+import time
+import warnings
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from .logging_utils import get_logger
+
+logger = get_logger("budget")
+
+try:  # ships with scikit-learn
+    from threadpoolctl import threadpool_limits  # type: ignore
+except Exception:  # pragma: no cover
+    threadpool_limits = None
+
+CHECKPOINTS = 5
+
+
+def _model_budget(model_time_budget, name: str) -> float:
+    if model_time_budget is None:
+        return math.inf
+    if isinstance(model_time_budget, dict):
+        value = model_time_budget.get(name)
+        return math.inf if value is None else float(value)
+    return float(model_time_budget)
+
+
+def _split_pipeline(model):
+    """Fit-once preprocessing and the final estimator of a (possibly piped) model."""
+    if isinstance(model, Pipeline) and len(model.steps) > 1:
+        return model[:-1], model.steps[-1][1]
+    return None, model
+
+
+def _incremental_steps(estimator, checkpoints: int):
+    """Return ``(steps, requested)`` for models that can be grown in warm-started steps, else None.
+
+    ``steps(fit)`` yields a checkpoint label after each growth step.
+    RandomForest adds trees (the final forest equals a one-shot fit with the
+    same random_state); LogisticRegression continues from its previous
+    coefficients ``max_iter / checkpoints`` iterations at a time. Each step
+    sets its own ``warm_start`` / ``n_estimators`` / ``max_iter``, so the
+    caller may apply ``requested`` (the original values) between steps, e.g.
+    to ship a checkpoint; they are restored once the steps finish, so the
+    returned model refits (or clones) with the requested settings.
+    """
+    warm_start = estimator.get_params().get("warm_start")
+    if isinstance(estimator, RandomForestClassifier):
+        total = estimator.n_estimators
+        step = max(1, math.ceil(total / checkpoints))
+        requested = {"warm_start": warm_start, "n_estimators": total}
+
+        def grow(fit):
+            n = 0
+            try:
+                while n < total:
+                    n = min(total, n + step)
+                    estimator.set_params(warm_start=True, n_estimators=n)
+                    fit()
+                    yield f"n_estimators={n}"
+            finally:
+                estimator.set_params(**requested)
+        return grow, requested
+    if isinstance(estimator, LogisticRegression) and estimator.solver in ("lbfgs", "newton-cg", "sag", "saga"):
+        total = estimator.max_iter
+        step = max(1, math.ceil(total / checkpoints))
+        requested = {"warm_start": warm_start, "max_iter": total}
+
+        def iterate(fit):
+            done = 0
+            try:
+                while done < total:
+                    estimator.set_params(warm_start=True, max_iter=step)
+                    fit()
+                    n_iter = int(max(estimator.n_iter_))
+                    done += n_iter
+                    yield f"iterations={done}"
+                    if n_iter < step:  # converged
+                        break
+            finally:
+                estimator.set_params(**requested)
+        return iterate, requested
+    return None
+
+
+def _worker(conn, model, X_train, y_train, X_test, y_test, evaluate, extended_metrics, n_threads, return_model,
+            scoring="F1 Score"):
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+    try:
+        limits = threadpool_limits(limits=n_threads) if threadpool_limits is not None and n_threads else None
+        try:
+            pre, final = _split_pipeline(model)
+            Xt_train, Xt_test = X_train, X_test
+            if pre is not None:
+                Xt_train = pre.fit_transform(X_train, y_train)
+                Xt_test = pre.transform(X_test)
+            incremental = _incremental_steps(final, CHECKPOINTS)
+            if incremental is None:
+                final.fit(Xt_train, y_train)
+                metrics = evaluate(final, Xt_test, y_test, extended_metrics)
+            else:
+                steps, requested = incremental
+                best = -math.inf
+                for label in steps(lambda: final.fit(Xt_train, y_train)):
+                    metrics = evaluate(final, Xt_test, y_test, extended_metrics)
+                    score = metrics.get(scoring, -math.inf)
+                    if score > best:  # only improvements are shipped; the parent keeps the last one
+                        best = score
+                        final.set_params(**requested)  # a returned partial model refits with the requested settings
+                        conn.send(("checkpoint", metrics, (label, model if return_model else None)))
+        finally:
+            if limits is not None:
+                limits.restore_original_limits()
+        conn.send(("done", metrics, model if return_model else None))
+    except Exception as e:  # reported to the parent instead of killing the run
+        conn.send(("error", f"{type(e).__name__}: {e}", None))
+    finally:
+        conn.close()
+
+
+def fit_with_budget(
+    models: Dict[str, Any],
+    inputs: Dict[str, Tuple[Any, Any]],
+    y_train,
+    y_test,
+    evaluate: Callable,
+    extended_metrics: bool = False,
+    time_budget: Optional[float] = None,
+    model_time_budget=None,
+    max_workers: int = 1,
+    n_threads: Optional[int] = None,
+    return_models: bool = False,
+    scoring: str = "F1 Score",
+):
+    """Fit ``models`` under time budgets, yielding ``(name, metrics, elapsed, model, None)``.
+
+    ``inputs`` maps each model name to its ``(X_train, X_test)`` pair.
+
+    ``metrics`` is the normal metric dict for completed fits. Otherwise it
+    carries a ``status``: ``"partial"`` (metrics of the checkpoint with the
+    best ``scoring`` plus its ``checkpoint`` label), ``"timed_out"`` (no
+    checkpoint reached) or ``"failed"`` (with ``error``). When
+    ``return_models`` is set, ``model`` is the fitted estimator for completed
+    fits and the best checkpoint's estimator for partial ones. The last field
+    mirrors ``training._fit_and_evaluate``'s per-stage timings, which are not
+    collected across the subprocess boundary.
+    """
+    ctx = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+    start = time.perf_counter()
+    global_deadline = start + time_budget if time_budget is not None else math.inf
+    queue = list(models.items())
+    running: Dict[Any, Dict[str, Any]] = {}
+
+    def finish(conn, msg):
+        r = running.pop(conn)
+        elapsed = time.perf_counter() - r["started"]
+        kind, payload, extra = msg
+        r["proc"].join()
+        conn.close()
+        if kind == "done":
+            return r["name"], payload, elapsed, extra, None
+        logger.error(f"{r['name']} failed: {payload}")
+        return r["name"], {"status": "failed", "error": payload, "elapsed_s": elapsed}, elapsed, None, None
+
+    while queue or running:
+        while queue and len(running) < max_workers:
+            name, model = queue.pop(0)
+            now = time.perf_counter()
+            if now >= global_deadline:
+                logger.warning(f"Global time budget exhausted before {name} started")
+                yield name, {"status": "timed_out", "elapsed_s": 0.0}, 0.0, None, None
+                continue
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(
+                target=_worker,
+                args=(child_conn, model, inputs[name][0], y_train, inputs[name][1], y_test, evaluate, extended_metrics,
+                      n_threads, return_models, scoring),
+                daemon=True,
+            )
+            logger.info(f"Fitting model: {name}")
+            proc.start()
+            child_conn.close()
+            deadline = min(global_deadline, now + _model_budget(model_time_budget, name))
+            running[parent_conn] = {"name": name, "proc": proc, "started": now, "deadline": deadline, "checkpoint": None}
+        if not running:
+            continue
+
+        timeout = max(0.0, min(r["deadline"] for r in running.values()) - time.perf_counter())
+        for conn in wait(list(running), timeout=None if math.isinf(timeout) else timeout):
+            try:
+                msg = conn.recv()
+            except EOFError:
+                msg = ("error", f"worker exited with code {running[conn]['proc'].exitcode}", None)
+            if msg[0] == "checkpoint":
+                running[conn]["checkpoint"] = msg[1:]
+                logger.debug("%s checkpoint %s", running[conn]["name"], msg[2][0])
+                continue
+            yield finish(conn, msg)
+
+        now = time.perf_counter()
+        for conn, r in list(running.items()):
+            if now < r["deadline"]:
+                continue
+            # Drain messages that raced with the deadline; a completed fit still counts
+            final_msg = None
+            while final_msg is None and conn.poll():
+                try:
+                    msg = conn.recv()
+                except EOFError:
+                    break
+                if msg[0] == "checkpoint":
+                    r["checkpoint"] = msg[1:]
+                else:
+                    final_msg = msg
+            if final_msg is not None:
+                yield finish(conn, final_msg)
+                continue
+            r["proc"].terminate()
+            r["proc"].join()
+            conn.close()
+            del running[conn]
+            elapsed = now - r["started"]
+            if r["checkpoint"] is not None:
+                metrics, (label, partial_model) = r["checkpoint"]
+                logger.warning(f"{r['name']} hit its time budget after {elapsed:.1f}s; using best checkpoint {label}")
+                partial = {**metrics, "status": "partial", "checkpoint": label, "elapsed_s": elapsed}
+                yield r["name"], partial, elapsed, partial_model, None
+            else:
+                logger.warning(f"{r['name']} timed out after {elapsed:.1f}s")
+                yield r["name"], {"status": "timed_out", "elapsed_s": elapsed}, elapsed, None, None
@@ -0,0 +1,168 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy
+import scipy.sparse as sp
+
+from .constants import DEFAULT_MAX_BYTES
+from .logging_utils import get_logger
+
+logger = get_logger("cache")
+
+CACHE_SUFFIX = ".joblib"
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "ml-autopipeline"
+
+
+def library_versions() -> Dict[str, str]:
+    """Versions that can change fitted models or metrics; part of every cache key."""
+    import imblearn
+    import sklearn
+    from . import __version__
+    return {
+        "ml_autopipeline": __version__,
+        "sklearn": sklearn.__version__,
+        "imblearn": imblearn.__version__,
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+    }
+
+
+def fingerprint_data(X, y) -> str:
+    """Fast content hash of features and target (values, labels, dtypes, shape)."""
+    h = hashlib.blake2b(digest_size=20)
+    for obj in (X, y):
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            names = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+            dtypes = obj.dtypes.astype(str).tolist() if isinstance(obj, pd.DataFrame) else [str(obj.dtype)]
+            h.update(repr((names, dtypes, obj.shape)).encode())
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        elif sp.issparse(obj):
+            csr = obj.tocsr()
+            h.update(repr(("csr", csr.shape, str(csr.dtype))).encode())
+            for part in (csr.data, csr.indices, csr.indptr):
+                h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            arr = np.ascontiguousarray(np.asarray(obj))
+            h.update(repr(("ndarray", arr.shape, str(arr.dtype))).encode())
+            if arr.dtype == object:
+                h.update(pd.util.hash_array(arr.ravel().astype(str).astype(object)).tobytes())
+            else:
+                h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def estimator_signature(estimator) -> Any:
+    """JSON-able description of an estimator's class and hyper-parameters.
+
+    Parallelism settings (``*n_jobs``) are dropped because they do not change
+    the fitted model.
+    """
+    if estimator is None:
+        return None
+    if isinstance(estimator, functools.partial):  # e.g. partial(apply_smote, method=...)
+        return {
+            "func": estimator_signature(estimator.func),
+            "args": repr(estimator.args),
+            "keywords": {k: repr(v) for k, v in sorted(estimator.keywords.items())},
+        }
+    if not hasattr(estimator, "get_params"):
+        return getattr(estimator, "__qualname__", type(estimator).__qualname__)
+    params = {}
+    for key, value in sorted(estimator.get_params(deep=True).items()):
+        if key.endswith("n_jobs") or key == "steps":
+            continue
+        params[key] = type(value).__qualname__ if hasattr(value, "get_params") else repr(value)
+    return {"class": type(estimator).__qualname__, "params": params}
+
+
+class ModelCache:
+    """On-disk, content-addressed store of fitted estimators and their metrics.
+
+    Entries are joblib files named by key; hits refresh the file mtime and the
+    least recently used entries are evicted once the directory grows past
+    ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._versions = library_versions()
+
+    def key(self, data_fingerprint: str, model, **params) -> str:
+        payload = {
+            "data": data_fingerprint,
+            "model": estimator_signature(model),
+            "params": {k: estimator_signature(v) if hasattr(v, "get_params") or callable(v) else v
+                       for k, v in sorted(params.items())},
+            "versions": self._versions,
+        }
+        blob = json.dumps(payload, sort_keys=True, default=repr).encode()
+        return hashlib.blake2b(blob, digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            entry = joblib.load(path)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)  # LRU: mtime is the last access time
+        logger.debug("Cache hit %s", key)
+        return entry["model"], entry["metrics"]
+
+    def put(self, key: str, model, metrics: Dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            joblib.dump({"model": model, "metrics": metrics, "created": time.time()}, tmp)
+            os.replace(tmp, self._path(key))
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {key}: {e}")
+            Path(tmp).unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``.
+
+        Returns the number of entries removed.
+        """
+        entries = []
+        for p in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:  # removed concurrently
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"Evicted {removed} cache entries; cache size now {total:,} bytes")
+        return removed
@@ -1,12 +1,14 @@
 import argparse
 import pandas as pd
-from ml_pipeline.ml_autopipeline import load_data, basic_report, check_imbalance, apply_smote, train_models
+from ml_pipeline import load_data, basic_report, check_imbalance, apply_smote, train_models
+from ml_pipeline.encoding import SparseEncoder
 
 def main():
     parser = argparse.ArgumentParser(description="ML Auto-Pipeline CLI")
     parser.add_argument('--file', type=str, help='CSV file path', required=True)
     parser.add_argument('--target', type=str, help='Target column name', required=True)
     parser.add_argument('--apply_smote', action='store_true', help='Apply SMOTE sampling')
+    parser.add_argument('--sparse', action='store_true', help='Sparse CSR encoding fitted on the train split instead of pd.get_dummies')
 
     args = parser.parse_args()
 
@@ -29,17 +31,25 @@ def main():
     else:
         print("Dataset class distribution is balanced.")
 
-    X = pd.get_dummies(df.drop(columns=[args.target]))
     y = df[args.target]
-
-    if imbalance_report['is_imbalanced'] and args.apply_smote:
-        print("\nApplying SMOTE oversampling...")
-        X, y = apply_smote(X, y)
-        print("After sampling, class distribution:")
-        print(pd.Series(y).value_counts())
+    encoder = None
+    resampler = None
+    if args.sparse:
+        X = df.drop(columns=[args.target])
+        encoder = SparseEncoder()
+        if imbalance_report['is_imbalanced'] and args.apply_smote:
+            print("\nSMOTE oversampling will be applied to the encoded training split")
+            resampler = apply_smote
+    else:
+        X = pd.get_dummies(df.drop(columns=[args.target]))
+        if imbalance_report['is_imbalanced'] and args.apply_smote:
+            print("\nApplying SMOTE oversampling...")
+            X, y = apply_smote(X, y)
+            print("After sampling, class distribution:")
+            print(pd.Series(y).value_counts())
 
     print("\n--- Training Models ---")
-    results = train_models(X, y)
+    results = train_models(X, y, encoder=encoder, resampler=resampler)
     for model_name, metrics in results.items():
         print(f"\nModel: {model_name}")
         for metric, score in metrics.items():
@@ -5,11 +5,6 @@ from .logging_utils import get_logger
 
 logger = get_logger("config")
 
-try:  # optional dependency
-    import yaml  # type: ignore
-except Exception:  # pragma: no cover
-    yaml = None
-
 SUPPORTED_SUFFIXES = {".yml", ".yaml", ".json"}
 
 class ConfigError(Exception):
@@ -24,7 +19,9 @@ def load_config(path: str | Path) -> Dict[str, Any]:
     logger.info(f"Loading config file {p}")
     text = p.read_text(encoding="utf-8")
     if p.suffix.lower() in {".yml", ".yaml"}:
-        if yaml is None:
+        try:  # optional dependency, imported only for YAML configs
+            import yaml  # type: ignore
+        except Exception:  # pragma: no cover
             raise ConfigError("PyYAML not installed. Install with: pip install ml-autopipeline[config]")
         data = yaml.safe_load(text) or {}
     else:
@@ -0,0 +1,20 @@
+"""Option values and defaults shared by the library and the CLI.
+
+Kept free of third-party imports so ``ml-autopipeline --help`` and argument
+validation do not load pandas or scikit-learn. The modules that use these
+values re-export them under their historical names.
+"""
+
+EXECUTORS = ("thread", "process", "loky")
+SVM_BACKENDS = ("auto", "exact", "linear", "sgd", "nystroem", "rbf_sampler")
+SEARCH_STRATEGIES = ("grid", "random", "halving")
+HIGH_CARDINALITY_STRATEGIES = ("hashing", "frequency", "target")
+IMBALANCE_STRATEGIES = ("auto", "none", "smote", "oversample", "class_weight", "undersample", "balanced_bagging")
+FEATURE_DTYPES = ("float64", "float32")
+ENCODINGS = ("dense", "sparse", "binned")
+BUILTIN_MODELS = ("logistic_regression", "random_forest", "svm", "hist_gradient_boosting")
+DEFAULT_MODELS = ("logistic_regression", "random_forest", "svm")
+SPAN_FORMATS = ("json", "chrome", "prometheus")
+INPUT_FORMATS = ("csv", "parquet", "feather", "npy")
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # model cache size before LRU eviction
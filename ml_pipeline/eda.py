@@ -1,11 +1,26 @@
 import pandas as pd
 from .logging_utils import get_logger
+from .formats import detect_format, iter_chunks, read_table
+from .loading import load_data_optimized, DEFAULT_CHUNKSIZE
+from .sketches import ColumnAccumulator
 
 logger = get_logger("eda")
 
-def load_data(file_path):
+def load_data(file_path, usecols=None, optimize_dtypes=False, filters=None, sample=None, **optimize_kwargs):
+    """Load a CSV, Parquet, Feather / Arrow IPC or ``.npy`` file into a DataFrame.
+
+    The format comes from the extension (see ``formats.read_table``).
+    ``filters`` (e.g. ``["age >= 30"]``) and ``sample`` (a row fraction) are
+    pushed down to Parquet row groups. With ``optimize_dtypes=True`` numerics
+    are downcast and low-cardinality strings become ``category`` (see
+    ``loading.load_data_optimized``, which also returns the per-column memory
+    report).
+    """
     logger.info(f"Loading data from {file_path}")
-    df = pd.read_csv(file_path)
+    if optimize_dtypes:
+        df, _ = load_data_optimized(file_path, usecols=usecols, filters=filters, sample=sample, **optimize_kwargs)
+        return df
+    df = read_table(file_path, usecols=usecols, filters=filters, sample=sample)
     logger.debug(f"Loaded dataframe shape={df.shape}")
     return df
 
@@ -20,3 +35,54 @@ def basic_report(df):
     }
     logger.debug(f"Report keys={list(report.keys())}")
     return report
+
+def streaming_report(file_path, target=None, chunksize=DEFAULT_CHUNKSIZE, usecols=None, hll_p=14, quantile_k=256, top_k=10):
+    """Single-pass ``basic_report`` for files larger than memory (any ``formats`` input).
+
+    Reads ``file_path`` chunk by chunk and merges per-column accumulators
+    (counts, missing, Welford moments, HyperLogLog distinct counts, quantile
+    sketch, top-k values), so memory is bounded by the chunk size and the
+    sketch parameters. Returns the ``basic_report`` keys plus ``column_stats``
+    and, when ``target`` is given, the exact ``class_distribution`` (feed it to
+    ``sampling.imbalance_from_counts`` to skip a second scan).
+    """
+    logger.info(f"Generating streaming EDA report for {file_path} chunksize={chunksize}")
+    accumulators = {}
+    class_counts = {}
+    head = None
+    rows = 0
+    columns = None
+    for chunk in iter_chunks(file_path, chunksize=chunksize, usecols=usecols):
+        if columns is None:
+            columns = chunk.columns.tolist()
+            accumulators = {c: ColumnAccumulator(hll_p, quantile_k, top_k) for c in columns}
+            head = chunk.head().to_dict(orient='records')
+        rows += len(chunk)
+        for col in columns:
+            accumulators[col].update(chunk[col])
+        if target is not None:
+            for value, count in chunk[target].value_counts().items():
+                class_counts[value] = class_counts.get(value, 0) + int(count)
+    if columns is None:  # header-only file
+        empty = pd.read_csv(file_path, usecols=usecols, nrows=0) if detect_format(file_path) == "csv" else read_table(file_path, usecols)
+        columns = empty.columns.tolist()
+        accumulators = {c: ColumnAccumulator(hll_p, quantile_k, top_k) for c in columns}
+        head = []
+    report = accumulated_report(columns, accumulators, rows, head, class_counts if target is not None else None)
+    logger.debug(f"Report keys={list(report.keys())}")
+    return report
+
+def accumulated_report(columns, accumulators, rows, head, class_counts=None):
+    """``streaming_report`` output from merged per-column accumulators (see ``incremental.py``)."""
+    report = {
+        "shape": (rows, len(columns)),
+        "columns": columns,
+        "missing_values": {c: accumulators[c].missing for c in columns},
+        "data_types": {c: accumulators[c].dtype for c in columns},
+        "head": head,
+        "column_stats": {c: accumulators[c].summary() for c in columns},
+    }
+    if class_counts is not None:
+        # Same ordering as value_counts(): most frequent first
+        report["class_distribution"] = dict(sorted(class_counts.items(), key=lambda kv: kv[1], reverse=True))
+    return report
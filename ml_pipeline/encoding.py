@@ -0,0 +1,203 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from pandas.api.types import is_object_dtype, is_string_dtype
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.model_selection import KFold
+
+from .constants import HIGH_CARDINALITY_STRATEGIES
+from .logging_utils import get_logger
+
+logger = get_logger("encoding")
+
+
+def is_sparse(X) -> bool:
+    """True for scipy.sparse matrices and DataFrames made only of pandas sparse columns."""
+    if sp.issparse(X):
+        return True
+    dtypes = getattr(X, "dtypes", None)
+    if dtypes is None or not hasattr(dtypes, "__iter__"):
+        return False
+    return len(dtypes) > 0 and all(isinstance(d, pd.SparseDtype) for d in dtypes)
+
+
+def _is_categorical(s: pd.Series) -> bool:
+    # Same column selection as pd.get_dummies' default
+    return is_object_dtype(s.dtype) or is_string_dtype(s.dtype) or isinstance(s.dtype, pd.CategoricalDtype)
+
+
+class SparseEncoder(BaseEstimator, TransformerMixin):
+    """Encode a DataFrame into a scipy.sparse CSR matrix without densifying.
+
+    Numeric columns pass through. Categorical columns (the ones ``pd.get_dummies``
+    would expand) with at most ``max_onehot_cardinality`` distinct training
+    values are one-hot encoded; wider ones use ``high_cardinality``:
+
+    - ``"hashing"``: ``n_hash_features`` hashed indicator columns per source column
+    - ``"frequency"``: one column with the training frequency of the value
+    - ``"target"``: one column per class with the smoothed P(class | value)
+
+    Missing and unseen values encode as all-zero (one-hot/hashing), 0
+    (frequency) or the class prior (target). Fit on the training split only.
+
+    ``fit_transform`` target-encodes the training rows out of fold: each of
+    ``target_folds`` folds gets the table fitted on the other folds, so a
+    row's own label never feeds its features (a level seen once would
+    otherwise encode its label exactly). ``transform`` uses the table fitted
+    on all training rows. ``target_folds < 2`` disables this.
+    """
+
+    def __init__(
+        self,
+        max_onehot_cardinality: int = 50,
+        high_cardinality: str = "hashing",
+        n_hash_features: int = 1024,
+        target_smoothing: float = 10.0,
+        dtype=np.float64,
+        target_folds: int = 5,
+        random_state: int = 0,
+    ):
+        self.max_onehot_cardinality = max_onehot_cardinality
+        self.high_cardinality = high_cardinality
+        self.n_hash_features = n_hash_features
+        self.target_smoothing = target_smoothing
+        self.dtype = dtype
+        self.target_folds = target_folds
+        self.random_state = random_state
+
+    def fit(self, X: pd.DataFrame, y=None):
+        if self.high_cardinality not in HIGH_CARDINALITY_STRATEGIES:
+            raise ValueError(
+                f"Unknown high_cardinality={self.high_cardinality!r}; expected one of {HIGH_CARDINALITY_STRATEGIES}"
+            )
+        if self.high_cardinality == "target" and y is None:
+            raise ValueError("Target encoding requires y")
+        self.columns_ = list(X.columns)
+        self.plan_ = {}
+        self.feature_names_: List[str] = []
+        if y is not None:
+            y = pd.Series(np.asarray(y), index=X.index)
+            self.classes_ = np.sort(y.unique())
+            prior = y.value_counts(normalize=True)
+            self.prior_ = prior.reindex(self.classes_).to_numpy(dtype=np.float64)
+        for col in self.columns_:
+            s = X[col]
+            if not _is_categorical(s):
+                self.plan_[col] = ("numeric", None)
+                self.feature_names_.append(str(col))
+                continue
+            counts = s.value_counts(dropna=True)
+            counts = counts[counts > 0]
+            if len(counts) <= self.max_onehot_cardinality:
+                categories = pd.Index(sorted(counts.index, key=str))
+                self.plan_[col] = ("onehot", categories)
+                self.feature_names_.extend(f"{col}_{c}" for c in categories)
+            elif self.high_cardinality == "hashing":
+                self.plan_[col] = ("hashing", None)
+                self.feature_names_.extend(f"{col}_hash{i}" for i in range(self.n_hash_features))
+            elif self.high_cardinality == "frequency":
+                self.plan_[col] = ("frequency", counts / len(s))
+                self.feature_names_.append(f"{col}_freq")
+            else:
+                self.plan_[col] = ("target", self._target_table(s, y))
+                self.feature_names_.extend(f"{col}_target_{c}" for c in self.classes_)
+        kinds = pd.Series([kind for kind, _ in self.plan_.values()]).value_counts().to_dict()
+        logger.info(f"SparseEncoder fitted: {len(self.feature_names_)} output columns; column kinds={kinds}")
+        return self
+
+    def _target_table(self, s: pd.Series, y: pd.Series) -> pd.DataFrame:
+        # Smoothed per-class means: (class_count + m * prior) / (count + m)
+        crosstab = pd.crosstab(s, y).reindex(columns=self.classes_, fill_value=0)
+        totals = crosstab.sum(axis=1).to_numpy(dtype=np.float64)[:, None]
+        m = self.target_smoothing
+        table = (crosstab.to_numpy(dtype=np.float64) + m * self.prior_) / (totals + m)
+        return pd.DataFrame(table, index=crosstab.index, columns=self.classes_)
+
+    def _target_block(self, table: pd.DataFrame, s: pd.Series) -> np.ndarray:
+        """Per-class encoding of ``s`` from ``table``; the class prior for unseen and missing values."""
+        positions = table.index.get_indexer(s)
+        known = positions >= 0
+        block = np.tile(self.prior_, (len(s), 1))
+        block[known] = table.to_numpy()[positions[known]]
+        return block
+
+    def fit_transform(self, X: pd.DataFrame, y=None, **fit_params) -> sp.csr_matrix:
+        self.fit(X, y)
+        targets = [col for col, (kind, _) in self.plan_.items() if kind == "target"]
+        if not targets or self.target_folds < 2 or len(X) < self.target_folds:
+            return self.transform(X)
+        y = pd.Series(np.asarray(y), index=X.index)
+        folds = list(KFold(self.target_folds, shuffle=True, random_state=self.random_state).split(X))
+        blocks = {}
+        for col in targets:
+            s = X[col]
+            block = np.empty((len(X), len(self.classes_)))
+            for fit_rows, encode_rows in folds:
+                table = self._target_table(s.iloc[fit_rows], y.iloc[fit_rows])
+                block[encode_rows] = self._target_block(table, s.iloc[encode_rows])
+            blocks[col] = block
+        logger.debug("Out-of-fold target encoding of %d columns over %d folds", len(targets), len(folds))
+        return self._encode(X, blocks)
+
+    def transform(self, X: pd.DataFrame) -> sp.csr_matrix:
+        return self._encode(X)
+
+    def _encode(self, X: pd.DataFrame, target_blocks=None) -> sp.csr_matrix:
+        """Encode ``X``; ``target_blocks`` ({column: block}) replaces the fitted target tables."""
+        n = len(X)
+        rows, cols, data = [], [], []
+        offset = 0
+        for col in self.columns_:
+            kind, state = self.plan_[col]
+            s = X[col]
+            if kind == "numeric":
+                values = s.to_numpy(dtype=np.float64, na_value=np.nan)
+                idx = np.flatnonzero(values != 0)  # NaN != 0, so NaNs are kept explicitly
+                rows.append(idx)
+                cols.append(np.full(idx.size, offset))
+                data.append(values[idx])
+                offset += 1
+            elif kind == "onehot":
+                codes = state.get_indexer(s)  # -1 for unseen and missing values
+                idx = np.flatnonzero(codes >= 0)
+                rows.append(idx)
+                cols.append(offset + codes[idx].astype(np.int64))
+                data.append(np.ones(idx.size))
+                offset += len(state)
+            elif kind == "hashing":
+                idx = np.flatnonzero(s.notna().to_numpy())
+                hashed = pd.util.hash_array(s.iloc[idx].astype(str).to_numpy(dtype=object))
+                rows.append(idx)
+                cols.append(offset + (hashed % np.uint64(self.n_hash_features)).astype(np.int64))
+                data.append(np.ones(idx.size))
+                offset += self.n_hash_features
+            elif kind == "frequency":
+                positions = state.index.get_indexer(s)
+                values = np.where(positions >= 0, state.to_numpy(dtype=np.float64)[positions], 0.0)
+                idx = np.flatnonzero(values)
+                rows.append(idx)
+                cols.append(np.full(idx.size, offset))
+                data.append(values[idx])
+                offset += 1
+            else:  # target
+                block = (target_blocks or {}).get(col)
+                if block is None:
+                    block = self._target_block(state, s)
+                r, c = np.nonzero(block)
+                rows.append(r)
+                cols.append(offset + c)
+                data.append(block[r, c])
+                offset += len(self.classes_)
+        matrix = sp.coo_matrix(
+            (np.concatenate(data) if data else np.empty(0),
+             (np.concatenate(rows) if rows else np.empty(0, dtype=np.int64),
+              np.concatenate(cols) if cols else np.empty(0, dtype=np.int64))),
+            shape=(n, offset),
+            dtype=self.dtype,
+        )
+        return matrix.tocsr()
+
+    def get_feature_names_out(self, input_features: Optional[List[str]] = None) -> np.ndarray:
+        return np.asarray(self.feature_names_, dtype=object)
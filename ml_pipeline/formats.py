@@ -0,0 +1,410 @@
+"""Input formats: CSV, Parquet, Feather / Arrow IPC and ``.npy``, picked by file extension.
+
+Columnar formats skip text parsing entirely and read only the requested
+columns:
+
+- Parquet: row filters are pushed down to row groups, so groups whose
+  min/max statistics cannot match are never read, and ``sample`` picks whole
+  row groups at random instead of reading everything and subsampling.
+- Feather / Arrow IPC: the file is memory-mapped; uncompressed files are read
+  zero-copy and only the selected columns and rows are materialized.
+- ``.npy``: loaded with ``mmap_mode="r"``. Structured arrays expose their
+  field names as columns, plain 2-D arrays columns ``"0"``, ``"1"``, ...
+
+``convert_to_parquet`` writes a CSV to Parquet chunk by chunk, and
+``cached_parquet`` keeps one converted copy per CSV (keyed by path, size and
+modification time) so repeated runs on the same CSV parse it only once.
+Parquet and Feather need the optional ``pyarrow`` dependency.
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .constants import DEFAULT_CHUNKSIZE, INPUT_FORMATS
+from .logging_utils import get_logger
+from .timing import timed
+
+logger = get_logger("formats")
+
+SUFFIX_FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+    ".npy": "npy",
+}
+FILTER_OPS = ("==", "=", "!=", "<", "<=", ">", ">=", "in", "not in")
+DEFAULT_ROW_GROUP_SIZE = 100_000
+_FILTER = re.compile(r"^\s*(.+?)\s*(==|!=|<=|>=|=|<|>|\bnot in\b|\bin\b)\s*(.+?)\s*$")
+
+Filter = Tuple[str, str, Any]
+
+
+def detect_format(file_path) -> str:
+    """Format name from the file extension; anything unrecognised is read as CSV."""
+    return SUFFIX_FORMATS.get(Path(str(file_path)).suffix.lower(), "csv")
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"Reading {fmt} files requires pyarrow. Install with: pip install ml-autopipeline[parquet]")
+
+
+def parse_filter(expr) -> Filter:
+    """``"age >= 30"`` / ``'city in ["a", "b"]'`` (or a ``(column, op, value)`` sequence) -> tuple.
+
+    Values are parsed as JSON when possible (numbers, quoted strings, lists),
+    otherwise kept as the raw string.
+    """
+    if not isinstance(expr, str):
+        column, op, value = expr
+    else:
+        m = _FILTER.match(expr)
+        if not m:
+            raise ValueError(f"Cannot parse filter {expr!r}; expected '<column> <op> <value>'")
+        column, op, raw = m.groups()
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+    op = "==" if op == "=" else op
+    if op not in FILTER_OPS:
+        raise ValueError(f"Unknown filter operator {op!r}; expected one of {FILTER_OPS}")
+    if op in ("in", "not in") and not isinstance(value, (list, tuple, set)):
+        raise ValueError(f"Filter {column} {op} needs a list of values")
+    return column, op, value
+
+
+def normalize_filters(filters) -> Optional[List[Filter]]:
+    """Filters are AND-ed; accepts one expression or a list of expressions / tuples."""
+    if not filters:
+        return None
+    if isinstance(filters, str) or (len(filters) == 3 and isinstance(filters[1], str) and filters[1] in FILTER_OPS):
+        filters = [filters]
+    return [parse_filter(f) for f in filters]
+
+
+def filter_mask(df: pd.DataFrame, filters: Sequence[Filter]) -> np.ndarray:
+    """Boolean row mask for AND-ed ``(column, op, value)`` filters."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        s = df[column]
+        if op == "==":
+            m = s == value
+        elif op == "!=":
+            m = s != value
+        elif op == "<":
+            m = s < value
+        elif op == "<=":
+            m = s <= value
+        elif op == ">":
+            m = s > value
+        elif op == ">=":
+            m = s >= value
+        elif op == "in":
+            m = s.isin(list(value))
+        else:
+            m = ~s.isin(list(value))
+        mask &= np.asarray(m, dtype=bool)
+    return mask
+
+
+def columns_to_read(usecols, filters):
+    """Columns to read: the requested ones plus any only referenced by filters."""
+    if usecols is None:
+        return None, []
+    usecols = list(usecols)
+    extra = [c for c, _, _ in filters or [] if c not in usecols]
+    return usecols + list(dict.fromkeys(extra)), extra
+
+
+def select_rows(df, filters, sample, rng, drop=()):
+    """Sample then filter the rows of an in-memory frame and drop filter-only columns."""
+    if sample is not None and sample < 1:
+        df = df[rng.random(len(df)) < sample]
+    if filters:
+        df = df[filter_mask(df, filters)]
+    if drop:
+        df = df.drop(columns=list(drop))
+    return df
+
+
+def check_sample(sample):
+    if sample is not None and not 0 < sample <= 1:
+        raise ValueError("sample must be a fraction in (0, 1]")
+
+
+def read_table(
+    file_path,
+    usecols: Optional[Sequence[str]] = None,
+    filters=None,
+    sample: Optional[float] = None,
+    random_state: int = 42,
+    fmt: Optional[str] = None,
+) -> pd.DataFrame:
+    """Read ``file_path`` into a DataFrame with column pruning, row filters and sampling.
+
+    Parameters:
+        file_path: CSV, Parquet, Feather / Arrow IPC or ``.npy`` file
+        usecols: Only return these columns
+        filters: AND-ed ``"col op value"`` strings or ``(col, op, value)``
+            tuples; pushed down to row groups for Parquet
+        sample: Fraction of rows to keep. Parquet samples whole row groups
+            (and rows within the last one picked), other formats sample rows
+            independently
+        random_state: Seed for ``sample``
+        fmt: Override the format detected from the extension
+    """
+    fmt = fmt or detect_format(file_path)
+    if fmt not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format {fmt!r}; expected one of {INPUT_FORMATS}")
+    check_sample(sample)
+    filters = normalize_filters(filters)
+    rng = np.random.default_rng(random_state)
+    logger.info(f"Reading {fmt} {file_path} columns={usecols} filters={filters} sample={sample}")
+    with timed(f"read_{fmt}"):
+        df = _READERS[fmt](file_path, usecols, filters, sample, rng)
+    logger.debug("Read shape=%s from %s", df.shape, file_path)
+    return df
+
+
+def _read_csv(file_path, usecols, filters, sample, rng):
+    columns, extra = columns_to_read(usecols, filters)
+    skiprows = None
+    if sample is not None and sample < 1:
+        # Rows are dropped before parsing their fields
+        skiprows = lambda i: i > 0 and rng.random() >= sample  # noqa: E731
+    df = pd.read_csv(file_path, usecols=columns, skiprows=skiprows)
+    return select_rows(df, filters, None, rng, extra)
+
+
+def _read_parquet(file_path, usecols, filters, sample, rng):
+    _require_pyarrow("parquet")
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    import pyarrow.compute as pc
+
+    dataset = ds.dataset(str(file_path), format="parquet")
+    expr = pq.filters_to_expression(filters) if filters else None
+    # Every file of a directory / multi-file dataset; row groups whose statistics
+    # cannot satisfy the filter are pruned here
+    groups, total = [], 0
+    for fragment in dataset.get_fragments():
+        split = fragment.split_by_row_group(expr) if expr is not None else fragment.split_by_row_group()
+        groups.extend(split)
+        total += len(fragment.row_groups) if fragment.row_groups is not None else len(split)
+    # Fraction of the last picked group's rows to keep so the sample has about sample * rows rows
+    keep_last, last = 1.0, None
+    if sample is not None and sample < 1 and groups:
+        target = sample * sum(g.row_groups[0].num_rows for g in groups)
+        order = rng.permutation(len(groups))
+        picked, rows = [], 0
+        for i in order:
+            if rows >= target:
+                break
+            n = groups[i].row_groups[0].num_rows
+            keep_last = min(1.0, (target - rows) / n) if n else 1.0
+            picked.append(i)
+            rows += n
+        last = sorted(picked).index(picked[-1])
+        groups = [groups[i] for i in sorted(picked)]
+    logger.debug("Reading %d of %d row groups from %s", len(groups), total, file_path)
+    columns = list(usecols) if usecols is not None else None
+    tables = [g.to_table(columns=columns, filter=expr) for g in groups]
+    if keep_last < 1:  # one row group can be larger than the whole sample
+        tables[last] = tables[last].filter(pc.less(rng.random(tables[last].num_rows), keep_last))
+    table = pa.concat_tables(tables) if tables else dataset.schema.empty_table()
+    if not tables and columns is not None:
+        table = table.select(columns)
+    return table.to_pandas()
+
+
+def _ipc_table(file_path):
+    import pyarrow as pa
+
+    source = pa.memory_map(str(file_path), "r")
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:  # stream format rather than file format
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+
+def _read_feather(file_path, usecols, filters, sample, rng):
+    _require_pyarrow("feather")
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    table = _ipc_table(file_path)
+    columns, extra = columns_to_read(usecols, filters)
+    if columns is not None:
+        table = table.select(columns)
+    if sample is not None and sample < 1:
+        table = table.filter(pc.less(rng.random(table.num_rows), sample))
+    if filters:
+        table = table.filter(pq.filters_to_expression(filters))
+    if extra:
+        table = table.drop_columns(extra)
+    return table.to_pandas()
+
+
+def _npy_columns(arr) -> List[str]:
+    if arr.dtype.names:
+        return list(arr.dtype.names)
+    if arr.ndim != 2:
+        raise ValueError(f"Expected a 2-D or structured .npy array, got shape {arr.shape}")
+    return [str(i) for i in range(arr.shape[1])]
+
+
+def _npy_frame(arr, columns):
+    if arr.dtype.names:
+        return pd.DataFrame({c: arr[c] for c in columns})
+    names = _npy_columns(arr)
+    idx = [names.index(c) for c in columns]
+    return pd.DataFrame(arr[:, idx], columns=columns)
+
+
+def _read_npy(file_path, usecols, filters, sample, rng):
+    arr = np.load(file_path, mmap_mode="r")
+    names = _npy_columns(arr)
+    columns, extra = columns_to_read(usecols, filters)
+    columns = columns if columns is not None else names
+    if sample is not None and sample < 1:
+        # Index the memory map before materializing so unsampled rows are never read
+        arr = arr[np.flatnonzero(rng.random(len(arr)) < sample)]
+    return select_rows(_npy_frame(arr, columns), filters, None, rng, extra)
+
+
+_READERS = {"csv": _read_csv, "parquet": _read_parquet, "feather": _read_feather, "npy": _read_npy}
+
+
+def iter_chunks(file_path, chunksize: int = DEFAULT_CHUNKSIZE, usecols=None, fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of at most ``chunksize`` rows from any supported format."""
+    fmt = fmt or detect_format(file_path)
+    if fmt == "csv":
+        yield from pd.read_csv(file_path, usecols=usecols, chunksize=chunksize)
+    elif fmt == "parquet":
+        _require_pyarrow(fmt)
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(str(file_path), memory_map=True)
+        for batch in pf.iter_batches(batch_size=chunksize, columns=list(usecols) if usecols is not None else None):
+            yield batch.to_pandas()
+    elif fmt == "feather":
+        _require_pyarrow(fmt)
+        table = _ipc_table(file_path)
+        if usecols is not None:
+            table = table.select(list(usecols))
+        for start in range(0, table.num_rows, chunksize):
+            yield table.slice(start, chunksize).to_pandas()
+    elif fmt == "npy":
+        arr = np.load(file_path, mmap_mode="r")
+        columns = list(usecols) if usecols is not None else _npy_columns(arr)
+        for start in range(0, len(arr), chunksize):
+            yield _npy_frame(arr[start:start + chunksize], columns)
+    else:
+        raise ValueError(f"Unknown input format {fmt!r}; expected one of {INPUT_FORMATS}")
+
+
+def _widen(schema, table):
+    """Schema accepting both ``schema`` and ``table`` (ints widen to float64, otherwise string)."""
+    import pyarrow as pa
+
+    fields = []
+    for field in schema:
+        other = table.schema.field(field.name).type
+        t = field.type
+        if t != other:
+            if pa.types.is_null(t):
+                t = other
+            elif pa.types.is_null(other):
+                pass
+            elif (pa.types.is_integer(t) or pa.types.is_floating(t)) and (pa.types.is_integer(other) or pa.types.is_floating(other)):
+                t = pa.float64()
+            else:
+                t = pa.string()
+        fields.append(pa.field(field.name, t))
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def convert_to_parquet(
+    csv_path,
+    output_path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = "snappy",
+) -> Path:
+    """Convert a CSV to Parquet one chunk at a time; returns ``output_path``.
+
+    Column types come from the first chunk. If a later chunk does not fit
+    (e.g. an integer column gains missing values), the schema is widened and
+    the conversion restarts, so memory stays bounded by the chunk size.
+    """
+    _require_pyarrow("parquet")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    schema = None
+    with timed("convert_parquet"):
+        while True:
+            writer = None
+            restart = False
+            rows = 0
+            try:
+                for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if schema is None:
+                        schema = table.schema
+                    try:
+                        table = table.cast(schema)
+                    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                        schema = _widen(schema, table)
+                        logger.info(f"Column types changed after {rows} rows; restarting conversion with {schema.types}")
+                        restart = True
+                        break
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp, schema, compression=compression)
+                    writer.write_table(table, row_group_size=row_group_size)
+                    rows += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+            if not restart:
+                break
+        if writer is None:  # header-only CSV
+            pq.write_table(pa.Table.from_pandas(pd.read_csv(csv_path), preserve_index=False), tmp)
+        tmp.replace(output_path)
+    logger.info(f"Converted {csv_path} to {output_path} ({rows} rows)")
+    return output_path
+
+
+def cached_parquet(csv_path, cache_dir=None, **convert_kwargs) -> Path:
+    """Path to a Parquet copy of ``csv_path``, converting it on first use.
+
+    The copy lives in ``<cache_dir>/parquet`` (default: the model cache
+    directory) and is keyed by the CSV's resolved path, size and modification
+    time, so an edited CSV is converted again.
+    """
+    from .cache import default_cache_dir
+
+    src = Path(csv_path).resolve()
+    st = src.stat()
+    key = hashlib.blake2b(f"{src}|{st.st_size}|{st.st_mtime_ns}".encode(), digest_size=8).hexdigest()
+    path = Path(cache_dir or default_cache_dir()) / "parquet" / f"{src.stem}-{key}.parquet"
+    if path.exists():
+        logger.info(f"Using cached Parquet copy {path} of {csv_path}")
+        return path
+    return convert_to_parquet(src, path, **convert_kwargs)
@@ -0,0 +1,343 @@
+"""Incremental re-runs on append-only CSV files.
+
+``train_incremental`` keeps a state file next to the model cache (or at
+``state_path``) with:
+
+- the byte offset of the last complete line processed, the row count and a
+  BLAKE2b digest of every byte up to that offset
+- the mergeable EDA accumulators (``sketches.ColumnAccumulator``) and the
+  class counts
+- the feature layout (``streaming.ChunkFeaturizer``) and the fitted
+  ``partial_fit`` models, including a ``ChunkForest`` that grows trees per chunk
+- a bounded reservoir sample of held-out rows for evaluation
+
+On the next run the prefix is hashed again. If the digest and the run
+options still match, only the bytes appended since then are parsed. Their
+statistics are merged into the stored ones and the models are updated with
+``partial_fit``. Otherwise (file rewritten or truncated, different options, a
+class never seen before) the whole file is processed from scratch.
+
+A trailing line without a newline is treated as still being written and is
+left for the next run. Scaling statistics stay those of the first full run,
+so updated models keep seeing the same feature layout.
+"""
+import hashlib
+import io
+import json
+import os
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import ConvergenceWarning
+
+from .eda import accumulated_report
+from .formats import detect_format
+from .loading import DEFAULT_CHUNKSIZE
+from .logging_utils import get_logger
+from .metrics import base_metrics
+from .sketches import ColumnAccumulator
+from .streaming import ChunkFeaturizer, ChunkForest, _Scan, hash_split, streaming_models
+from .timing import timed
+
+logger = get_logger("incremental")
+
+STATE_VERSION = 1
+BLOCK_SIZE = 1 << 20
+DEFAULT_HOLDOUT_ROWS = 100_000
+
+
+def incremental_models(random_state: int = 42) -> Dict[str, Any]:
+    """``streaming_models`` plus a ``ChunkForest`` (a random forest that adds trees for new rows)."""
+    return {**streaming_models(random_state), "Random Forest": ChunkForest(random_state=random_state)}
+
+
+def default_state_path(file_path, cache_dir=None, **options) -> Path:
+    """``<cache_dir>/incremental/<stem>-<hash>.joblib``, keyed by the resolved path and run options."""
+    from .cache import default_cache_dir
+
+    src = Path(file_path).resolve()
+    key = hashlib.blake2b(f"{src}|{json.dumps(options, sort_keys=True, default=str)}".encode(), digest_size=8).hexdigest()
+    return Path(cache_dir or default_cache_dir()) / "incremental" / f"{src.stem}-{key}.joblib"
+
+
+def complete_size(file_path) -> int:
+    """Bytes up to and including the last newline of ``file_path``."""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as fh:
+        pos = size
+        while pos > 0:
+            step = min(BLOCK_SIZE, pos)
+            fh.seek(pos - step)
+            newline = fh.read(step).rfind(b"\n")
+            if newline >= 0:
+                return pos - step + newline + 1
+            pos -= step
+    return 0
+
+
+def _digest(file_path, nbytes):
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as fh:
+        remaining = nbytes
+        while remaining > 0:
+            block = fh.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+class _Slice(io.RawIOBase):
+    """Read-only view of ``[start, end)`` of a file that feeds every byte read to ``hasher`` (if any)."""
+
+    def __init__(self, fh, start, end, hasher):
+        self.fh = fh
+        self.fh.seek(start)
+        self.remaining = end - start
+        self.hasher = hasher
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.fh.readinto(memoryview(buffer)[:min(len(buffer), self.remaining)])
+        if n:
+            self.remaining -= n
+            if self.hasher is not None:
+                self.hasher.update(memoryview(buffer)[:n])
+        return n
+
+
+def _read_chunks(file_path, start, end, hasher, chunksize, usecols=None, columns=None):
+    """Parse ``[start, end)`` of a CSV chunk by chunk; ``columns`` names a headerless tail."""
+    with open(file_path, "rb") as fh:
+        stream = io.BufferedReader(_Slice(fh, start, end, hasher), buffer_size=BLOCK_SIZE)
+        header = dict(header=0) if columns is None else dict(header=None, names=columns)
+        yield from pd.read_csv(stream, chunksize=chunksize, usecols=usecols, **header)
+
+
+class _NewClass(Exception):
+    pass
+
+
+def _reservoir_add(state, rows: pd.DataFrame, capacity: int) -> None:
+    """Algorithm R over the held-out rows: a uniform sample of at most ``capacity`` rows."""
+    if rows.empty:
+        return
+    holdout, seen = state["holdout"], state["holdout_seen"]
+    free = max(0, capacity - (0 if holdout is None else len(holdout)))
+    if free:
+        head = rows.iloc[:free]
+        holdout = head.reset_index(drop=True) if holdout is None else pd.concat([holdout, head], ignore_index=True)
+        rows = rows.iloc[free:]
+        seen += len(head)
+    if len(rows):
+        slots = state["rng"].integers(0, seen + np.arange(1, len(rows) + 1))
+        keep = pd.Series(np.arange(len(rows)), index=slots)[slots < capacity]
+        keep = keep[~keep.index.duplicated(keep="last")]  # a later row replaces an earlier one in the same slot
+        # Slots are interchangeable, so replaced rows can be dropped and the new ones appended
+        holdout = pd.concat([holdout.drop(index=keep.index), rows.iloc[keep.to_numpy()]], ignore_index=True)
+        seen += len(rows)
+    state["holdout"], state["holdout_seen"] = holdout, seen
+
+
+def _consume(state, chunks, target, capacity, eda=True, fit=True, scan=None):
+    """Feed chunks to the EDA statistics (``eda``), ``scan``, and the models and holdout (``fit``); return the row count."""
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        logger.debug("Chunk of %d rows (%d so far)", len(chunk), rows)
+        if eda:
+            for col in state["read_columns"]:
+                state["accumulators"][col].update(chunk[col])
+            for value, count in chunk[target].value_counts().items():
+                state["class_counts"][value] = state["class_counts"].get(value, 0) + int(count)
+            if state["head"] is None:
+                state["head"] = chunk.head().to_dict(orient="records")
+        labelled = chunk[chunk[target].notna()]
+        if scan is not None:
+            scan.update(labelled)
+        if not fit or labelled.empty:
+            continue
+        unseen = set(labelled[target].unique().tolist()) - set(state["classes"].tolist())
+        if unseen:
+            raise _NewClass(f"new classes {sorted(unseen, key=str)}")
+        test = hash_split(labelled, state["options"]["test_size"], state["options"]["random_state"])
+        train = labelled[~test]
+        if not train.empty:
+            X, y = state["featurizer"].transform(train), train[target].to_numpy()
+            for model in state["models"].values():
+                model.partial_fit(X, y, classes=state["classes"])
+        _reservoir_add(state, labelled[test], capacity)
+    return rows
+
+
+def _new_state(options, models, columns, read_columns):
+    return {
+        "version": STATE_VERSION, "options": options, "offset": 0, "digest": None, "rows": 0,
+        "columns": columns, "read_columns": read_columns, "head": None, "class_counts": {},
+        "accumulators": {c: ColumnAccumulator() for c in read_columns},
+        "models": models, "holdout": None, "holdout_seen": 0,
+        "rng": np.random.default_rng(options["random_state"]),
+    }
+
+
+def _full_run(file_path, end, target, options, models, chunksize, usecols, capacity):
+    columns = pd.read_csv(file_path, nrows=0).columns.tolist()
+    read_columns = [c for c in columns if usecols is None or c in usecols]
+    state = _new_state(options, models, columns, read_columns)
+    scan = _Scan(target, options["test_size"], options["random_state"])
+    hasher = hashlib.blake2b(digest_size=20)
+    with timed("incremental_scan"):
+        state["rows"] = _consume(state, _read_chunks(file_path, 0, end, hasher, chunksize, usecols), target,
+                                 capacity, fit=False, scan=scan)
+    classes, numeric, categorical, _ = scan.result(file_path)
+    state["classes"] = classes
+    state["featurizer"] = ChunkFeaturizer(numeric, categorical, options["n_hash_features"])
+    with timed("incremental_fit"):
+        _consume(state, _read_chunks(file_path, 0, end, None, chunksize, usecols), target, capacity, eda=False)
+    state["offset"], state["digest"] = end, hasher.hexdigest()
+    return state
+
+
+def _update(state, file_path, end, hasher, target, chunksize, usecols, capacity):
+    """Parse ``[offset, end)`` once: merge its statistics and update the models and holdout."""
+    stored, state["accumulators"] = state["accumulators"], {c: ColumnAccumulator() for c in state["read_columns"]}
+    with timed("incremental_update"):
+        chunks = _read_chunks(file_path, state["offset"], end, hasher, chunksize, usecols, state["columns"])
+        rows = _consume(state, chunks, target, capacity)
+    for col, acc in state["accumulators"].items():
+        stored[col].merge(acc)
+    state["accumulators"] = stored
+    state["rows"] += rows
+    state["offset"], state["digest"] = end, hasher.hexdigest()
+    return rows
+
+
+def _evaluate(state, target, extended_metrics):
+    holdout = state["holdout"]
+    if holdout is None or holdout.empty:
+        raise ValueError("No held-out rows; increase test_size")
+    classes = state["classes"]
+    n = len(classes)
+    X = state["featurizer"].transform(holdout)
+    true = np.searchsorted(classes, holdout[target].to_numpy())
+    results = {}
+    for name, model in state["models"].items():
+        pred = np.searchsorted(classes, model.predict(X))
+        cm = np.bincount(true * n + pred, minlength=n * n).reshape(n, n)
+        results[name] = base_metrics(cm)
+        if extended_metrics:
+            results[name]["confusion_matrix"] = cm.tolist()
+        logger.info(f"Completed {name}: Acc={results[name]['Accuracy']:.3f} F1={results[name]['F1 Score']:.3f}")
+    return results
+
+
+def _save_state(state, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    joblib.dump(state, tmp)
+    tmp.replace(path)
+
+
+def train_incremental(
+    file_path,
+    target: str,
+    state_path=None,
+    cache_dir=None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    test_size: float = 0.3,
+    random_state: int = 42,
+    usecols=None,
+    n_hash_features: int = 1024,
+    models: Optional[Dict[str, Any]] = None,
+    holdout_rows: int = DEFAULT_HOLDOUT_ROWS,
+    extended_metrics: bool = False,
+    full: bool = False,
+) -> Dict[str, Any]:
+    """EDA, class counts and ``partial_fit`` models for an append-only CSV, updated from its new rows only.
+
+    Parameters:
+        file_path: Uncompressed CSV that only ever grows at the end
+        target: Target column; rows with a missing target are counted but not trained on
+        state_path: State file (default: ``default_state_path(file_path, cache_dir, ...)``)
+        cache_dir: Base directory for the default state path
+        chunksize, test_size, random_state, usecols, n_hash_features: As in ``train_streaming``
+        models: ``{name: estimator}`` with ``partial_fit`` for the first run;
+            defaults to ``incremental_models(random_state)``. Later runs
+            update the stored models
+        holdout_rows: Size of the reservoir sample of hash-split test rows
+            the models are evaluated on
+        extended_metrics: If True, include the confusion matrix
+        full: Ignore any stored state and process the whole file
+
+    Returns ``{"mode": "full" | "incremental" | "unchanged", "rows", "new_rows",
+    "state_path", "eda", "results"}``. ``eda`` has the ``streaming_report``
+    layout including ``class_distribution``, and ``results`` maps each model
+    to its metrics on the holdout sample.
+    """
+    if detect_format(file_path) != "csv" or str(file_path).lower().endswith((".gz", ".bz2", ".zip", ".xz", ".zst")):
+        raise ValueError(f"Incremental runs need an uncompressed, append-only CSV; got {file_path}")
+    usecols = list(usecols) if usecols is not None else None
+    options = {"target": target, "usecols": usecols, "test_size": test_size, "random_state": random_state,
+               "n_hash_features": n_hash_features, "models": sorted(models) if models is not None else None}
+    state_path = Path(state_path) if state_path else default_state_path(file_path, cache_dir, **options)
+    end = complete_size(file_path)
+    state = None
+    if not full and state_path.exists():
+        try:
+            state = joblib.load(state_path)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable incremental state {state_path}: {e}")
+    reason = None
+    if state is not None:
+        if state.get("version") != STATE_VERSION or state["options"] != options:
+            reason = "run options changed"
+        elif end < state["offset"]:
+            reason = "file is shorter than the processed prefix"
+    hasher = None
+    if state is not None and reason is None:
+        with timed("incremental_verify"):
+            hasher = _digest(file_path, state["offset"])
+        if hasher.hexdigest() != state["digest"]:
+            reason = "already processed bytes changed"
+    if reason is not None:
+        logger.warning(f"Incremental state {state_path} does not match ({reason}); processing the whole file")
+        state = None
+
+    mode, new_rows = "unchanged", 0
+    if state is not None and end > state["offset"]:
+        new_bytes = end - state["offset"]
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=ConvergenceWarning)
+            try:
+                new_rows = _update(state, file_path, end, hasher, target, chunksize, usecols, holdout_rows)
+                mode = "incremental"
+                logger.info(f"Incremental run: {new_rows} new rows ({new_bytes:,} bytes) after {state['rows'] - new_rows} rows")
+            except _NewClass as e:
+                logger.warning(f"Appended rows contain {e}; processing the whole file")
+                state = None
+    if state is None:
+        mode = "full"
+        if models is None:
+            models = incremental_models(random_state)
+        logger.info(f"Full run on {file_path} ({end:,} bytes) models={list(models)}")
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=ConvergenceWarning)
+            state = _full_run(file_path, end, target, options, models, chunksize, usecols, holdout_rows)
+        new_rows = state["rows"]
+    if mode == "unchanged":
+        logger.info(f"No rows appended to {file_path} since the last run")
+    else:
+        with timed("incremental_evaluate"):
+            state["results"] = _evaluate(state, target, extended_metrics)
+        _save_state(state, state_path)
+    eda = accumulated_report(state["read_columns"], state["accumulators"], state["rows"], state["head"] or [],
+                             state["class_counts"])
+    return {"mode": mode, "rows": state["rows"], "new_rows": new_rows, "state_path": str(state_path),
+            "eda": eda, "results": state["results"]}
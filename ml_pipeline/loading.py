@@ -0,0 +1,249 @@
+import importlib.util
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+    is_object_dtype,
+    is_string_dtype,
+)
+
+from .constants import DEFAULT_CHUNKSIZE
+from .formats import check_sample, columns_to_read, detect_format, normalize_filters, read_table, select_rows
+from .logging_utils import get_logger
+from .timing import _max_rss_bytes
+
+logger = get_logger("loading")
+
+DEFAULT_SAMPLE_ROWS = 100_000
+# Bytes of CSV text per pyarrow record batch; one batch is the largest uncompacted piece
+PYARROW_BLOCK_BYTES = 4 << 20
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def infer_categorical_columns(
+    file_path,
+    usecols: Optional[Sequence[str]] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    category_threshold: float = 0.5,
+) -> List[str]:
+    """Sample the file and return string columns worth storing as ``category``.
+
+    A column qualifies when its distinct count in the sample is at most
+    ``category_threshold`` times the number of sampled (non-null) values.
+    """
+    sample = pd.read_csv(file_path, usecols=usecols, nrows=sample_rows)
+    categorical = _categorical_in_sample(sample, category_threshold)
+    logger.debug("Categorical columns inferred from %d sampled rows: %s", len(sample), categorical)
+    return categorical
+
+
+def _arrow_chunks(file_path, sample: pd.DataFrame):
+    """Yield the CSV as DataFrames, one per pyarrow record batch of about ``PYARROW_BLOCK_BYTES``.
+
+    Column types come from the pandas-parsed ``sample`` instead of per-block
+    inference, so every batch converts the way the C engine would. A value
+    that does not fit them raises ``pyarrow.ArrowInvalid`` (a ValueError).
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    types = {}
+    for col, dtype in sample.dtypes.items():
+        if is_bool_dtype(dtype):
+            types[col] = pa.bool_()
+        elif is_integer_dtype(dtype):
+            types[col] = pa.int64()
+        elif is_float_dtype(dtype):
+            types[col] = pa.float64()
+        else:
+            types[col] = pa.string()
+    reader = pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(block_size=PYARROW_BLOCK_BYTES),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(sample.columns), column_types=types, strings_can_be_null=True,
+        ),
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+
+def _read_compact(reader, categorical, downcast_floats, filters, sample, rng, extra):
+    """Compact every chunk of ``reader``; returns (original bytes per column, compacted chunks)."""
+    original: Dict[str, int] = {}
+    chunks: List[pd.DataFrame] = []
+    for chunk in reader:
+        chunk = select_rows(chunk, filters, sample, rng, extra)
+        for col, nbytes in chunk.memory_usage(deep=True, index=False).items():
+            original[col] = original.get(col, 0) + int(nbytes)
+        chunks.append(_compact_frame(chunk, categorical, downcast_floats))
+    return original, chunks
+
+
+def _categorical_in_sample(sample: pd.DataFrame, category_threshold: float) -> List[str]:
+    categorical = []
+    for col in sample.columns:
+        s = sample[col]
+        if not (is_object_dtype(s.dtype) or is_string_dtype(s.dtype)):
+            continue
+        non_null = int(s.notna().sum())
+        if non_null and s.nunique(dropna=True) <= category_threshold * non_null:
+            categorical.append(col)
+    return categorical
+
+
+def _compact_frame(df: pd.DataFrame, categorical: Sequence[str], downcast_floats: bool) -> pd.DataFrame:
+    for col in df.columns:
+        s = df[col]
+        if col in categorical:
+            df[col] = s.astype("category")
+        elif is_bool_dtype(s.dtype):
+            continue
+        elif is_integer_dtype(s.dtype):
+            df[col] = pd.to_numeric(s, downcast="integer")
+        elif downcast_floats and is_float_dtype(s.dtype):
+            df[col] = pd.to_numeric(s, downcast="float")
+    return df
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    if len(chunks) == 1:
+        return chunks[0]
+    # Align categories first so pd.concat keeps the columns categorical instead of
+    # falling back to object dtype
+    for col in chunks[0].columns:
+        if not isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            continue
+        categories = pd.Index([])
+        for ch in chunks:
+            categories = categories.union(ch[col].cat.categories)
+        for ch in chunks:
+            ch[col] = ch[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_data_optimized(
+    file_path,
+    usecols: Optional[Sequence[str]] = None,
+    chunksize: Optional[int] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    category_threshold: float = 0.5,
+    downcast_floats: bool = True,
+    engine: str = "auto",
+    filters=None,
+    sample: Optional[float] = None,
+    random_state: int = 42,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Load a file with compact dtypes and report the memory saved.
+
+    A sample decides which string columns become ``category``; integers and
+    floats are downcast per chunk so the default int64/float64/object
+    representation only ever exists for one chunk at a time. With pyarrow the
+    chunks are record batches of ``PYARROW_BLOCK_BYTES`` of CSV text, parsed
+    with the sample's column types; if a later value does not fit them the
+    file is re-read with the C engine.
+
+    Parameters:
+        file_path: CSV path
+        usecols: Only read these columns
+        chunksize: Rows per chunk. None streams pyarrow record batches when
+            pyarrow is installed, otherwise chunks of DEFAULT_CHUNKSIZE rows
+        sample_rows: Rows sampled to detect low-cardinality string columns
+        category_threshold: Max distinct/non-null ratio for ``category``
+        downcast_floats: Downcast float64 to float32 where values fit
+        engine: "auto", "c" or "pyarrow"
+        filters: Row filters (see ``formats.read_table``), applied per chunk
+        sample: Fraction of rows to keep, applied per chunk
+        random_state: Seed for ``sample``
+
+    Columnar inputs (Parquet, Feather, ``.npy``) are read with
+    ``formats.read_table`` and compacted afterwards; ``engine`` and
+    ``chunksize`` only apply to CSV.
+
+    Returns:
+        (DataFrame, report) where report has per-column original/optimized/saved
+        bytes, totals, the engine used and peak RSS.
+    """
+    usecols = list(usecols) if usecols is not None else None
+    filters = normalize_filters(filters)
+    check_sample(sample)
+    fmt = detect_format(file_path)
+    if fmt != "csv":
+        df = read_table(file_path, usecols=usecols, filters=filters, sample=sample, random_state=random_state, fmt=fmt)
+        original = {c: int(n) for c, n in df.memory_usage(deep=True, index=False).items()}
+        categorical = _categorical_in_sample(df.head(sample_rows), category_threshold)
+        return _report(_compact_frame(df, categorical, downcast_floats), original, fmt)
+
+    columns, extra = columns_to_read(usecols, filters)
+    head = pd.read_csv(file_path, usecols=columns, nrows=sample_rows)
+    categorical = _categorical_in_sample(head, category_threshold)
+    logger.debug("Categorical columns inferred from %d sampled rows: %s", len(head), categorical)
+    rows = dict(filters=filters, sample=sample, extra=extra)
+
+    if engine == "auto":
+        engine = "pyarrow" if chunksize is None and pyarrow_available() else "c"
+    if engine == "pyarrow" and chunksize is not None:
+        logger.warning("pyarrow engine does not support chunked reads; using the C engine")
+        engine = "c"
+    logger.info(f"Loading {file_path} with compact dtypes engine={engine} chunksize={chunksize}")
+
+    if engine == "pyarrow":
+        try:
+            original, chunks = _read_compact(
+                _arrow_chunks(file_path, head), categorical, downcast_floats,
+                rng=np.random.default_rng(random_state), **rows,
+            )
+        except ValueError as e:  # pyarrow.ArrowInvalid
+            logger.warning(f"pyarrow could not parse {file_path} with the sampled column types ({e}); using the C engine")
+            engine = "c"
+    if engine == "c":
+        reader = pd.read_csv(file_path, usecols=columns, chunksize=chunksize or DEFAULT_CHUNKSIZE)
+        original, chunks = _read_compact(
+            reader, categorical, downcast_floats, rng=np.random.default_rng(random_state), **rows
+        )
+    del head
+    if not chunks:  # header-only file
+        df = pd.read_csv(file_path, usecols=usecols)
+    else:
+        df = _concat_chunks(chunks)
+    del chunks
+    return _report(df, original, engine)
+
+
+def _report(df: pd.DataFrame, original: Dict[str, int], engine: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    optimized = df.memory_usage(deep=True, index=False)
+    columns = {}
+    for col in df.columns:
+        before = original.get(col, int(optimized[col]))
+        after = int(optimized[col])
+        columns[col] = {
+            "dtype": str(df[col].dtype),
+            "original_bytes": before,
+            "optimized_bytes": after,
+            "saved_bytes": before - after,
+        }
+    report = {
+        "rows": len(df),
+        "engine": engine,
+        "columns": columns,
+        "original_bytes": sum(c["original_bytes"] for c in columns.values()),
+        "optimized_bytes": int(optimized.sum()),
+        "saved_bytes": sum(c["saved_bytes"] for c in columns.values()),
+        "peak_rss_bytes": _max_rss_bytes(),
+    }
+    logger.info(
+        f"Loaded shape={df.shape} memory {report['original_bytes']:,} -> {report['optimized_bytes']:,} bytes "
+        f"(saved {report['saved_bytes']:,}); peak RSS={report['peak_rss_bytes']}"
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        for col, info in columns.items():
+            logger.debug(f"  {col}: {info['dtype']} saved {info['saved_bytes']:,} bytes")
+    return df, report
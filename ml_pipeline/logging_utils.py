@@ -1,61 +1,324 @@
+import atexit
+import copy
 import logging
 import json
+import os
+import queue
+import threading
 import time
-from typing import Optional
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
 
 LOGGER_NAME = "ml_autopipeline"
+PLAIN_FORMAT = "[%(asctime)s] %(levelname)s - %(name)s: %(message)s"
+DEFAULT_BATCH_SIZE = 256
+
+# (trace_id, span_id) of the innermost active ``timing.span``
+CURRENT_SPAN: ContextVar[Optional[Tuple[str, str]]] = ContextVar("ml_autopipeline_span", default=None)
+
+# Background writer of queue mode and the active rate limits, see configure_logging
+_LISTENER: Optional[QueueListener] = None
+_LISTENER_LOCK = threading.Lock()
+_RATE_LIMIT: Optional["RateLimitFilter"] = None
+
+
+class SpanFilter(logging.Filter):
+    """Attach ``trace_id`` / ``span_id`` of the active stage span to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Already set when the record was enqueued on the logging thread (queue mode)
+        if not hasattr(record, "span_id"):
+            ctx = CURRENT_SPAN.get()
+            record.trace_id, record.span_id = ctx if ctx else (None, None)
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per logger for records at or below ``max_level`` (DEBUG by default).
+
+    ``rates`` maps logger names (with or without the ``ml_autopipeline.``
+    prefix) to messages per second. A name also covers its children, the
+    longest match wins, and every logger gets its own bucket, so
+    ``{"ml_autopipeline": 5}`` allows 5/s per module. Up to ``burst`` records
+    pass at once. The next record that passes after some were dropped says
+    how many.
+    """
+
+    def __init__(self, rates: Dict[str, float], burst: int = 10, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.rates = {self._qualify(name): float(rate) for name, rate in rates.items()}
+        self.burst = burst
+        self.max_level = max_level
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _qualify(name: str) -> str:
+        return name if name == LOGGER_NAME or name.startswith(LOGGER_NAME + ".") else f"{LOGGER_NAME}.{name}"
+
+    def _rate(self, name: str) -> Tuple[Optional[str], float]:
+        match = max((k for k in self.rates if name == k or name.startswith(k + ".")), key=len, default=None)
+        return match, self.rates.get(match, 0.0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Shared by several handlers in synchronous mode: decide once per record
+        decided = getattr(record, "rate_limited", None)
+        if decided is not None:
+            return not decided
+        limited = False
+        if record.levelno <= self.max_level:
+            key, rate = self._rate(record.name)
+            if key is not None:
+                now = time.monotonic()
+                with self._lock:
+                    bucket = self._buckets.setdefault(record.name, [float(self.burst), now, 0])
+                    bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * rate)
+                    bucket[1] = now
+                    if bucket[0] >= 1:
+                        bucket[0] -= 1
+                        if bucket[2]:
+                            record.msg = f"{record.msg} [{bucket[2]} similar messages suppressed]"
+                            bucket[2] = 0
+                    else:
+                        bucket[2] += 1
+                        limited = True
+        record.rate_limited = limited
+        return not limited
 
 class JsonFormatter(logging.Formatter):
+    # (second, formatted text) of the last record, reused across a burst. One tuple, read and
+    # replaced atomically, because handlers with different locks may share this formatter
+    _ts_cache = (None, "")
+
     def format(self, record: logging.LogRecord) -> str:
+        second = int(record.created)
+        cached_second, ts = self._ts_cache
+        if second != cached_second:
+            ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+            self._ts_cache = (second, ts)
         base = {
-            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)),
+            "ts": ts,
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
         if record.exc_info:
             base["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # rendered before the record was queued
+            base["exc_info"] = record.exc_text
+        if getattr(record, "span_id", None):
+            base["trace_id"] = record.trace_id
+            base["span_id"] = record.span_id
         return json.dumps(base, ensure_ascii=False)
 
+class BatchingFileHandler(logging.FileHandler):
+    """FileHandler that flushes every ``batch_size`` records instead of after each one.
+
+    In queue mode the listener also flushes whenever the queue runs empty, so
+    a burst is written with a few large writes and nothing waits in the
+    buffer once logging goes quiet.
+    """
+
+    def __init__(self, filename, batch_size: int = DEFAULT_BATCH_SIZE, encoding: str = "utf-8"):
+        super().__init__(filename, encoding=encoding)
+        self.batch_size = batch_size
+        self._pending = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self._pending += 1
+            if self._pending >= self.batch_size or record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self._pending = 0
+        super().flush()
+
+class _LazyQueueHandler(QueueHandler):
+    """Enqueue records without formatting them on the calling thread.
+
+    ``QueueHandler.prepare`` renders the message and traceback before
+    enqueueing. Here only arguments that could change before the listener
+    gets to them (anything but str / number / bool / None) are rendered
+    eagerly; %-style messages with plain arguments are formatted on the
+    listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args if isinstance(record.args, tuple) else (record.args,) if record.args else ()
+        if any(not isinstance(a, (str, int, float, bool, type(None))) for a in args):
+            # Same text for any other handler of this record, so no copy is needed
+            record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record = copy.copy(record)
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class _FlushingQueueListener(QueueListener):
+    """Flush batching handlers whenever the queue has been drained."""
+
+    def dequeue(self, block: bool):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                if isinstance(handler, BatchingFileHandler):
+                    handler.acquire()
+                    try:
+                        handler.flush()
+                    finally:
+                        handler.release()
+            return self.queue.get(block)
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """Return a child logger under the package root."""
     if name is None:
         return logging.getLogger(LOGGER_NAME)
     return logging.getLogger(f"{LOGGER_NAME}.{name}")
 
-def configure_logging(level: int = logging.INFO, json_logs: bool = False, log_file: Optional[str] = None):
+def _plain_formatter() -> logging.Formatter:
+    return logging.Formatter(PLAIN_FORMAT, datefmt="%H:%M:%S")
+
+def _output_handlers(logger: logging.Logger):
+    """Handlers that write output: the listener's in queue mode, the logger's otherwise."""
+    if _LISTENER is not None:
+        return list(_LISTENER.handlers)
+    return [h for h in logger.handlers if not isinstance(h, QueueHandler)]
+
+def _file_handler(log_file, formatter, batch_size):
+    handler = BatchingFileHandler(log_file, batch_size=batch_size)
+    handler.setFormatter(formatter)
+    handler.addFilter(SpanFilter())
+    return handler
+
+def _apply_rate_limit(logger: logging.Logger) -> None:
+    """Attach ``_RATE_LIMIT`` in front: to the queue handler (dropped records are never enqueued) or the outputs."""
+    front = [h for h in logger.handlers if isinstance(h, _LazyQueueHandler)] or _output_handlers(logger)
+    for h in set(logger.handlers) | set(_output_handlers(logger)):
+        for f in [f for f in h.filters if isinstance(f, RateLimitFilter)]:
+            h.removeFilter(f)
+        if _RATE_LIMIT is not None and h in front:
+            h.addFilter(_RATE_LIMIT)
+
+def _start_queue(logger: logging.Logger, batch_size: int) -> None:
+    """Move the output handlers behind a queue drained by a background thread."""
+    global _LISTENER
+    handlers = _output_handlers(logger)
+    for h in handlers:
+        if isinstance(h, BatchingFileHandler):
+            h.batch_size = batch_size
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    front = _LazyQueueHandler(records)
+    # Span ids come from a context variable of the calling thread: attach them before enqueueing
+    front.addFilter(SpanFilter())
+    for h in handlers:
+        logger.removeHandler(h)
+    logger.addHandler(front)
+    _LISTENER = _FlushingQueueListener(records, *handlers, respect_handler_level=True)
+    _LISTENER.start()
+
+def stop_queue_logging() -> None:
+    """Flush queued records and return to synchronous handlers (no-op unless in queue mode).
+
+    Registered with ``atexit``; call it before ``os._exit`` or to switch modes.
+    """
+    global _LISTENER
+    with _LISTENER_LOCK:
+        if _LISTENER is None:
+            return
+        listener, _LISTENER = _LISTENER, None
+        listener.stop()
+        _restore_handlers(listener)
+
+def _restore_handlers(listener: QueueListener) -> None:
+    logger = logging.getLogger(LOGGER_NAME)
+    for h in [h for h in logger.handlers if isinstance(h, _LazyQueueHandler)]:
+        logger.removeHandler(h)
+    for h in listener.handlers:
+        if isinstance(h, BatchingFileHandler):
+            h.batch_size = 1
+        h.flush()
+        logger.addHandler(h)
+
+def _before_fork() -> None:
+    # Flush buffered lines so the child does not inherit (and later rewrite) them
+    if _LISTENER is not None:
+        for h in _LISTENER.handlers:
+            h.acquire()
+            try:
+                h.flush()
+            finally:
+                h.release()
+
+def _after_fork_in_child() -> None:
+    # The listener thread does not survive fork: a forked child logs synchronously
+    global _LISTENER
+    if _LISTENER is not None:
+        listener, _LISTENER = _LISTENER, None
+        _restore_handlers(listener)
+
+atexit.register(stop_queue_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_before_fork, after_in_child=_after_fork_in_child)
+
+def configure_logging(level: int = logging.INFO, json_logs: bool = False, log_file: Optional[str] = None,
+                      queue_mode: bool = False, rate_limits: Optional[Dict[str, float]] = None,
+                      batch_size: int = DEFAULT_BATCH_SIZE):
     """Configure root package logger if not already configured.
 
     Safe to call multiple times; only adds handlers once.
+
+    With ``queue_mode=True`` the calling thread only enqueues records; a
+    background ``QueueListener`` formats them (``%``-style arguments included)
+    and writes them, flushing the log file every ``batch_size`` records or
+    when the queue drains. Once on, queue mode stays on for later calls
+    (``stop_queue_logging`` turns it off). ``rate_limits`` maps logger names to
+    DEBUG messages per second (see ``RateLimitFilter``); None keeps the
+    current limits and ``{}`` removes them.
     """
-    logger = logging.getLogger(LOGGER_NAME)
-    formatter: logging.Formatter
-    if json_logs:
-        formatter = JsonFormatter()
-    else:
-        formatter = logging.Formatter("[%(asctime)s] %(levelname)s - %(name)s: %(message)s", datefmt="%H:%M:%S")
-
-    # Only add handlers once (avoid duplication when CLI + library code)
-    if not logger.handlers:
-        stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(formatter)
-        logger.addHandler(stream_handler)
-        if log_file:
-            file_handler = logging.FileHandler(log_file, encoding="utf-8")
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-    else:
-        # Update formatters / level if already configured
-        for h in logger.handlers:
-            if json_logs and not isinstance(h.formatter, JsonFormatter):
-                h.setFormatter(JsonFormatter())
-            elif not json_logs and isinstance(h.formatter, JsonFormatter):
-                h.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s - %(name)s: %(message)s", datefmt="%H:%M:%S"))
-        if log_file and not any(isinstance(h, logging.FileHandler) for h in logger.handlers):
-            file_handler = logging.FileHandler(log_file, encoding="utf-8")
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-
-    logger.setLevel(level)
-    logger.propagate = False
-    return logger
+    global _RATE_LIMIT
+    with _LISTENER_LOCK:
+        logger = logging.getLogger(LOGGER_NAME)
+        formatter: logging.Formatter
+        if json_logs:
+            formatter = JsonFormatter()
+        else:
+            formatter = _plain_formatter()
+
+        # Only add handlers once (avoid duplication when CLI + library code)
+        if not logger.handlers:
+            stream_handler = logging.StreamHandler()
+            stream_handler.setFormatter(formatter)
+            stream_handler.addFilter(SpanFilter())
+            logger.addHandler(stream_handler)
+            if log_file:
+                logger.addHandler(_file_handler(log_file, formatter, 1))
+        else:
+            # Update formatters / level if already configured
+            for h in _output_handlers(logger):
+                if json_logs and not isinstance(h.formatter, JsonFormatter):
+                    h.setFormatter(JsonFormatter())
+                elif not json_logs and isinstance(h.formatter, JsonFormatter):
+                    h.setFormatter(_plain_formatter())
+            if log_file and not any(isinstance(h, logging.FileHandler) for h in _output_handlers(logger)):
+                file_handler = _file_handler(log_file, formatter, batch_size if _LISTENER is not None else 1)
+                if _LISTENER is not None:
+                    _LISTENER.handlers = _LISTENER.handlers + (file_handler,)
+                else:
+                    logger.addHandler(file_handler)
+
+        if queue_mode and _LISTENER is None:
+            _start_queue(logger, batch_size)
+        if rate_limits is not None:
+            _RATE_LIMIT = RateLimitFilter(rate_limits) if rate_limits else None
+        _apply_rate_limit(logger)
+
+        logger.setLevel(level)
+        logger.propagate = False
+        return logger
@@ -0,0 +1,117 @@
+"""Single-pass classification metrics.
+
+Labels are encoded once, the confusion matrix is built with one
+``np.bincount`` and accuracy / precision / recall / F1 are all derived from
+it, instead of each sklearn metric re-validating the labels and recounting.
+Results follow sklearn's definitions (``zero_division=0``).
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+AVERAGES = ("weighted", "macro")
+
+
+def encode_labels(y_true, y_pred) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (classes, true_codes, pred_codes) with classes sorted like sklearn's ``unique_labels``."""
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    if y_true.shape[0] != y_pred.shape[0]:
+        raise ValueError(f"Found inconsistent numbers of samples: {y_true.shape[0]} and {y_pred.shape[0]}")
+    classes, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+    codes = codes.reshape(-1)
+    return classes, codes[: y_true.shape[0]], codes[y_true.shape[0]:]
+
+
+def confusion_matrix_fast(y_true, y_pred) -> Tuple[np.ndarray, np.ndarray]:
+    """Confusion matrix (rows = true, cols = predicted) and its class labels."""
+    classes, t, p = encode_labels(y_true, y_pred)
+    n = len(classes)
+    cm = np.bincount(t * n + p, minlength=n * n).reshape(n, n)
+    return cm, classes
+
+
+def _divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    out = np.zeros(num.shape, dtype=np.float64)
+    mask = den != 0
+    out[mask] = num[mask] / den[mask]
+    return out
+
+
+def precision_recall_f1(cm: np.ndarray, average: str = "weighted") -> Tuple[float, float, float]:
+    """Averaged precision, recall and F1 from a confusion matrix."""
+    if average not in AVERAGES:
+        raise ValueError(f"Unsupported average={average!r}; expected one of {AVERAGES}")
+    tp = np.diag(cm).astype(np.float64)
+    pred_sum = cm.sum(axis=0)
+    true_sum = cm.sum(axis=1)
+    precision = _divide(tp, pred_sum)
+    recall = _divide(tp, true_sum)
+    # sklearn computes F1 as 2tp / (2tp + fn + fp) rather than from P and R
+    f1 = _divide(2 * tp, true_sum.astype(np.float64) + pred_sum)
+    weights = true_sum if average == "weighted" else None
+    return tuple(float(np.average(x, weights=weights)) for x in (precision, recall, f1))
+
+
+def base_metrics(cm: np.ndarray, average: str = "weighted") -> Dict[str, float]:
+    """The Accuracy / Precision / Recall / F1 Score dict reported by ``train_models``."""
+    precision, recall, f1 = precision_recall_f1(cm, average)
+    return {
+        "Accuracy": float(np.trace(cm) / cm.sum()),
+        "Precision": precision,
+        "Recall": recall,
+        "F1 Score": f1,
+    }
+
+
+def classification_metrics(y_true, y_pred) -> Dict[str, float]:
+    """Weighted and macro metrics from a single confusion matrix."""
+    cm, _ = confusion_matrix_fast(y_true, y_pred)
+    out = base_metrics(cm, "weighted")
+    p, r, f = precision_recall_f1(cm, "macro")
+    out.update({"Precision (macro)": p, "Recall (macro)": r, "F1 Score (macro)": f})
+    return out
+
+
+def _binary_auc(positive: np.ndarray, scores: np.ndarray) -> float:
+    """ROC AUC via the Mann-Whitney rank sum, using one sort of the scores (ties get average rank)."""
+    n_pos = int(positive.sum())
+    n_neg = positive.size - n_pos
+    if n_pos == 0 or n_neg == 0:
+        raise ValueError("Only one class present in y_true. ROC AUC score is not defined in that case.")
+    order = np.argsort(scores, kind="mergesort")
+    sorted_scores = scores[order]
+    # Average 1-based rank for each run of tied scores
+    boundaries = np.flatnonzero(np.diff(sorted_scores)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [scores.size]])
+    run_ranks = (starts + ends + 1) / 2.0
+    ranks = np.repeat(run_ranks, ends - starts)
+    rank_sum = ranks[positive[order]].sum()
+    return float((rank_sum - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+
+def roc_auc(y_true, y_score, average: str = "weighted") -> float:
+    """ROC AUC with ``roc_auc_score`` semantics.
+
+    1-D scores are treated as binary scores for the greater label; 2-D
+    probabilities use one-vs-rest averaged over classes (weighted by support or
+    macro), with the same validity checks sklearn applies.
+    """
+    y_true = np.asarray(y_true)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    classes, codes = np.unique(y_true, return_inverse=True)
+    codes = codes.reshape(-1)
+    if y_score.ndim == 1:
+        if len(classes) > 2:
+            raise ValueError("multi_class must be in ('ovo', 'ovr') for multiclass targets")
+        return _binary_auc(codes == len(classes) - 1, y_score)
+    if len(classes) == 2:
+        raise ValueError(f"y should be a 1d array, got an array of shape {y_score.shape} instead.")
+    if y_score.shape[1] != len(classes):
+        raise ValueError("Number of classes in y_true not equal to the number of columns in 'y_score'")
+    if not np.allclose(1, y_score.sum(axis=1)):
+        raise ValueError("Target scores need to be probabilities for multiclass roc_auc, i.e. they should sum up to 1.0 over classes")
+    aucs = np.array([_binary_auc(codes == c, y_score[:, c]) for c in range(len(classes))])
+    weights = np.bincount(codes, minlength=len(classes)) if average == "weighted" else None
+    return float(np.average(aucs, weights=weights))
@@ -0,0 +1,392 @@
+"""Resource planning: estimate a run's memory and fit time from a sample, before loading the data.
+
+``plan_run`` reads the first ``sample_rows`` rows of the input, takes the row
+count from the file metadata (or, for CSV, from the sampled bytes per line)
+and estimates:
+
+- the loaded frame, as parsed and after dtype downcasting
+- the width after ``pd.get_dummies`` and the peak memory of the dense, sparse
+  and binned encoding paths, including SMOTE's output when it is requested
+- each model's fit seconds and working memory from simple complexity models
+  (``FIT_COST``, measured with scikit-learn on one core)
+
+Options left unset are then chosen so the run fits ``memory_bytes``,
+``n_cpus`` and the time budget, if any: dtype downcasting, the encoding and
+feature dtype, the SVM backend and ``n_jobs``. Options set explicitly are
+kept; when they do not fit, the plan says so. The estimates are coarse
+(within a small factor) and meant to catch runs that are far over budget
+before they start.
+"""
+import math
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from .batch import MEMORY_BUDGET_FRACTION, available_memory_bytes
+from .formats import detect_format, iter_chunks
+from .loading import _categorical_in_sample, _compact_frame
+from .logging_utils import get_logger
+from .registry import resolve_models
+from .training import resolve_svm_backend
+
+logger = get_logger("planner")
+
+DEFAULT_SAMPLE_ROWS = 10_000
+# Seconds per unit of work, see _fit_cost; n = training rows, d = feature columns
+FIT_COST = {
+    "logistic_regression": 5e-8,  # n * d
+    "random_forest": 1e-7,  # trees * n * log2(n) * sqrt(d)
+    "exact": 7e-10,  # n^2 * d
+    "nystroem": 6e-10,  # n * components * (d + components)
+    "linear": 1e-7,  # n * d
+    "sgd": 3e-7,  # n * d
+    "hist_gradient_boosting": 1.5e-8,  # iterations * n * d
+}
+SVC_CACHE_BYTES = 200 * 2**20
+NODE_BYTES = 64
+
+
+def sample_input(file_path, usecols=None, sample_rows: int = DEFAULT_SAMPLE_ROWS):
+    """Return (first ``sample_rows`` rows, estimated total rows, whether the total is exact)."""
+    fmt = detect_format(file_path)
+    chunks = iter_chunks(file_path, chunksize=sample_rows, usecols=usecols)
+    sample = next(chunks, None)
+    chunks.close()
+    if sample is None:
+        raise ValueError(f"No rows in {file_path}")
+    if fmt == "csv" and len(sample) < sample_rows:
+        rows, exact = len(sample), True
+    elif fmt == "csv":
+        rows, exact = _csv_rows(file_path, sample_rows), False
+    else:
+        rows, exact = _metadata_rows(file_path, fmt), True
+    return sample, rows, exact
+
+
+def _csv_rows(file_path, sample_rows):
+    """Rows from the file size and the bytes per line of the first ``sample_rows`` lines."""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as fh:
+        header = len(fh.readline())
+        read = lines = 0
+        for line in fh:
+            read += len(line)
+            lines += 1
+            if lines >= sample_rows:
+                break
+    return max(lines, int(round((size - header) / (read / lines))))
+
+
+def _metadata_rows(file_path, fmt):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(str(file_path)).metadata.num_rows
+    if fmt == "feather":
+        from .formats import _ipc_table
+
+        return _ipc_table(file_path).num_rows
+    return len(np.load(file_path, mmap_mode="r"))
+
+
+def _levels(s: pd.Series, rows: int) -> int:
+    """Distinct values of a string column over ``rows`` rows, extrapolated from the sample.
+
+    Columns repeating their values in the sample are assumed to have seen most
+    of their levels; mostly-unique ones (ids) grow with the row count.
+    """
+    non_null = int(s.notna().sum())
+    seen = int(s.nunique(dropna=True))
+    if not non_null or seen <= 0.5 * non_null:
+        return seen
+    return int(seen * rows / len(s))
+
+
+def estimate_data(sample: pd.DataFrame, rows: int, target: str, test_size: float = 0.3,
+                  max_onehot_cardinality: int = 50, n_hash_features: int = 1024) -> Dict[str, Any]:
+    """Sizes of the frame and of every feature encoding at ``rows`` rows (see module docstring)."""
+    features = sample.drop(columns=[target])
+    categorical = {
+        c: _levels(features[c], rows)
+        for c in features.columns
+        if not (is_numeric_dtype(features[c]) or is_bool_dtype(features[c]))
+    }
+    numeric = [c for c in features.columns if c not in categorical]
+    per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+    compact = _compact_frame(sample.copy(), _categorical_in_sample(sample, 0.5), downcast_floats=True)
+    compact_per_row = compact.memory_usage(deep=True, index=False).sum() / len(sample)
+    numeric_bytes = {
+        False: sample[numeric].memory_usage(index=False).sum() / len(sample),
+        True: compact[numeric].memory_usage(index=False).sum() / len(sample),
+    }
+    sparse_width = len(numeric) + sum(
+        levels if levels <= max_onehot_cardinality else n_hash_features for levels in categorical.values()
+    )
+    counts = sample[target].value_counts()
+    return {
+        "rows": rows,
+        "train_rows": int(rows * (1 - test_size)),
+        "columns": features.shape[1],
+        "numeric_columns": len(numeric),
+        "categorical_levels": categorical,
+        "encoded_width": len(numeric) + sum(categorical.values()),
+        "sparse_width": sparse_width,
+        "class_shares": (counts / counts.sum()).round(4).to_dict(),
+        "frame_bytes": int(per_row * rows),
+        "frame_bytes_optimized": int(compact_per_row * rows),
+        "_numeric_row_bytes": numeric_bytes,
+    }
+
+
+def smote_rows(data: Dict[str, Any]) -> int:
+    """Rows after oversampling every class up to the majority class."""
+    shares = data["class_shares"]
+    return int(data["rows"] * max(shares.values()) * len(shares))
+
+
+def peak_bytes(data: Dict[str, Any], encoding: str, feature_dtype: str = "float64", optimize_dtypes: bool = False,
+               scaled: bool = True, smote: bool = False) -> int:
+    """Peak bytes of loading, encoding, splitting and converting the features (models excluded).
+
+    Dense: the frame, the dummies frame and its split copies, then the shared
+    float matrix plus its scaled copy. Sparse: the frame and its split copy,
+    then CSR (one stored value per column and row) plus its scaled copy.
+    Binned: the frame and its split copy, then one uint8 per cell.
+    """
+    itemsize = np.dtype(feature_dtype).itemsize
+    frame = data["frame_bytes_optimized" if optimize_dtypes else "frame_bytes"]
+    rows = smote_rows(data) if smote else data["rows"]
+    copies = 2 if scaled else 1
+    if encoding == "dense":
+        dummies = data["rows"] * (data["_numeric_row_bytes"][optimize_dtypes] + sum(data["categorical_levels"].values()))
+        if smote:  # imblearn works on a float64 copy of the dummies
+            dummies += rows * data["encoded_width"] * 8
+        return int(frame + 2 * dummies + copies * rows * data["encoded_width"] * itemsize)
+    if encoding == "sparse":
+        nnz = data["columns"]
+        return int(2 * frame + copies * rows * (nnz * (itemsize + 4) + 8))
+    if encoding == "binned":
+        return int(2 * frame + rows * data["columns"])
+    raise ValueError(f"Unknown encoding {encoding!r}")
+
+
+def _impurity(shares: Dict[Any, float]) -> float:
+    """Gini impurity of the class shares relative to balanced classes (1.0 when balanced)."""
+    k = len(shares)
+    return (1 - sum(p * p for p in shares.values())) / (1 - 1 / k) if k > 1 else 0.0
+
+
+def _fit_cost(key: str, n: int, d: int, raw_columns: int, shares: Dict[Any, float], svm_backend: str,
+              n_components: int = 300) -> Dict[str, float]:
+    """Single-core fit seconds and working memory of one model on ``n`` rows and ``d`` features."""
+    n_classes = len(shares)
+    if key == "logistic_regression":
+        return {"seconds": FIT_COST[key] * n * d * max(1, n_classes - 1), "bytes": 3 * n * max(2, n_classes) * 8}
+    if key == "random_forest":
+        # Full-depth trees on bootstrap samples grow about one node per training row when the
+        # classes are balanced and noisy, and stop early in the pure regions of skewed data
+        nodes = n * _impurity(shares)
+        seconds = FIT_COST[key] * 100 * nodes * math.log2(max(n, 2)) * math.sqrt(d)
+        return {"seconds": seconds, "bytes": int(100 * nodes * (NODE_BYTES + 8 * n_classes))}
+    if key == "hist_gradient_boosting":
+        return {"seconds": FIT_COST[key] * 100 * n * raw_columns * max(1, n_classes - 1),
+                "bytes": n * (raw_columns + 2 * 8 * max(1, n_classes))}
+    if key == "svm":
+        if svm_backend == "exact":
+            return {"seconds": FIT_COST["exact"] * n * n * d, "bytes": SVC_CACHE_BYTES + n * d * 8}
+        if svm_backend in ("nystroem", "rbf_sampler"):
+            return {"seconds": FIT_COST["nystroem"] * n * n_components * (d + n_components),
+                    "bytes": n * n_components * 8}
+        return {"seconds": FIT_COST[svm_backend] * n * d, "bytes": n * 8}
+    return {"seconds": 0.0, "bytes": 0}  # registered model without a cost model
+
+
+def _wall_seconds(costs: Dict[str, Dict[str, float]], n_jobs: int) -> float:
+    """Longest-first schedule of the fits on ``min(n_jobs, models)`` workers; RF uses the spare cores."""
+    workers = max(1, min(n_jobs, len(costs)))
+    threads = max(1, n_jobs // workers)
+    loads = [0.0] * workers
+    for key, cost in sorted(costs.items(), key=lambda kv: -kv[1]["seconds"]):
+        seconds = cost["seconds"] / (threads if key == "random_forest" else 1)
+        loads[loads.index(min(loads))] += seconds
+    return max(loads)
+
+
+def plan_run(
+    file_path,
+    target: str,
+    options: Optional[Dict[str, Any]] = None,
+    usecols: Optional[Sequence[str]] = None,
+    memory_bytes: Optional[int] = None,
+    n_cpus: Optional[int] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+) -> Dict[str, Any]:
+    """Estimate a run of ``file_path`` and choose the options ``options`` leaves unset.
+
+    Parameters:
+        file_path: Any ``formats`` input; only its first ``sample_rows`` rows are read
+        target: Target column
+        options: CLI option names (``merged``): encoding, feature_dtype,
+            optimize_dtypes, svm_backend, n_jobs, models, apply_smote,
+            imbalance_strategy, time_budget, model_time_budget, test_size,
+            max_onehot_cardinality, hash_features, svm_exact_max_rows, svm_sgd_min_rows
+        usecols: Columns to read (must include ``target``)
+        memory_bytes: Memory limit; defaults to 80% of the available memory
+        n_cpus: Core limit; defaults to ``os.cpu_count()``
+
+    Returns a dict with ``estimates``, ``limits``, ``settings`` (the chosen
+    values for unset options, keyed like ``options``), ``fits`` and ``notes``.
+    """
+    options = dict(options or {})
+    if memory_bytes is None:
+        available = available_memory_bytes()
+        memory_bytes = int(available * MEMORY_BUDGET_FRACTION) if available else None
+    n_cpus = n_cpus or os.cpu_count() or 1
+    sample, rows, exact = sample_input(file_path, usecols, sample_rows)
+    data = estimate_data(
+        sample, rows, target, test_size=options.get("test_size") or 0.3,
+        max_onehot_cardinality=options.get("max_onehot_cardinality") or 50,
+        n_hash_features=options.get("hash_features") or 1024,
+    )
+    specs = resolve_models(options.get("models"))
+    keys = [spec.key for spec in specs]
+    scaled = any(spec.features == "scaled" for spec in specs)
+    all_binned = all(spec.features == "binned" for spec in specs)
+    # Sparse features are never binned, and binned models (gradient boosting) need dense input
+    any_binned = any(spec.features == "binned" for spec in specs)
+    smote = bool(options.get("apply_smote")) or options.get("imbalance_strategy") in ("smote", "oversample")
+    notes: List[str] = [
+        f"No cost model for {key}; counted as free" for key in keys if key not in FIT_COST and key != "svm"
+    ]
+    settings: Dict[str, Any] = {}
+
+    # Configurations from cheapest to run to smallest; explicit options restrict the candidates
+    default_encoding = "binned" if all_binned else "dense"
+    fallback = "binned" if all_binned else "sparse"
+    candidates = [
+        (False, default_encoding, "float64"), (True, default_encoding, "float64"), (True, default_encoding, "float32"),
+        (True, fallback, "float64"), (True, fallback, "float32"),
+    ]
+    candidates = [
+        c for c in candidates
+        if (not options.get("optimize_dtypes") or c[0])
+        and options.get("encoding") in (None, c[1])
+        and options.get("feature_dtype") in (None, c[2])
+        and (c[1] != "sparse" or not any_binned or options.get("encoding") == "sparse")
+    ] or [(bool(options.get("optimize_dtypes")), options.get("encoding") or default_encoding,
+           options.get("feature_dtype") or "float64")]
+    n = smote_rows(data) if smote else data["train_rows"]
+    svm_backend = options.get("svm_backend") or resolve_svm_backend(
+        n, options.get("svm_kernel") or "rbf", "auto",
+        options.get("svm_exact_max_rows") or 20_000, options.get("svm_sgd_min_rows") or 500_000,
+    )
+
+    def costs_for(encoding, backend):
+        d = data["sparse_width"] if encoding == "sparse" else data["encoded_width"]
+        return {key: _fit_cost(key, n, d, data["columns"], data["class_shares"], backend) for key in keys}
+
+    def total(candidate, n_jobs, backend):
+        optimize, encoding, dtype = candidate
+        workers = max(1, min(n_jobs, len(keys)))
+        models = sorted((c["bytes"] for c in costs_for(encoding, backend).values()), reverse=True)
+        return peak_bytes(data, encoding, dtype, optimize, scaled, smote) + sum(models[:workers])
+
+    # SVM: the auto backend unless its fit alone would exceed the time budget
+    limit = options.get("model_time_budget") or options.get("time_budget")
+    if "svm" in keys and not options.get("svm_backend") and isinstance(limit, (int, float)):
+        for backend in dict.fromkeys((svm_backend, "nystroem", "linear", "sgd")):
+            if costs_for(candidates[0][1], backend)["svm"]["seconds"] <= limit:
+                break
+        if backend != svm_backend:
+            notes.append(f"SVM backend {svm_backend} is estimated over the {limit:g}s budget; using {backend}")
+        svm_backend = backend
+        settings["svm_backend"] = backend
+
+    # Memory: cheapest configuration that fits, with a single fit at a time
+    chosen = next((c for c in candidates if memory_bytes is None or total(c, 1, svm_backend) <= memory_bytes), None)
+    fits = chosen is not None
+    chosen = chosen or candidates[-1]
+    if not fits:
+        notes.append(
+            f"Estimated peak {_gib(total(chosen, 1, svm_backend))} exceeds the {_gib(memory_bytes)} limit even with "
+            f"{_describe(chosen)}; --streaming keeps memory bounded by --chunksize"
+        )
+    for key, value in zip(("optimize_dtypes", "encoding", "feature_dtype"), chosen):
+        if not options.get(key):
+            settings[key] = value
+    if fits and chosen != candidates[0]:
+        notes.append(
+            f"{_describe(candidates[0])} needs ~{_gib(total(candidates[0], 1, svm_backend))}; using {_describe(chosen)}"
+        )
+
+    # Parallelism: as many concurrent fits as the memory left over allows
+    n_jobs = options.get("n_jobs")
+    if not n_jobs:
+        n_jobs = next(
+            (j for j in range(n_cpus, 0, -1) if memory_bytes is None or total(chosen, j, svm_backend) <= memory_bytes), 1
+        )
+        if n_jobs < min(n_cpus, len(keys)):
+            notes.append(f"Concurrent fits limited to n_jobs={n_jobs} by model memory")
+        settings["n_jobs"] = n_jobs
+    elif n_jobs < 0:
+        n_jobs = max(1, n_cpus + 1 + n_jobs)
+
+    costs = costs_for(chosen[1], svm_backend)
+    wall = _wall_seconds(costs, n_jobs)
+    budget = options.get("time_budget")
+    if budget and wall > budget:
+        notes.append(f"Estimated fit time {wall:.0f}s exceeds --time-budget {budget:g}s; slow fits will be cancelled")
+    estimates = {k: v for k, v in data.items() if not k.startswith("_")}
+    estimates.update(
+        rows_exact=exact,
+        sampled_rows=len(sample),
+        smote_rows=smote_rows(data) if smote else None,
+        peak_bytes={
+            enc: peak_bytes(data, enc, chosen[2], chosen[0], scaled, smote)
+            for enc in ("dense", "sparse", "binned")
+        },
+        svm_backend=svm_backend if "svm" in keys else None,
+        models={key: {"fit_seconds": round(c["seconds"], 2), "bytes": int(c["bytes"])} for key, c in costs.items()},
+        total_bytes=total(chosen, n_jobs, svm_backend),
+        fit_wall_seconds=round(wall, 2),
+    )
+    plan = {
+        "file": str(file_path),
+        "estimates": estimates,
+        "limits": {"memory_bytes": memory_bytes, "n_cpus": n_cpus, "time_budget": budget},
+        "settings": settings,
+        "fits": fits,
+        "notes": notes,
+    }
+    _log_plan(plan)
+    return plan
+
+
+def _describe(candidate) -> str:
+    return "optimize_dtypes={} encoding={} feature_dtype={}".format(*candidate)
+
+
+def _gib(n_bytes) -> str:
+    return "unknown" if n_bytes is None else f"{n_bytes / 2**30:.2f} GiB"
+
+
+def _log_plan(plan: Dict[str, Any]) -> None:
+    est = plan["estimates"]
+    logger.info(
+        f"Plan for {plan['file']}: ~{est['rows']:,} rows{'' if est['rows_exact'] else ' (estimated)'}, "
+        f"{est['columns']} columns -> {est['encoded_width']:,} encoded, "
+        f"frame {_gib(est['frame_bytes'])} ({_gib(est['frame_bytes_optimized'])} downcast)"
+    )
+    logger.info(
+        "Peak memory by encoding: " + ", ".join(f"{k}={_gib(v)}" for k, v in est["peak_bytes"].items())
+        + f"; with models {_gib(est['total_bytes'])} of {_gib(plan['limits']['memory_bytes'])}"
+    )
+    for key, cost in est["models"].items():
+        logger.info(f"  {key}: ~{cost['fit_seconds']:.1f}s single-core, {_gib(cost['bytes'])}")
+    logger.info(f"Estimated fit wall time {est['fit_wall_seconds']:.1f}s; settings {plan['settings']}")
+    log = logger.info if plan["fits"] else logger.warning
+    for note in plan["notes"]:
+        log(note)
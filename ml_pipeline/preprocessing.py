@@ -0,0 +1,142 @@
+"""Shared, fit-once preprocessing for ``train_models``.
+
+Features are converted once to a C-contiguous float ndarray (or a CSR matrix)
+and, when linear models are scaled, one ``StandardScaler`` is fitted on the
+training split. Models that take binned input share one ``uint8`` matrix
+from a single ``binning.FeatureBinner`` (sparse input is never binned). Every model receives
+read-only views of these arrays, so estimators neither re-validate pandas
+objects nor allocate their own scaled copies, and none of them can mutate
+data another model is using.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .binning import FeatureBinner
+from .encoding import is_sparse
+from .constants import FEATURE_DTYPES
+from .logging_utils import get_logger
+
+logger = get_logger("preprocessing")
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    view = a.view()
+    view.flags.writeable = False
+    return view
+
+
+def as_model_matrix(X, dtype="float64"):
+    """Return ``X`` as a read-only C-contiguous ndarray or CSR matrix of ``dtype``.
+
+    Sparse DataFrames and other scipy formats become CSR. Copies only when the
+    input is not already in that layout and dtype.
+    """
+    if dtype not in FEATURE_DTYPES:
+        raise ValueError(f"Unsupported feature dtype {dtype!r}; expected one of {FEATURE_DTYPES}")
+    if is_sparse(X):
+        M = X.sparse.to_coo() if hasattr(X, "sparse") else X
+        M = sp.csr_matrix(M, dtype=dtype)
+        M.sort_indices()
+        # Share the buffers but forbid in-place writes through any of them
+        out = sp.csr_matrix((_readonly(M.data), _readonly(M.indices), _readonly(M.indptr)), shape=M.shape)
+        out.has_sorted_indices = True
+        return out
+    values = X.to_numpy(dtype=dtype) if hasattr(X, "to_numpy") else X
+    return _readonly(np.ascontiguousarray(values, dtype=dtype))
+
+
+def as_labels(y) -> np.ndarray:
+    """Target as a read-only 1-D ndarray (pandas extension dtypes are unwrapped)."""
+    return _readonly(np.ascontiguousarray(y.to_numpy() if hasattr(y, "to_numpy") else np.asarray(y)))
+
+
+class SharedFeatures:
+    """Train/test matrices shared by all models, in raw, scaled and binned form.
+
+    ``views(kind)`` returns the ``(X_train, X_test)`` pair a model should be
+    fitted on: ``"raw"`` (or False), ``"scaled"`` (or True) or ``"binned"``.
+    The scaled and binned pairs are computed once, on first request. With
+    ``binned=True`` the inputs already are ``FeatureBinner`` output (the
+    encoder was a binner) and stay ``uint8``. Sparse features are not binned,
+    since that would densify them: ``"binned"`` then returns the raw pair.
+    """
+
+    def __init__(self, X_train, X_test, dtype="float64", binned=False):
+        self.binned = binned
+        if binned:
+            self.X_train = _readonly(np.ascontiguousarray(X_train))
+            self.X_test = _readonly(np.ascontiguousarray(X_test))
+        else:
+            self.X_train = as_model_matrix(X_train, dtype)
+            self.X_test = as_model_matrix(X_test, dtype)
+        self.dtype = dtype
+        self.sparse = sp.issparse(self.X_train)
+        self.scaler: Optional[StandardScaler] = None
+        self.binner: Optional[FeatureBinner] = None
+        self._scaled: Optional[Tuple[Any, Any]] = None
+        self._binned: Optional[Tuple[Any, Any]] = (self.X_train, self.X_test) if binned else None
+
+    def views(self, scaled=False):
+        if scaled == "binned":
+            return self._binned_views()
+        if scaled in (False, "raw"):
+            return self.X_train, self.X_test
+        if self._scaled is None:
+            # Sparse data cannot be centred without densifying it
+            self.scaler = StandardScaler(with_mean=not self.sparse)
+            X_train = self.scaler.fit_transform(self.X_train)
+            X_test = self.scaler.transform(self.X_test)
+            self._scaled = (as_model_matrix(X_train, self.dtype), as_model_matrix(X_test, self.dtype))
+            logger.debug("Fitted shared StandardScaler on %s", self.X_train.shape)
+        return self._scaled
+
+    def _binned_views(self):
+        if self._binned is None:
+            if self.sparse:
+                logger.warning(
+                    f"Not binning the sparse feature matrix {self.X_train.shape}; binned models get the raw CSR "
+                    f"features (use --encoding dense or binned for models that need dense input)"
+                )
+                self._binned = (self.X_train, self.X_test)
+                return self._binned
+            self.binner = FeatureBinner()
+            self._binned = (self.binner.fit(self.X_train).transform(self.X_train), self.binner.transform(self.X_test))
+            logger.debug("Fitted shared FeatureBinner on %s: %s bytes", self.X_train.shape, f"{self._binned[0].nbytes:,}")
+        return self._binned
+
+    def preprocessor(self, kind):
+        """The fitted shared step a ``kind`` model needs in front of it to accept the encoded features."""
+        if kind in (True, "scaled"):
+            return self.scaler
+        if kind == "binned":
+            return self.binner
+        return None
+
+    def nbytes(self) -> int:
+        pairs = [(self.X_train, self.X_test)]
+        pairs += [p for p in (self._scaled, self._binned) if p is not None and p[0] is not self.X_train]
+        return sum(matrix_nbytes(a) + matrix_nbytes(b) for a, b in pairs)
+
+
+def matrix_nbytes(M) -> int:
+    """Bytes held by a dense array or the three arrays of a CSR matrix."""
+    return M.data.nbytes + M.indices.nbytes + M.indptr.nbytes if sp.issparse(M) else M.nbytes
+
+
+def with_preprocessing(model, scaler):
+    """Standalone estimator for raw features: the shared scaler or binner (if any) prepended to ``model``."""
+    if scaler is None:
+        return model
+    step = ("binner" if isinstance(scaler, FeatureBinner) else "scaler", scaler)
+    if isinstance(model, Pipeline):
+        return Pipeline([step, *model.steps])
+    return Pipeline([step, ("clf", model)])
+
+
+def model_inputs(shared: SharedFeatures, scaled: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """``{model name: (X_train, X_test)}`` views for each model (``scaled`` maps names to view kinds)."""
+    return {name: shared.views(flag) for name, flag in scaled.items()}
@@ -0,0 +1,162 @@
+"""Progressive-sampling model selection for ``train_models``.
+
+Instead of fitting every candidate on the full training split, each one is
+fitted on stratified subsamples of geometrically growing size (``start``,
+``start * factor``, ...) and scored on one fixed stratified sample of the
+test split. After every rung:
+
+- candidates whose score is more than ``margin`` below the best are dropped
+- growing stops once no remaining candidate improved by more than
+  ``tolerance`` (the learning curves have plateaued), or once only one
+  candidate is left
+
+Only the remaining candidates are then fitted on the full training split.
+The learning-curve points of every model, and an estimate of the full-fit
+time the dropped models would have cost, are reported with the results.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+
+from .logging_utils import get_logger
+from .timing import timed
+
+logger = get_logger("progressive")
+
+CURVE_METRICS = ("Accuracy", "Precision", "Recall", "F1 Score")
+
+
+class ProgressiveSampling:
+    """Settings for ``train_models(progressive=...)``; ``progressive=True`` uses the defaults.
+
+    Parameters:
+        start: Training rows of the first rung
+        factor: Growth factor between rungs
+        tolerance: Stop growing when no candidate improves ``scoring`` by more than this
+        margin: Drop candidates scoring more than this below the best one
+        scoring: Metric that ranks candidates (higher is better)
+        eval_rows: Size of the stratified sample of the test split used to score rungs
+    """
+
+    def __init__(self, start: int = 10_000, factor: float = 4, tolerance: float = 0.005, margin: float = 0.02,
+                 scoring: str = "F1 Score", eval_rows: int = 50_000):
+        if start < 1 or factor <= 1:
+            raise ValueError("progressive sampling needs start >= 1 and factor > 1")
+        self.start = start
+        self.factor = factor
+        self.tolerance = tolerance
+        self.margin = margin
+        self.scoring = scoring
+        self.eval_rows = eval_rows
+
+    def sizes(self, n_rows: int) -> List[int]:
+        """Subsample sizes up to ``n_rows / factor``; the full split is the final fit.
+
+        A rung closer to the full size would cost almost as much as the full
+        fit itself while saving little.
+        """
+        sizes = []
+        size = self.start
+        while size * self.factor <= n_rows:
+            sizes.append(int(size))
+            size *= self.factor
+        return sizes
+
+    def __repr__(self):
+        return (f"ProgressiveSampling(start={self.start}, factor={self.factor}, tolerance={self.tolerance}, "
+                f"margin={self.margin}, scoring={self.scoring!r}, eval_rows={self.eval_rows})")
+
+
+def stratified_rows(y, n_rows: int, random_state: int) -> np.ndarray:
+    """Sorted indices of a stratified subsample of ``n_rows`` rows (``train_test_split`` stratification)."""
+    if n_rows >= len(y):
+        return np.arange(len(y))
+    try:
+        rows, _ = train_test_split(np.arange(len(y)), train_size=n_rows, stratify=y, random_state=random_state)
+    except ValueError:  # a class too rare to stratify at this size
+        rows, _ = train_test_split(np.arange(len(y)), train_size=n_rows, random_state=random_state)
+    return np.sort(rows)
+
+
+def progressive_select(
+    models: Dict[str, Any],
+    inputs: Dict[str, Tuple[Any, Any]],
+    y_train,
+    y_test,
+    settings: ProgressiveSampling,
+    run: Callable[[List[tuple]], List[tuple]],
+    random_state: int = 42,
+) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """Return (winner names, {name: progressive report}) for ``models``.
+
+    ``inputs`` holds each model's ``(X_train, X_test)``. ``run`` executes a
+    list of ``training._fit_and_evaluate`` argument tuples (serially or on an
+    executor) and returns their results in any order. Every report has
+    ``learning_curve`` (one point per rung: ``rows``, ``fit_s`` and the base
+    metrics). Dropped models also get ``dropped_at_rows`` and
+    ``estimated_full_fit_s``.
+    """
+    n_train = len(y_train)
+    sizes = settings.sizes(n_train)
+    reports = {name: {"learning_curve": []} for name in models}
+    if not sizes:
+        logger.info(f"Progressive sampling skipped: {n_train} training rows < start * factor")
+        return list(models), reports
+    eval_rows = stratified_rows(y_test, settings.eval_rows, random_state)
+    y_eval = y_test[eval_rows]
+    alive = list(models)
+    scoring = settings.scoring
+    for r, size in enumerate(sizes):
+        rows = stratified_rows(y_train, size, random_state + r)
+        jobs = []
+        for name in alive:
+            X_train, X_test = inputs[name]
+            jobs.append((name, clone(models[name]), X_train[rows], y_train[rows], X_test[eval_rows], y_eval, False))
+        with timed(f"progressive_rung_{r + 1}"):
+            completed = run(jobs)
+        scores = {}
+        for name, metrics, elapsed, _model, _stages in completed:
+            point = {"rows": size, "fit_s": elapsed, **{k: metrics[k] for k in CURVE_METRICS if k in metrics}}
+            reports[name]["learning_curve"].append(point)
+            scores[name] = metrics.get(scoring, -np.inf)
+        best = max(scores.values())
+        logger.info(
+            f"Progressive rung {r + 1}/{len(sizes)} rows={size}: "
+            + ", ".join(f"{name}={scores[name]:.3f}" for name in alive)
+        )
+        for name in list(alive):
+            if scores[name] < best - settings.margin:
+                alive.remove(name)
+                reports[name].update(_dropped(reports[name]["learning_curve"], n_train))
+                logger.info(f"Dropped {name} at {size} rows: {scoring}={scores[name]:.3f} vs best {best:.3f}")
+        if len(alive) == 1:
+            break
+        if r > 0 and all(_gain(reports[name]["learning_curve"], scoring) <= settings.tolerance for name in alive):
+            logger.info(f"Learning curves plateaued at {size} rows (tolerance {settings.tolerance})")
+            break
+    return alive, reports
+
+
+def _gain(curve, scoring) -> float:
+    return curve[-1].get(scoring, 0.0) - curve[-2].get(scoring, 0.0) if len(curve) > 1 else np.inf
+
+
+def _dropped(curve, n_train) -> Dict[str, Any]:
+    """Fit time the full split would have cost, extrapolated from the last two rungs (at least linear)."""
+    last = curve[-1]
+    exponent = 1.0
+    if len(curve) > 1 and curve[-2]["fit_s"] > 0 and last["fit_s"] > 0:
+        exponent = np.log(last["fit_s"] / curve[-2]["fit_s"]) / np.log(last["rows"] / curve[-2]["rows"])
+        exponent = float(np.clip(exponent, 1.0, 2.0))
+    estimate = last["fit_s"] * (n_train / last["rows"]) ** exponent
+    return {"status": "dropped", "dropped_at_rows": last["rows"], "estimated_full_fit_s": float(estimate)}
+
+
+def summarize(reports: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    """Seconds spent on subsample fits and full-fit seconds saved by dropping models."""
+    spent = sum(p["fit_s"] for r in reports.values() for p in r["learning_curve"])
+    saved = sum(r.get("estimated_full_fit_s", 0.0) for r in reports.values())
+    return {"progressive_fit_s": float(spent), "estimated_saved_s": float(saved)}
+
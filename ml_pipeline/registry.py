@@ -0,0 +1,74 @@
+"""Registry of the model families ``train_models`` and ``cross_validate_models`` can fit.
+
+Each entry has a display name (used as the key in results, caches and
+artifacts), a snake_case key for the CLI / config files, a builder and the
+shared feature matrix the model is fitted on:
+
+- ``"raw"``: the encoded features as they are
+- ``"scaled"``: standardized by the one shared ``StandardScaler`` (raw when
+  ``scale_linear_models=False``)
+- ``"binned"``: the shared ``uint8`` histogram-binned matrix (``binning.py``)
+
+Builders receive the options of the run (``n_rows``, ``n_classes``,
+``random_state``, ``lr_max_iter``, the SVM settings, ...) as keyword
+arguments and return an unfitted estimator. The built-in models are
+registered by ``training.py``. Register your own with ``register_model``.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from .constants import DEFAULT_MODELS
+
+FEATURE_KINDS = ("raw", "scaled", "binned")
+
+
+class ModelSpec:
+    """A registered model family; see the module docstring."""
+
+    __slots__ = ("name", "key", "build", "features")
+
+    def __init__(self, name: str, build: Callable[..., Any], features: str = "raw", key: Optional[str] = None):
+        if features not in FEATURE_KINDS:
+            raise ValueError(f"Unknown feature kind {features!r}; expected one of {FEATURE_KINDS}")
+        self.name = name
+        self.key = key or name.lower().replace(" ", "_")
+        self.build = build
+        self.features = features
+
+    def __repr__(self):
+        return f"ModelSpec({self.name!r}, key={self.key!r}, features={self.features!r})"
+
+
+MODEL_REGISTRY: Dict[str, ModelSpec] = {}
+
+
+def register_model(name: str, build: Callable[..., Any], features: str = "raw", key: Optional[str] = None,
+                   replace: bool = False) -> ModelSpec:
+    """Add a model family under ``name``; ``replace=True`` overrides an existing entry."""
+    spec = ModelSpec(name, build, features, key)
+    for other in MODEL_REGISTRY.values():
+        if not replace and (other.name == name or other.key == spec.key):
+            raise ValueError(f"Model {name!r} (key {spec.key!r}) is already registered")
+    MODEL_REGISTRY[name] = spec
+    return spec
+
+
+def resolve_models(models: Union[None, str, Iterable[str]] = None) -> List[ModelSpec]:
+    """Specs for ``models`` (display names or keys, a list or a comma-separated string), in the given order.
+
+    None selects ``DEFAULT_MODELS``.
+    """
+    if models is None:
+        models = DEFAULT_MODELS
+    if isinstance(models, str):
+        models = [m.strip() for m in models.split(",") if m.strip()]
+    by_key = {spec.key: spec for spec in MODEL_REGISTRY.values()}
+    specs = []
+    for m in models:
+        spec = MODEL_REGISTRY.get(m) or by_key.get(m)
+        if spec is None:
+            raise ValueError(f"Unknown model {m!r}; registered: {sorted(by_key)}")
+        if spec not in specs:
+            specs.append(spec)
+    if not specs:
+        raise ValueError("Select at least one model")
+    return specs
@@ -1,24 +1,124 @@
-from imblearn.over_sampling import SMOTE, RandomOverSampler
 from collections import Counter
+from functools import partial
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.neighbors import NearestNeighbors
+from sklearn.random_projection import GaussianRandomProjection
+from .constants import IMBALANCE_STRATEGIES
 from .logging_utils import get_logger
 
 logger = get_logger("sampling")
 
+# "auto" undersamples instead of weighting once the data is this large and the
+# minority class still has enough rows to learn from
+UNDERSAMPLE_MIN_ROWS = 100_000
+UNDERSAMPLE_MIN_MINORITY = 1_000
+
 def check_imbalance(df, target_col):
     logger.info(f"Checking class imbalance for target='{target_col}'")
     counts = df[target_col].value_counts()
-    imbalance_ratio = counts.min() / counts.max()
+    return imbalance_from_counts(counts.to_dict())
+
+def imbalance_from_counts(class_distribution):
+    """Build the ``check_imbalance`` report from precomputed class counts
+    (e.g. ``streaming_report(...)["class_distribution"]``)."""
+    imbalance_ratio = min(class_distribution.values()) / max(class_distribution.values())
     is_imbalanced = imbalance_ratio < 0.5
-    logger.debug(f"Class distribution: {counts.to_dict()} ratio={imbalance_ratio:.3f} is_imbalanced={is_imbalanced}")
+    logger.debug(f"Class distribution: {class_distribution} ratio={imbalance_ratio:.3f} is_imbalanced={is_imbalanced}")
     return {
-        "class_distribution": counts.to_dict(),
+        "class_distribution": dict(class_distribution),
         "imbalance_ratio": imbalance_ratio,
-        "is_imbalanced": is_imbalanced
+        "is_imbalanced": is_imbalanced,
+        "recommended_strategy": recommend_strategy(class_distribution, is_imbalanced),
     }
 
-def apply_smote(X, y):
+def recommend_strategy(class_distribution, is_imbalanced=None):
+    """Imbalance strategy picked by ``"auto"`` for these class counts.
+
+    Balanced data gets "none". Imbalanced data gets "class_weight", which
+    reweights the loss without copying rows, unless it has at least
+    ``UNDERSAMPLE_MIN_ROWS`` rows and ``UNDERSAMPLE_MIN_MINORITY`` minority
+    rows. Then "undersample" shrinks the training set and with it every fit.
+    """
+    counts = list(class_distribution.values())
+    if is_imbalanced is None:
+        is_imbalanced = min(counts) / max(counts) < 0.5
+    if not is_imbalanced:
+        return "none"
+    if sum(counts) >= UNDERSAMPLE_MIN_ROWS and min(counts) >= UNDERSAMPLE_MIN_MINORITY:
+        return "undersample"
+    return "class_weight"
+
+def resolve_strategy(strategy, y):
+    """Validate ``strategy`` and resolve "auto" from the class counts of ``y``."""
+    strategy = strategy or "none"
+    if strategy not in IMBALANCE_STRATEGIES:
+        raise ValueError(f"Unknown imbalance strategy {strategy!r}; expected one of {IMBALANCE_STRATEGIES}")
+    if strategy == "auto":
+        strategy = recommend_strategy(Counter(np.asarray(y).tolist()))
+        logger.info(f"Imbalance strategy auto -> {strategy}")
+    return strategy
+
+def resampler_for(strategy, smote_method="exact", random_state=42):
+    """``(X, y) -> (X, y)`` callable for the resampling strategies; None for the others.
+
+    "class_weight" and "balanced_bagging" change the models instead (see
+    ``training._baseline_models``), so the training data is not copied.
+    """
+    if strategy == "smote":
+        return partial(apply_smote, method=smote_method)
+    if strategy == "oversample":
+        return partial(random_oversample, random_state=random_state)
+    if strategy == "undersample":
+        return partial(random_undersample, random_state=random_state)
+    return None
+
+def _take(X, idx):
+    if isinstance(X, (pd.DataFrame, pd.Series)):
+        return X.iloc[idx]
+    if sp.issparse(X):
+        return X.tocsr()[idx]
+    return np.asarray(X)[idx]
+
+def _class_indices(y):
+    y_arr = np.asarray(y)
+    classes, inverse = np.unique(y_arr, return_inverse=True)
+    return {cls: np.flatnonzero(inverse == i) for i, cls in enumerate(classes)}
+
+def random_undersample(X, y, sampling_ratio=1.0, random_state=42):
+    """Drop random rows of the larger classes, keeping every minority row.
+
+    Each class is capped at ``minority count / sampling_ratio`` rows
+    (1.0 balances the classes). Row order is preserved.
+    """
+    by_class = _class_indices(y)
+    cap = int(min(len(i) for i in by_class.values()) / sampling_ratio)
+    rng = np.random.default_rng(random_state)
+    keep = np.sort(np.concatenate([
+        idx if len(idx) <= cap else rng.choice(idx, cap, replace=False) for idx in by_class.values()
+    ]))
+    logger.info(f"Random undersampling: {len(np.asarray(y))} -> {len(keep)} rows")
+    return _take(X, keep), _take(y, keep)
+
+def random_oversample(X, y, random_state=42):
+    """Duplicate random rows of the smaller classes up to the majority count."""
+    by_class = _class_indices(y)
+    top = max(len(i) for i in by_class.values())
+    rng = np.random.default_rng(random_state)
+    extra = [rng.choice(idx, top - len(idx), replace=True) for idx in by_class.values() if len(idx) < top]
+    rows = np.concatenate([np.arange(len(np.asarray(y)))] + extra)
+    logger.info(f"Random oversampling: {len(np.asarray(y))} -> {len(rows)} rows")
+    return _take(X, rows), _take(y, rows)
+
+def apply_smote(X, y, method="exact", **approx_kwargs):
     """Apply SMOTE with graceful fallback when the minority class is too small.
 
+    ``method="approximate"`` switches to the memory-bounded
+    ``iter_smote_batches`` path (partitioned neighbour index, batched
+    generation written into a preallocated output); ``approx_kwargs`` are
+    forwarded to it.
+
     SMOTE requires at least k_neighbors + 1 samples in the minority class. The
     default k_neighbors=5 therefore needs at least 6 samples. The test dataset
     includes only a single minority example, so plain SMOTE fails. We handle:
@@ -41,6 +141,14 @@ def apply_smote(X, y):
         logger.info("Data already balanced; skipping SMOTE")
         return X, y
 
+    if method == "approximate":
+        return _approximate_smote(X, y, **approx_kwargs)
+    if method != "exact":
+        raise ValueError(f"Unknown SMOTE method {method!r}; expected 'exact' or 'approximate'")
+
+    # imblearn is only needed on this path; importing it costs more than the rest of the module
+    from imblearn.over_sampling import SMOTE, RandomOverSampler
+
     # If only one minority sample, SMOTE cannot work; fallback to simple duplication
     if minority_count < 2:
         logger.warning("Minority class has only 1 sample; using RandomOverSampler fallback")
@@ -52,3 +160,112 @@ def apply_smote(X, y):
     logger.debug(f"Using SMOTE with k_neighbors={k_neighbors}")
     smote = SMOTE(random_state=42, k_neighbors=k_neighbors)
     return smote.fit_resample(X, y)
+
+
+def iter_smote_batches(
+    X,
+    y,
+    k_neighbors=5,
+    batch_size=10_000,
+    partition_size=50_000,
+    n_components=None,
+    random_state=42,
+):
+    """Yield synthetic ``(X_batch, y_batch)`` samples without materialising the result.
+
+    Each class is oversampled up to the majority count. Instead of one exact
+    k-NN search over the whole class, its rows are shuffled into partitions of
+    about ``partition_size`` and neighbours are searched inside each partition
+    (optionally on a ``n_components``-dimensional Gaussian random projection),
+    so index memory and query time are bounded per partition. Synthetic rows are
+    interpolated in the original feature space, ``batch_size`` at a time.
+
+    Fallbacks mirror ``apply_smote``: classes with a single sample are
+    duplicated (RandomOverSampler behaviour) and k_neighbors shrinks to
+    ``count - 1`` for small classes / partitions.
+    """
+    X_arr = _as_matrix(X)
+    y_arr = np.asarray(y)
+    rng = np.random.default_rng(random_state)
+    counts = Counter(y_arr)
+    if not counts:
+        return
+    majority = max(counts.values())
+    for cls, count in counts.items():
+        need = majority - count
+        if need <= 0:
+            continue
+        idx = np.flatnonzero(y_arr == cls)
+        if count < 2:
+            logger.warning(f"Class {cls!r} has only 1 sample; duplicating it")
+            for start in range(0, need, batch_size):
+                m = min(batch_size, need - start)
+                yield X_arr[np.repeat(idx, m)], np.full(m, cls, dtype=y_arr.dtype)
+            continue
+        n_parts = max(1, count // max(partition_size, k_neighbors + 1))
+        parts = np.array_split(rng.permutation(idx), n_parts)
+        per_part = rng.multinomial(need, [len(p) / count for p in parts])
+        logger.debug("Class %r: %d synthetic rows from %d partitions", cls, need, len(parts))
+        for part, n_new in zip(parts, per_part):
+            if n_new == 0:
+                continue
+            X_part = X_arr[part]
+            k = min(k_neighbors, len(part) - 1)
+            space = X_part
+            if n_components is not None and X_part.shape[1] > n_components:
+                space = GaussianRandomProjection(n_components=n_components, random_state=random_state).fit_transform(X_part)
+            nn = NearestNeighbors(n_neighbors=k + 1).fit(space)
+            neighbours = nn.kneighbors(space, return_distance=False)[:, 1:]
+            del space, nn
+            for start in range(0, n_new, batch_size):
+                m = min(batch_size, n_new - start)
+                rows = rng.integers(len(part), size=m)
+                cols = rng.integers(k, size=m)
+                gaps = rng.random(m)
+                base = X_part[rows]
+                diff = X_part[neighbours[rows, cols]] - base
+                if sp.issparse(base):
+                    new = base + sp.diags(gaps) @ diff
+                else:
+                    new = base + gaps[:, None] * diff
+                yield new, np.full(m, cls, dtype=y_arr.dtype)
+
+
+def _as_matrix(X):
+    if isinstance(X, pd.DataFrame):
+        return X.to_numpy(dtype=np.float64)
+    if sp.issparse(X):
+        return X.tocsr()
+    arr = np.asarray(X)
+    return arr if np.issubdtype(arr.dtype, np.floating) else arr.astype(np.float64)
+
+
+def _approximate_smote(X, y, **kwargs):
+    X_arr = _as_matrix(X)
+    y_arr = np.asarray(y)
+    counts = Counter(y_arr)
+    total = len(counts) * max(counts.values())
+    logger.info(f"Approximate SMOTE: {len(y_arr)} -> {total} rows")
+    batches = iter_smote_batches(X_arr, y_arr, **kwargs)
+    if sp.issparse(X_arr):
+        parts, labels = [X_arr], [y_arr]
+        for X_new, y_new in batches:
+            parts.append(X_new)
+            labels.append(y_new)
+        X_res, y_res = sp.vstack(parts, format="csr"), np.concatenate(labels)
+    else:
+        # Fill a preallocated array so the result is never held twice
+        X_res = np.empty((total, X_arr.shape[1]), dtype=X_arr.dtype)
+        y_res = np.empty(total, dtype=y_arr.dtype)
+        X_res[: len(y_arr)] = X_arr
+        y_res[: len(y_arr)] = y_arr
+        pos = len(y_arr)
+        for X_new, y_new in batches:
+            X_res[pos: pos + len(y_new)] = X_new
+            y_res[pos: pos + len(y_new)] = y_new
+            pos += len(y_new)
+    if isinstance(X, pd.DataFrame):
+        X_res = pd.DataFrame(X_res, columns=X.columns)
+    if isinstance(y, pd.Series):
+        y_res = pd.Series(y_res, name=y.name)
+    return X_res, y_res
@@ -0,0 +1,300 @@
+"""Cross-validation and hyperparameter search over the baseline models.
+
+Every (model, parameter candidate, fold) combination is an independent job
+run on a shared executor, like ``train_models`` fits its models. Each fold is
+encoded, resampled and converted to ``preprocessing.SharedFeatures`` once,
+and all candidates reuse it, including the shared scaler. Successive halving
+evaluates every candidate on a small training subset first and only
+promotes the best ``1 / factor`` of them to the next, larger rung.
+"""
+import math
+import warnings
+from concurrent.futures import as_completed
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import BaggingClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+from .constants import SEARCH_STRATEGIES
+from .logging_utils import get_logger
+from .binning import FeatureBinner
+from .preprocessing import SharedFeatures, as_labels
+from .sampling import resampler_for, resolve_strategy
+from .timing import timed
+from .training import _baseline_models, _fit_and_evaluate, _limit_threads, _resolve_executor, _split_core_budget
+
+logger = get_logger("search")
+
+
+# Keyed by the class of the estimator being tuned (see ``_tunable``)
+DEFAULT_PARAM_GRIDS: Dict[str, Dict[str, List[Any]]] = {
+    "LogisticRegression": {"C": [0.01, 0.1, 1.0, 10.0]},
+    "RandomForestClassifier": {"n_estimators": [100, 300], "max_depth": [None, 10, 30], "min_samples_leaf": [1, 5]},
+    "SVC": {"C": [0.1, 1.0, 10.0], "gamma": ["scale", 0.01, 0.1]},
+    "LinearSVC": {"C": [0.01, 0.1, 1.0, 10.0]},
+    "SGDClassifier": {"alpha": [1e-5, 1e-4, 1e-3]},
+    "HistGradientBoostingClassifier": {"learning_rate": [0.05, 0.1, 0.2], "max_leaf_nodes": [15, 31, 63], "l2_regularization": [0.0, 1.0]},
+}
+
+
+def _tunable(model):
+    """The estimator whose hyperparameters are searched: the final pipeline step, unwrapped from calibration / bagging."""
+    final = model.steps[-1][1] if isinstance(model, Pipeline) else model
+    while isinstance(final, (CalibratedClassifierCV, BaggingClassifier)):
+        final = final.estimator
+    return final
+
+
+def _with_params(model, params):
+    model = clone(model)
+    _tunable(model).set_params(**params)
+    return model
+
+
+def _candidates(name, model, search, param_grids, n_iter, random_state) -> List[Dict[str, Any]]:
+    if search is None:
+        return [{}]
+    grid = (param_grids or {}).get(name) or DEFAULT_PARAM_GRIDS.get(type(_tunable(model)).__name__)
+    if not grid:
+        logger.info(f"No search space for {name}; evaluating its defaults only")
+        return [{}]
+    if search == "random":
+        n = min(n_iter, len(ParameterGrid(grid)))
+        return list(ParameterSampler(grid, n_iter=n, random_state=random_state))
+    return list(ParameterGrid(grid))
+
+
+def _prepare_folds(X, y, cv, stratify, random_state, encoder, resampler, feature_dtype):
+    """Encode, resample and convert every fold once; all candidates share the result."""
+    splitter = (StratifiedKFold if stratify else KFold)(n_splits=cv, shuffle=True, random_state=random_state)
+    y_all = as_labels(y)
+    folds = []
+    for i, (train_idx, test_idx) in enumerate(splitter.split(np.zeros(len(y_all)), y_all)):
+        with timed(f"cv_fold_{i}_preprocessing"):
+            X_train = X.iloc[train_idx] if hasattr(X, "iloc") else X[train_idx]
+            X_test = X.iloc[test_idx] if hasattr(X, "iloc") else X[test_idx]
+            y_train, y_test = y_all[train_idx], y_all[test_idx]
+            if encoder is not None:
+                fold_encoder = clone(encoder)
+                X_train = fold_encoder.fit_transform(X_train, y_train)
+                X_test = fold_encoder.transform(X_test)
+            if resampler is not None:
+                X_train, y_train = resampler(X_train, y_train)
+            shared = SharedFeatures(X_train, X_test, dtype=feature_dtype, binned=isinstance(encoder, FeatureBinner))
+            y_train = as_labels(y_train)
+            # Fixed order for halving subsets so rungs nest: rung r uses the first n rows
+            order = np.random.default_rng(random_state + i).permutation(len(y_train))
+        folds.append({"shared": shared, "y_train": y_train, "y_test": y_test, "order": order,
+                      "categorical_mask": getattr(fold_encoder, "categorical_mask_", None) if encoder is not None else None})
+    return folds
+
+
+def _fold_inputs(fold, kind, n_rows, memo):
+    """(X_train, y_train, X_test) for a fold, optionally restricted to its first ``n_rows`` (memoized)."""
+    key = (id(fold), kind, n_rows)
+    if key not in memo:
+        X_train, X_test = fold["shared"].views(kind)
+        y_train = fold["y_train"]
+        if n_rows is not None and n_rows < len(y_train):
+            rows = np.sort(fold["order"][:n_rows])
+            X_train, y_train = X_train[rows], y_train[rows]
+        memo[key] = (X_train, y_train, X_test)
+    return memo[key]
+
+
+def _summarize(fold_metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mean and ``(std)`` of each numeric metric across folds; confusion matrices are summed."""
+    out: Dict[str, Any] = {}
+    for key in fold_metrics[0]:
+        values = [m[key] for m in fold_metrics if key in m]
+        if key == "confusion_matrix":
+            out[key] = np.sum([np.asarray(v) for v in values], axis=0).tolist()
+        elif all(isinstance(v, (int, float)) for v in values):
+            out[key] = float(np.mean(values))
+            out[f"{key} (std)"] = float(np.std(values))
+    return out
+
+
+def _halving_rungs(n_candidates, n_rows, factor, min_rows):
+    """Training rows per rung, smallest first; the last rung always uses every row."""
+    n_rungs = 1 + max(0, math.ceil(math.log(max(n_candidates, 1), factor)))
+    while n_rungs > 1 and n_rows / factor ** (n_rungs - 1) < min_rows:
+        n_rungs -= 1
+    return [int(n_rows / factor ** (n_rungs - 1 - i)) for i in range(n_rungs - 1)] + [None]
+
+
+def cross_validate_models(
+    X,
+    y,
+    cv: int = 5,
+    stratify: bool = True,
+    search: Optional[str] = None,
+    param_grids: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+    n_iter: int = 10,
+    scoring: str = "F1 Score",
+    halving_factor: int = 3,
+    min_resources: int = 50,
+    random_state: int = 42,
+    lr_max_iter: int = 2000,
+    scale_linear_models: bool = True,
+    svm_kernel: str = "rbf",
+    svm_probability: bool = False,
+    svm_backend: str = "auto",
+    svm_exact_max_rows: int = 20_000,
+    svm_sgd_min_rows: int = 500_000,
+    svm_n_components: int = 300,
+    extended_metrics: bool = False,
+    n_jobs: int | None = 1,
+    executor=None,
+    encoder=None,
+    resampler=None,
+    feature_dtype: str = "float64",
+    imbalance_strategy: Optional[str] = None,
+    models=None,
+):
+    """K-fold cross-validation of the baseline models, optionally with hyperparameter search.
+
+    Parameters:
+        X, y: Features and target
+        cv: Number of folds
+        stratify: Use StratifiedKFold (else shuffled KFold)
+        search: None (defaults only), "grid", "random" or "halving"
+            (successive halving over the grid, growing the training rows by
+            ``halving_factor`` per rung)
+        param_grids: {model name: {param: [values]}} overriding
+            ``DEFAULT_PARAM_GRIDS``. Params apply to the final estimator
+            (the linear model inside a calibrated SVM)
+        n_iter: Candidates per model for random search
+        scoring: Metric used to rank candidates (higher is better)
+        min_resources: Smallest training subset used by halving
+        n_jobs / executor: As in ``train_models``; jobs are (model, candidate, fold)
+        encoder / resampler: Fitted / applied on each fold's training part
+        imbalance_strategy: As in ``train_models``; resampling strategies are
+            applied to each fold's training part
+        models: Registered models to evaluate, as in ``train_models``
+        Remaining parameters are those of ``train_models``.
+
+    Returns ``{model name: metrics}`` like ``train_models``. Each metric holds
+    the best candidate's mean over folds, ``"<metric> (std)"`` holds its
+    standard deviation, and ``best_params``, ``cv_folds`` and
+    ``n_candidates`` describe the search.
+    """
+    if search is not None and search not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search {search!r}; expected one of {SEARCH_STRATEGIES}")
+    logger.info(f"Cross-validating cv={cv} search={search} scoring={scoring!r}")
+    imbalance_strategy = resolve_strategy(imbalance_strategy, y)
+    if resampler is None:
+        resampler = resampler_for(imbalance_strategy, random_state=random_state)
+    folds = _prepare_folds(X, y, cv, stratify, random_state, encoder, resampler, feature_dtype)
+    n_train = min(len(f["y_train"]) for f in folds)
+    models, scaled = _baseline_models(
+        n_rows=n_train,
+        n_classes=len(np.unique(folds[0]["y_train"])),
+        lr_max_iter=lr_max_iter,
+        scale_linear_models=scale_linear_models,
+        svm_kernel=svm_kernel,
+        svm_probability=svm_probability,
+        extended_metrics=extended_metrics,
+        svm_backend=svm_backend,
+        svm_exact_max_rows=svm_exact_max_rows,
+        svm_sgd_min_rows=svm_sgd_min_rows,
+        svm_n_components=svm_n_components,
+        random_state=random_state,
+        imbalance_strategy=imbalance_strategy,
+        models=models,
+        categorical_mask=folds[0]["categorical_mask"],
+    )
+    candidates = {
+        name: _candidates(name, model, search, param_grids, n_iter, random_state) for name, model in models.items()
+    }
+    if search == "halving":
+        rungs = _halving_rungs(max(len(c) for c in candidates.values()), n_train, halving_factor, min_resources)
+    else:
+        rungs = [None]
+    total_jobs = sum(len(c) for c in candidates.values()) * len(folds)
+    outer_jobs, inner_jobs = _split_core_budget(n_jobs, total_jobs)
+    if inner_jobs > 1 and "Random Forest" in models:
+        models["Random Forest"].set_params(n_jobs=inner_jobs)
+
+    alive = {name: list(range(len(c))) for name, c in candidates.items()}
+    scores: Dict[tuple, Dict[str, Any]] = {}
+    memo: Dict[tuple, Any] = {}
+    pool, owned = _resolve_executor(executor, outer_jobs) if (executor is not None or outer_jobs > 1) else (None, False)
+    try:
+        with warnings.catch_warnings(), _limit_threads(pool, outer_jobs, inner_jobs) as per_fit:
+            warnings.filterwarnings("ignore", category=ConvergenceWarning)
+            for r, n_rows in enumerate(rungs):
+                jobs = []
+                for name, idxs in alive.items():
+                    for c in idxs:
+                        model = _with_params(models[name], candidates[name][c])
+                        for f, fold in enumerate(folds):
+                            X_train, y_train, X_test = _fold_inputs(fold, scaled[name], n_rows, memo)
+                            jobs.append(((name, c, f), (f"{name}#{c}/fold{f}", model if f == 0 else clone(model),
+                                         X_train, y_train, X_test, fold["y_test"], extended_metrics, per_fit)))
+                logger.info(f"Rung {r + 1}/{len(rungs)}: {len(jobs)} jobs, train rows={n_rows or 'all'}")
+                fold_metrics: Dict[tuple, List[Dict[str, Any]]] = {}
+                with timed(f"cv_rung_{r + 1}"):
+                    for (name, c, f), metrics in _run_jobs(jobs, pool):
+                        if metrics is not None:
+                            fold_metrics.setdefault((name, c), []).append(metrics)
+                for name, idxs in alive.items():
+                    for c in idxs:
+                        runs = fold_metrics.get((name, c))
+                        scores[(name, c)] = _summarize(runs) if runs and len(runs) == len(folds) else None
+                    if r < len(rungs) - 1:
+                        keep = max(1, math.ceil(len(idxs) / halving_factor))
+                        alive[name] = sorted(idxs, key=lambda c: _score(scores[(name, c)], scoring), reverse=True)[:keep]
+                memo.clear()
+    finally:
+        if owned:
+            pool.shutdown(wait=True)
+
+    results = {}
+    for name, idxs in alive.items():
+        best = max(idxs, key=lambda c: _score(scores[(name, c)], scoring))
+        summary = scores[(name, best)]
+        if summary is None:
+            results[name] = {"status": "failed", "best_params": candidates[name][best]}
+            logger.warning(f"{name}: every candidate failed")
+            continue
+        results[name] = {**summary, "best_params": candidates[name][best], "cv_folds": len(folds),
+                         "n_candidates": len(candidates[name])}
+        logger.info(
+            f"Completed {name}: {scoring}={summary[scoring]:.3f} ± {summary[scoring + ' (std)']:.3f} "
+            f"best_params={candidates[name][best]}"
+        )
+    return results
+
+
+def _score(summary, scoring):
+    return -math.inf if summary is None else summary.get(scoring, -math.inf)
+
+
+def _run_jobs(jobs, pool):
+    """Yield ``(job key, metrics or None)``; a failing candidate does not stop the search."""
+    if pool is None:
+        for key, args in jobs:
+            yield key, _safe(args)
+        return
+    futures = {pool.submit(_fit_and_evaluate, *args): (key, args[0]) for key, args in jobs}
+    for future in as_completed(futures):
+        key, label = futures[future]
+        try:
+            yield key, future.result()[1]
+        except Exception as e:
+            logger.warning(f"{label} failed: {type(e).__name__}: {e}")
+            yield key, None
+
+
+def _safe(args):
+    try:
+        return _fit_and_evaluate(*args)[1]
+    except Exception as e:
+        logger.warning(f"{args[0]} failed: {type(e).__name__}: {e}")
+        return None
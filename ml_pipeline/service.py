@@ -0,0 +1,266 @@
+"""Long-running job service: warm imports, an in-memory dataset cache and a worker pool.
+
+``JobServer`` listens on a Unix socket or a localhost TCP port (asyncio). It
+accepts newline-delimited JSON requests and answers each with a stream of
+JSON lines:
+
+- ``{"op": "run", "job": {...}}``: ``job`` holds the options ``merge_config``
+  produces for a CLI run. The server replies with ``{"event": "log", ...}``
+  lines while the job runs, then one ``{"event": "result", "status": "ok" |
+  "failed", ...}`` line.
+- ``{"op": "stats"}``: queue, worker and dataset-cache counters.
+- ``{"op": "shutdown"}``: stop accepting connections and exit once running
+  jobs finish.
+
+Jobs run on a thread pool inside the server process, so they share the
+already-imported modules and a ``DatasetCache`` of loaded / encoded frames
+keyed by file path, mtime, size and load options. Log records a job emits on
+its own thread are streamed back to the client that submitted it.
+
+This module only uses the standard library, so ``submit`` (the client) starts
+as fast as the CLI's ``--help``.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .logging_utils import LOGGER_NAME, get_logger
+
+logger = get_logger("service")
+
+DEFAULT_CACHE_BYTES = 4 * 1024 ** 3
+DEFAULT_PORT = 8765
+_JOB: contextvars.ContextVar = contextvars.ContextVar("ml_autopipeline_job", default=None)
+
+
+def _nbytes(obj) -> int:
+    if hasattr(obj, "memory_usage"):  # DataFrame
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if hasattr(obj, "data") and hasattr(obj, "indptr"):  # CSR matrix
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    return int(getattr(obj, "nbytes", 0))
+
+
+class DatasetCache:
+    """Thread-safe LRU of loaded datasets bounded by their in-memory size.
+
+    Keys combine the resolved file path, its mtime and size (so an edited file
+    is reloaded) with the load options. Concurrent requests for the same key
+    load it once. Cached objects are shared between jobs and must be treated
+    as read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Any, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path, **options):
+        p = Path(path).resolve()
+        st = p.stat()
+        return str(p), st.st_mtime_ns, st.st_size, json.dumps(options, sort_keys=True, default=str)
+
+    def get_or_load(self, path, loader: Callable[[], Any], **options):
+        key = self.key(path, **options)
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    logger.info(f"Dataset cache hit for {path} {options}")
+                    return self._entries[key][0]
+                self.misses += 1
+            value = loader()
+            with self._lock:
+                self._entries[key] = (value, _nbytes(value))
+                self._evict()
+                self._loading.pop(key, None)
+        return value
+
+    def _evict(self):
+        # The newest entry always stays, even if it alone exceeds the budget
+        while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+            (path, *_), (_, size) = self._entries.popitem(last=False)
+            logger.info(f"Evicted {path} ({size:,} bytes) from the dataset cache")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, size in self._entries.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class _JobLogHandler(logging.Handler):
+    """Forward records emitted in a job's context to that job's client stream."""
+
+    def emit(self, record):
+        job = _JOB.get()
+        if job is None or record.levelno < job["level"]:
+            return
+        job["send"]({"event": "log", "level": record.levelname, "logger": record.name,
+                     "message": record.getMessage(), "ts": record.created})
+
+
+class JobServer:
+    """Serve ``run_job(job, datasets)`` requests; see the module docstring for the protocol."""
+
+    def __init__(self, run_job: Callable[[Dict[str, Any], DatasetCache], Any], max_workers: int = 2,
+                 cache_bytes: int = DEFAULT_CACHE_BYTES, on_idle: Optional[Callable[[], None]] = None):
+        self.run_job = run_job
+        self.max_workers = max_workers
+        self.datasets = DatasetCache(cache_bytes)
+        self.on_idle = on_idle
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self._stop: Optional[asyncio.Event] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": self.running, "completed": self.completed, "failed": self.failed,
+                "max_workers": self.max_workers, "datasets": self.datasets.stats(), "pid": os.getpid()}
+
+    async def _run(self, job, send):
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        level = {0: logging.WARNING, 1: logging.INFO}.get(job.get("verbose") or 0, logging.DEBUG)
+        ctx.run(_JOB.set, {"level": level, "send": lambda msg: loop.call_soon_threadsafe(send, msg)})
+        self.running += 1
+        start = time.perf_counter()
+        logger.info(f"Job started: {job.get('file')} target={job.get('target')} ({self.running} running)")
+        try:
+            results = await loop.run_in_executor(self.pool, ctx.run, self.run_job, job, self.datasets)
+            self.completed += 1
+            reply = {"event": "result", "status": "ok", "results": results}
+        except (Exception, SystemExit) as e:  # a job calling sys.exit must not stop the server
+            self.failed += 1
+            logger.error(f"Job failed: {type(e).__name__}: {e}")
+            reply = {"event": "result", "status": "failed", "error": f"{type(e).__name__}: {e}",
+                     "traceback": traceback.format_exc()}
+        finally:
+            self.running -= 1
+            if self.running == 0 and self.on_idle is not None:
+                self.on_idle()
+        reply["elapsed_s"] = time.perf_counter() - start
+        return reply
+
+    async def _handle(self, reader, writer):
+        def send(msg):
+            writer.write((json.dumps(msg, default=str) + "\n").encode())
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    send({"event": "error", "error": "request is not valid JSON"})
+                    break
+                op = request.get("op", "run")
+                if op == "run":
+                    send(await self._run(request.get("job") or {}, send))
+                elif op == "stats":
+                    send({"event": "stats", **self.stats()})
+                elif op == "shutdown":
+                    send({"event": "shutdown"})
+                    await writer.drain()
+                    self._stop.set()
+                    break
+                else:
+                    send({"event": "error", "error": f"unknown op {op!r}"})
+                await writer.drain()
+        except ConnectionError:
+            logger.warning("Client disconnected")
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=None, host: str = "127.0.0.1", port: int = DEFAULT_PORT, ready=None):
+        """Accept connections until a shutdown request or SIGINT / SIGTERM."""
+        self._stop = asyncio.Event()
+        if socket_path:
+            if Path(socket_path).exists():
+                Path(socket_path).unlink()
+            server = await asyncio.start_unix_server(self._handle, path=str(socket_path))
+            where = f"unix:{socket_path}"
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+            where = f"{host}:{server.sockets[0].getsockname()[1]}"
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError):  # pragma: no cover - non-main thread / Windows
+                pass
+        # Each job picks its own level for the records streamed to its client, so the
+        # package logger passes everything and the server's own handlers keep its level
+        package_logger = logging.getLogger(LOGGER_NAME)
+        server_level = package_logger.getEffectiveLevel()
+        handler_levels = {h: h.level for h in package_logger.handlers}
+        for h in package_logger.handlers:
+            h.setLevel(max(h.level, server_level))
+        handler = _JobLogHandler()
+        package_logger.addHandler(handler)
+        package_logger.setLevel(logging.DEBUG)
+        logger.warning(f"Serving on {where} with {self.max_workers} workers")
+        if ready is not None:
+            ready(where)
+        try:
+            async with server:
+                await self._stop.wait()
+        finally:
+            package_logger.removeHandler(handler)
+            package_logger.setLevel(server_level)
+            for h, level in handler_levels.items():
+                h.setLevel(level)
+            self.pool.shutdown(wait=True)
+            if socket_path and Path(socket_path).exists():
+                Path(socket_path).unlink()
+            logger.warning("Server stopped")
+
+
+def _connect(socket_path=None, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+    if socket_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(socket_path))
+        return sock
+    return socket.create_connection((host, port))
+
+
+def request(message: Dict[str, Any], on_log: Optional[Callable[[Dict[str, Any]], None]] = None,
+            socket_path=None, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> Dict[str, Any]:
+    """Send one request and return the final reply; ``log`` events go to ``on_log`` as they arrive."""
+    with _connect(socket_path, host, port) as sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps(message, default=str) + "\n").encode())
+        stream.flush()
+        for line in stream:
+            reply = json.loads(line)
+            if reply.get("event") == "log":
+                if on_log is not None:
+                    on_log(reply)
+                continue
+            return reply
+    raise ConnectionError("Server closed the connection without a reply")
+
+
+def submit(job: Dict[str, Any], on_log=None, **address) -> Dict[str, Any]:
+    """Run ``job`` on a server and return its ``result`` reply."""
+    return request({"op": "run", "job": job}, on_log=on_log, **address)
@@ -0,0 +1,244 @@
+"""Mergeable, bounded-memory accumulators for single-pass statistics.
+
+Every accumulator exposes ``update(values)`` for a new chunk and
+``merge(other)`` to combine partial results (e.g. from parallel readers), so
+memory depends on the sketch parameters and never on the number of rows.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class Moments:
+    """Count/min/max/mean/variance merged with Chan et al.'s parallel Welford update."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        other = Moments()
+        other.n = int(values.size)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other: "Moments") -> None:
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.min, self.max = other.n, other.mean, other.m2, other.min, other.max
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance (ddof=1), matching ``pandas.Series.var``."""
+        return self.m2 / (self.n - 1) if self.n > 1 else None
+
+
+class HyperLogLog:
+    """Approximate distinct counter with 2**p one-byte registers (~1.04/sqrt(2**p) error)."""
+
+    def __init__(self, p: int = 14):
+        if not 11 <= p <= 18:
+            raise ValueError("HyperLogLog precision p must be between 11 and 18")
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> None:
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        tail_bits = 64 - self.p
+        idx = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        # rank = position of the leftmost 1-bit in the tail (tail_bits + 1 when tail == 0).
+        # tail < 2**53 for p >= 11, so float64 frexp gives the exact bit length.
+        _, bit_length = np.frexp(tail.astype(np.float64))
+        rank = (tail_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = float(self.registers.size)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))  # linear counting for small cardinalities
+        return int(round(raw))
+
+
+class QuantileSketch:
+    """KLL-style compactor hierarchy for approximate quantiles.
+
+    Level ``h`` holds items of weight ``2**h``; a full level is sorted and every
+    other item (random offset) is promoted, so memory is O(k log(n/k)).
+    """
+
+    def __init__(self, k: int = 256, seed: int = 0):
+        self.k = k
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for h, items in enumerate(other.levels):
+            if h >= len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size > self.k:
+                items = np.sort(items)
+                offset = int(self._rng.integers(2))
+                # An odd leftover stays at this level so total weight is preserved
+                keep = items[-1:] if items.size % 2 else items[:0]
+                pairs = items[: items.size - keep.size]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], pairs[offset::2]])
+                self.levels[h] = keep
+            h += 1
+
+    def quantiles(self, qs) -> Dict[float, Optional[float]]:
+        items = np.concatenate(self.levels)
+        if items.size == 0:
+            return {q: None for q in qs}
+        weights = np.concatenate([np.full(lvl.size, 2.0 ** h) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        out = {}
+        for q in qs:
+            pos = int(np.searchsorted(cum, q * cum[-1], side="left"))
+            out[q] = float(items[min(pos, items.size - 1)])
+        return out
+
+
+class TopK:
+    """Frequent values via per-chunk ``value_counts`` with a bounded candidate table.
+
+    Counts are exact while the table holds fewer than ``capacity`` values;
+    beyond that the least frequent candidates are dropped (counts become lower
+    bounds), keeping memory independent of cardinality.
+    """
+
+    def __init__(self, k: int = 10, capacity: int = 1000):
+        self.k = k
+        self.capacity = max(capacity, k)
+        self.counts: Dict[Any, int] = {}
+
+    def update(self, values: pd.Series) -> None:
+        vc = values.value_counts(dropna=True)
+        vc = vc[vc > 0]  # categoricals report unused categories with zero counts
+        if len(vc) > self.capacity:
+            vc = vc.iloc[: self.capacity]
+        for value, count in vc.items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        self._trim()
+
+    def merge(self, other: "TopK") -> None:
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self._trim()
+
+    def _trim(self) -> None:
+        if len(self.counts) > self.capacity:
+            kept = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[: self.capacity]
+            self.counts = dict(kept)
+
+    def top(self):
+        return sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[: self.k]
+
+
+class ColumnAccumulator:
+    """All streaming statistics for one column."""
+
+    QUANTILES = (0.25, 0.5, 0.75)
+
+    def __init__(self, hll_p: int = 14, quantile_k: int = 256, top_k: int = 10):
+        self.count = 0
+        self.missing = 0
+        self.dtypes = set()
+        self.moments = Moments()
+        self.distinct = HyperLogLog(hll_p)
+        self.quantiles = QuantileSketch(quantile_k)
+        self.top = TopK(top_k)
+
+    def update(self, series: pd.Series) -> None:
+        self.count += len(series)
+        self.dtypes.add(str(series.dtype))
+        notna = series.notna()
+        values = series[notna]
+        self.missing += len(series) - len(values)
+        self.distinct.update(values)
+        self.top.update(values)
+        if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+            arr = values.to_numpy(dtype=np.float64)
+            self.moments.update(arr)
+            self.quantiles.update(arr)
+
+    def merge(self, other: "ColumnAccumulator") -> None:
+        self.count += other.count
+        self.missing += other.missing
+        self.dtypes |= other.dtypes
+        self.moments.merge(other.moments)
+        self.distinct.merge(other.distinct)
+        self.quantiles.merge(other.quantiles)
+        self.top.merge(other.top)
+
+    @property
+    def dtype(self) -> str:
+        """Dtype of the concatenated column: numeric chunks that differ widen to float64."""
+        if len(self.dtypes) == 1:
+            return next(iter(self.dtypes))
+        if all(d.startswith(("int", "uint", "float")) for d in self.dtypes):
+            return "float64"
+        return "object"
+
+    def summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "count": self.count,
+            "missing": self.missing,
+            "distinct_approx": self.distinct.estimate(),
+            "top_values": self.top.top(),
+        }
+        if self.moments.n:
+            var = self.moments.variance
+            out.update({
+                "min": self.moments.min,
+                "max": self.moments.max,
+                "mean": self.moments.mean,
+                "std": float(np.sqrt(var)) if var is not None else None,
+                "quantiles": self.quantiles.quantiles(self.QUANTILES),
+            })
+        return out
@@ -0,0 +1,288 @@
+"""Out-of-core training with ``partial_fit``.
+
+``train_streaming`` never holds more than one CSV chunk in memory:
+
+1. A first pass collects the class labels, decides which columns are numeric
+   and accumulates their mean/variance (``sketches.Moments``) over the
+   training rows only.
+2. ``epochs`` passes feed the training rows of each chunk to every
+   ``partial_fit`` model: numeric columns standardized with the pass-1
+   statistics, other columns hashed as ``column=value`` into a fixed-width
+   sparse block.
+3. A final pass predicts the test rows and adds them to one confusion matrix
+   per model, from which the usual metrics are derived.
+
+Rows are assigned to train or test by a keyed hash of their content, so the
+split is the same for any chunk size and stable when rows are reordered or
+appended. The hash is taken over a canonical form of each value (numbers as
+float64, everything else as text), not the dtypes pandas happens to infer for
+one chunk.
+"""
+import time
+import warnings
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import BernoulliNB
+
+from .formats import iter_chunks
+from .loading import DEFAULT_CHUNKSIZE
+from .logging_utils import get_logger
+from .metrics import base_metrics
+from .sketches import Moments
+from .timing import timed
+
+logger = get_logger("streaming")
+
+SPLIT_RESOLUTION = 1 << 20
+
+
+def streaming_models(random_state: int = 42) -> Dict[str, Any]:
+    """Default ``partial_fit`` estimators: SGD with logistic and hinge loss, Bernoulli naive Bayes."""
+    return {
+        "SGD Logistic Regression": SGDClassifier(loss="log_loss", random_state=random_state),
+        "SGD Linear SVM": SGDClassifier(loss="hinge", random_state=random_state),
+        # Binarizes at 0: standardized numerics become above/below-mean indicators
+        "Naive Bayes": BernoulliNB(binarize=0.0),
+    }
+
+
+class ChunkForest(BaseEstimator, ClassifierMixin):
+    """Random forest grown chunk by chunk: every ``partial_fit`` adds trees fitted on that chunk only.
+
+    Each call fits ``trees_per_chunk`` trees on the rows it is given, and
+    predictions average all trees' probabilities over the ``classes`` passed
+    to the first call. A chunk does not need to contain every class. Earlier
+    trees are never refitted, so appending data only costs the new trees.
+    """
+
+    def __init__(self, trees_per_chunk: int = 10, max_depth: Optional[int] = None, min_samples_leaf: int = 1,
+                 random_state: int = 42):
+        self.trees_per_chunk = trees_per_chunk
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.random_state = random_state
+
+    def partial_fit(self, X, y, classes=None):
+        if not hasattr(self, "classes_"):
+            if classes is None:
+                raise ValueError("classes must be passed to the first partial_fit call")
+            self.classes_ = np.asarray(classes)
+            self.forests_: List[RandomForestClassifier] = []
+        forest = RandomForestClassifier(
+            n_estimators=self.trees_per_chunk, max_depth=self.max_depth, min_samples_leaf=self.min_samples_leaf,
+            random_state=self.random_state + len(self.forests_),
+        )
+        self.forests_.append(forest.fit(X, y))
+        return self
+
+    @property
+    def n_estimators_(self) -> int:
+        return sum(f.n_estimators for f in self.forests_)
+
+    def predict_proba(self, X):
+        proba = np.zeros((X.shape[0], len(self.classes_)))
+        for forest in self.forests_:
+            cols = np.searchsorted(self.classes_, forest.classes_)
+            proba[:, cols] += forest.predict_proba(X) * forest.n_estimators
+        return proba / self.n_estimators_
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _row_hash(chunk: pd.DataFrame, key: str) -> np.ndarray:
+    """Keyed uint64 hash of each row, taken over canonical values: numbers as float64, everything else as text.
+
+    The same CSV row parses to ``int64`` in one chunk, ``float64`` in another (a
+    missing value elsewhere in the chunk) or ``object`` (a stray string), and
+    ``hash_pandas_object`` hashes each of those differently.
+    """
+    h = np.zeros(len(chunk), dtype=np.uint64)
+    for _, col in chunk.items():
+        if is_numeric_dtype(col) and not is_bool_dtype(col):
+            col_hash = pd.util.hash_array(col.to_numpy(dtype=np.float64), hash_key=key)
+        else:
+            # Hash each distinct value once; text columns repeat a few values many times
+            codes, uniques = pd.factorize(col)
+            uniques = pd.Series(uniques, dtype=object)
+            num = np.full(len(uniques), np.nan) if is_bool_dtype(col) else pd.to_numeric(uniques, errors="coerce")
+            num = np.append(np.asarray(num, dtype=np.float64), np.nan)  # code -1 (missing) picks the NaN
+            unique_hash = pd.util.hash_array(num, hash_key=key)
+            words = np.isnan(num[:-1])  # values that are not numbers keep their text
+            unique_hash[:-1][words] = pd.util.hash_array(uniques[words].astype(str).to_numpy(dtype=object), hash_key=key)
+            col_hash = unique_hash[codes]
+        h = (h ^ col_hash) * np.uint64(0x100000001B3)  # FNV-style combine, order-sensitive
+    return h
+
+
+def hash_split(chunk: pd.DataFrame, test_size: float, random_state: int = 42) -> np.ndarray:
+    """Boolean test-row mask from a keyed hash of each row's canonical values (see ``_row_hash``)."""
+    key = f"{random_state:016d}"[-16:]
+    h = _row_hash(chunk, key)
+    return (h % SPLIT_RESOLUTION) < int(round(test_size * SPLIT_RESOLUTION))
+
+
+class ChunkFeaturizer:
+    """Fixed-width CSR features for any chunk: scaled numerics then hashed categoricals."""
+
+    def __init__(self, numeric: Dict[str, Moments], categorical: List[str], n_hash_features: int = 1024):
+        self.numeric = list(numeric)
+        self.mean = np.array([numeric[c].mean for c in self.numeric])
+        std = np.array([np.sqrt(numeric[c].variance or 0.0) for c in self.numeric])
+        self.scale = np.where(std > 0, std, 1.0)
+        self.categorical = list(categorical)
+        self.hasher = FeatureHasher(n_features=n_hash_features, input_type="string", alternate_sign=False)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.numeric) + (self.hasher.n_features if self.categorical else 0)
+
+    def transform(self, chunk: pd.DataFrame) -> sp.csr_matrix:
+        num = chunk[self.numeric].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+        # Missing values are imputed with the mean, i.e. 0 after scaling
+        num = np.nan_to_num((num - self.mean) / self.scale, nan=0.0)
+        blocks = [sp.csr_matrix(num)]
+        if self.categorical:
+            values = chunk[self.categorical].astype(str).to_numpy()
+            tokens = ([f"{c}={v}" for c, v in zip(self.categorical, row)] for row in values)
+            blocks.append(self.hasher.transform(tokens))
+        return sp.hstack(blocks, format="csr")
+
+
+def _chunks(file_path, target, chunksize, usecols):
+    for chunk in iter_chunks(file_path, chunksize=chunksize, usecols=usecols):
+        yield chunk[chunk[target].notna()]
+
+
+class _Scan:
+    """Pass-1 statistics, updated chunk by chunk: classes, numeric columns and their training-row moments."""
+
+    def __init__(self, target, test_size, random_state):
+        self.target = target
+        self.test_size = test_size
+        self.random_state = random_state
+        self.classes = set()
+        self.moments: Dict[str, Moments] = {}
+        self.non_numeric = set()
+        self.columns = None
+        self.rows = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if self.columns is None:
+            self.columns = [c for c in chunk.columns if c != self.target]
+        self.rows += len(chunk)
+        self.classes.update(chunk[self.target].unique().tolist())
+        train = chunk[~hash_split(chunk, self.test_size, self.random_state)]
+        for col in self.columns:
+            if col in self.non_numeric:
+                continue
+            if not is_numeric_dtype(chunk[col]):
+                self.non_numeric.add(col)
+                self.moments.pop(col, None)
+                continue
+            values = train[col].to_numpy(dtype=np.float64)
+            self.moments.setdefault(col, Moments()).update(values[~np.isnan(values)])
+
+    def result(self, file_path):
+        if self.columns is None:
+            raise ValueError(f"No labelled rows in {file_path}")
+        numeric = {c: self.moments.get(c, Moments()) for c in self.columns if c not in self.non_numeric}
+        categorical = [c for c in self.columns if c in self.non_numeric]
+        return np.array(sorted(self.classes)), numeric, categorical, self.rows
+
+
+def _scan(file_path, target, chunksize, usecols, test_size, random_state):
+    """Pass 1: classes, numeric columns and their training-row moments."""
+    scan = _Scan(target, test_size, random_state)
+    for chunk in _chunks(file_path, target, chunksize, usecols):
+        scan.update(chunk)
+    return scan.result(file_path)
+
+
+def train_streaming(
+    file_path,
+    target: str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    test_size: float = 0.3,
+    random_state: int = 42,
+    usecols=None,
+    epochs: int = 1,
+    n_hash_features: int = 1024,
+    models: Optional[Dict[str, Any]] = None,
+    extended_metrics: bool = False,
+):
+    """Train ``partial_fit`` models on a CSV larger than memory; return metrics per model.
+
+    Parameters:
+        file_path: CSV (or Parquet / Feather / ``.npy``) path, read ``chunksize`` rows at a time
+        target: Target column; rows with a missing target are skipped
+        test_size: Expected fraction of rows held out by the hash split
+        random_state: Seeds the split hash and the SGD models
+        usecols: Optional columns to read (must include ``target``)
+        epochs: Passes over the training rows
+        n_hash_features: Width of the hashed block for non-numeric columns
+        models: ``{name: estimator}`` with ``partial_fit``; defaults to
+            ``streaming_models(random_state)``
+        extended_metrics: If True, include the confusion matrix
+
+    Memory is bounded by one chunk plus the models, independent of file size.
+    """
+    models = models if models is not None else streaming_models(random_state)
+    logger.info(f"Streaming training on {file_path} chunksize={chunksize} epochs={epochs} models={list(models)}")
+    with timed("streaming_scan"):
+        classes, numeric, categorical, rows = _scan(file_path, target, chunksize, usecols, test_size, random_state)
+    logger.info(
+        f"{rows} labelled rows, {len(classes)} classes, {len(numeric)} numeric and {len(categorical)} hashed columns"
+    )
+    featurizer = ChunkFeaturizer(numeric, categorical, n_hash_features)
+
+    fit_seconds = {name: 0.0 for name in models}
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=ConvergenceWarning)
+        for epoch in range(epochs):
+            with timed(f"streaming_epoch_{epoch + 1}"):
+                for i, chunk in enumerate(_chunks(file_path, target, chunksize, usecols)):
+                    train = chunk[~hash_split(chunk, test_size, random_state)]
+                    logger.debug("Epoch %d chunk %d: %d training rows", epoch + 1, i, len(train))
+                    if train.empty:
+                        continue
+                    X, y = featurizer.transform(train), train[target].to_numpy()
+                    for name, model in models.items():
+                        start = time.perf_counter()
+                        model.partial_fit(X, y, classes=classes)
+                        fit_seconds[name] += time.perf_counter() - start
+
+    n = len(classes)
+    cms = {name: np.zeros((n, n), dtype=np.int64) for name in models}
+    with timed("streaming_evaluate"):
+        for chunk in _chunks(file_path, target, chunksize, usecols):
+            test = chunk[hash_split(chunk, test_size, random_state)]
+            if test.empty:
+                continue
+            X = featurizer.transform(test)
+            true = np.searchsorted(classes, test[target].to_numpy())
+            for name, model in models.items():
+                pred = np.searchsorted(classes, model.predict(X))
+                cms[name] += np.bincount(true * n + pred, minlength=n * n).reshape(n, n)
+
+    results = {}
+    for name, cm in cms.items():
+        if cm.sum() == 0:
+            raise ValueError("No test rows; increase test_size")
+        results[name] = base_metrics(cm)
+        if extended_metrics:
+            results[name]["confusion_matrix"] = cm.tolist()
+        logger.info(
+            f"Completed {name}: Acc={results[name]['Accuracy']:.3f} F1={results[name]['F1 Score']:.3f} "
+            f"partial_fit={fit_seconds[name]:.3f}s"
+        )
+    return results
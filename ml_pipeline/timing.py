@@ -1,40 +1,302 @@
+"""Timing helpers and the stage span recorder.
+
+``span`` records nested pipeline stages (wall time, CPU time, peak memory
+delta, input rows/cols) into the process-wide ``RECORDER``, which can be
+exported as JSON, a Chrome trace-event file or a Prometheus textfile at the
+end of a run. ``timed`` is a span that also logs its duration.
+"""
+import cProfile
+import functools
+import json
+import os
+import re
+import threading
 import time
-import logging
-from contextlib import contextmanager
-from typing import Callable, Any
-from .logging_utils import get_logger
+import tracemalloc
+import uuid
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .constants import SPAN_FORMATS
+from .logging_utils import get_logger, CURRENT_SPAN
 
 logger = get_logger("timing")
 
+try:  # Unix only; memory deltas and peak RSS fall back to None elsewhere
+    import resource  # type: ignore
+except Exception:  # pragma: no cover
+    resource = None
+
+
+def _max_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, or None if unavailable."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return int(usage if os.uname().sysname == "Darwin" else usage * 1024)
+
+
+class SpanRecorder:
+    """Thread-safe in-memory store of finished spans for one run (``trace_id``)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: List[Dict[str, Any]] = []
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.cprofile_stages = set()
+        self.tracemalloc_stages = set()
+        self.profile_dir = Path(".")
+
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(record)
+
+    def update(self, span_id: str, **fields) -> None:
+        """Amend a finished span, e.g. with rows/cols only known once the stage ran."""
+        with self._lock:
+            for record in self.spans:
+                if record["span_id"] == span_id:
+                    record.update(fields)
+                    return
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+            self.trace_id = uuid.uuid4().hex[:16]
+
+    def configure_profiling(self, cprofile=(), tracemalloc_stages=(), output_dir=".") -> None:
+        """Enable cProfile dumps (``<stage>-<span_id>.prof``) or tracemalloc memory
+        measurement for the named stages."""
+        self.cprofile_stages = set(cprofile or ())
+        self.tracemalloc_stages = set(tracemalloc_stages or ())
+        self.profile_dir = Path(output_dir)
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"trace_id": self.trace_id, "spans": list(self.spans)}
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        events = []
+        for s in self.to_json()["spans"]:
+            events.append({
+                "name": s["name"],
+                "cat": "stage",
+                "ph": "X",
+                "ts": s["start"] * 1e6,
+                "dur": s["wall_s"] * 1e6,
+                "pid": s["pid"],
+                "tid": s["tid"],
+                "args": {k: v for k, v in s.items() if k not in ("name", "start", "wall_s", "pid", "tid")},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_prometheus(self, prefix: str = "ml_autopipeline_stage") -> str:
+        """Prometheus textfile-collector format; repeated stages are summed.
+
+        The trace id goes in a comment rather than a label to keep series
+        cardinality bounded across runs.
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for s in self.to_json()["spans"]:
+            t = totals.setdefault(s["name"], {"wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_memory_delta_bytes": 0.0, "rows": 0.0, "count": 0.0})
+            t["wall_seconds"] += s["wall_s"]
+            t["cpu_seconds"] += s["cpu_s"] or 0.0
+            t["peak_memory_delta_bytes"] = max(t["peak_memory_delta_bytes"], s["peak_mem_delta_bytes"] or 0)
+            t["rows"] += s["rows"] or 0
+            t["count"] += 1
+        lines = [f"# trace_id {self.trace_id}"]
+        for metric, kind in (("wall_seconds", "counter"), ("cpu_seconds", "counter"),
+                             ("peak_memory_delta_bytes", "gauge"), ("rows", "counter"), ("count", "counter")):
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for stage, t in sorted(totals.items()):
+                label = re.sub(r'(["\\\\])', r"\\\1", stage)
+                lines.append(f'{prefix}_{metric}{{stage="{label}"}} {t[metric]:.6g}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path, fmt: str = "json") -> None:
+        if fmt not in SPAN_FORMATS:
+            raise ValueError(f"Unknown span format {fmt!r}; expected one of {SPAN_FORMATS}")
+        if fmt == "prometheus":
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.to_chrome_trace() if fmt == "chrome" else self.to_json(), indent=2, default=str)
+        Path(path).write_text(text, encoding="utf-8")
+        logger.info(f"Exported {len(self.spans)} spans to {path} ({fmt})")
+
+
+RECORDER = SpanRecorder()
+
+
+def current_span_id() -> Optional[str]:
+    ctx = CURRENT_SPAN.get()
+    return ctx[1] if ctx else None
+
+
+def _shape(rows, cols, data):
+    if data is not None:
+        shape = getattr(data, "shape", None)
+        if shape is not None and len(shape) >= 1:
+            rows = shape[0] if rows is None else rows
+            cols = (shape[1] if len(shape) > 1 else 1) if cols is None else cols
+    return rows, cols
+
+
+def record_span(
+    name: str,
+    wall_s: float,
+    start: Optional[float] = None,
+    cpu_s: Optional[float] = None,
+    rows: Optional[int] = None,
+    cols: Optional[int] = None,
+    parent_id: Optional[str] = None,
+    peak_mem_delta_bytes: Optional[int] = None,
+    span_id: Optional[str] = None,
+    **attrs,
+) -> str:
+    """Record a span measured elsewhere (e.g. in a worker) and return its id.
+
+    The parent defaults to the caller's current span.
+    """
+    span_id = span_id or uuid.uuid4().hex[:16]
+    RECORDER.add({
+        "trace_id": RECORDER.trace_id,
+        "span_id": span_id,
+        "parent_id": parent_id if parent_id is not None else current_span_id(),
+        "name": name,
+        "start": start if start is not None else time.time() - wall_s,
+        "wall_s": wall_s,
+        "cpu_s": cpu_s,
+        "peak_mem_delta_bytes": peak_mem_delta_bytes,
+        "rows": rows,
+        "cols": cols,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        **attrs,
+    })
+    return span_id
+
+
+# Active traced_peak blocks. tracemalloc has one process-wide peak and no way to
+# set it, so every reset first folds the current peak into each active block
+_TRACED: List[Dict[str, int]] = []
+_TRACED_LOCK = threading.Lock()
+
+
+@contextmanager
+def traced_peak():
+    """Measure the peak tracemalloc allocation of the block above what was allocated at its start.
+
+    Yields a dict whose ``"bytes"`` is set on exit. Blocks may nest (and run
+    on several threads): resetting the peak for an inner block does not lose
+    the enclosing block's peak. Tracing is started, and stopped again on
+    exit, if it was not already on.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    result: Dict[str, Optional[int]] = {"bytes": None}
+    with _TRACED_LOCK:
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in _TRACED:
+            frame["peak"] = max(frame["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": tracemalloc.get_traced_memory()[0], "peak": 0}
+        _TRACED.append(frame)
+    try:
+        yield result
+    finally:
+        with _TRACED_LOCK:
+            _TRACED.remove(frame)
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            for outer in _TRACED:
+                outer["peak"] = max(outer["peak"], peak)
+        result["bytes"] = peak - frame["start"]
+        if started:
+            tracemalloc.stop()
+
+
+@contextmanager
+def span(name: str, rows: Optional[int] = None, cols: Optional[int] = None, data=None, **attrs):
+    """Record a nested stage. ``data`` (anything with ``.shape``) fills rows/cols.
+
+    CPU time is process CPU (it includes other threads running concurrently).
+    Peak memory delta comes from tracemalloc when enabled for this stage, else
+    from the growth of the process RSS high-water mark.
+    """
+    rows, cols = _shape(rows, cols, data)
+    span_id = uuid.uuid4().hex[:16]
+    parent = current_span_id()
+    token = CURRENT_SPAN.set((RECORDER.trace_id, span_id))
+    use_tracemalloc = name in RECORDER.tracemalloc_stages
+    traced = ExitStack()
+    traced_mem = traced.enter_context(traced_peak()) if use_tracemalloc else None
+    mem_before = None if use_tracemalloc else _max_rss_bytes()
+    profiler = None
+    if name in RECORDER.cprofile_stages:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is already active (nested stage)
+            profiler = None
+    start_wall, start_perf, start_cpu = time.time(), time.perf_counter(), time.process_time()
+    try:
+        yield span_id
+    finally:
+        wall = time.perf_counter() - start_perf
+        cpu = time.process_time() - start_cpu
+        if profiler is not None:
+            profiler.disable()
+            RECORDER.profile_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(RECORDER.profile_dir / f"{name}-{span_id}.prof"))
+        traced.close()
+        if traced_mem is not None:
+            mem_delta = traced_mem["bytes"]
+        else:
+            after = _max_rss_bytes()
+            mem_delta = after - mem_before if after is not None and mem_before is not None else None
+        CURRENT_SPAN.reset(token)
+        record_span(
+            name, wall, start=start_wall, cpu_s=cpu, rows=rows, cols=cols, parent_id=parent,
+            peak_mem_delta_bytes=mem_delta, span_id=span_id,
+            mem_source="tracemalloc" if use_tracemalloc else "rss", **attrs,
+        )
+
+
+@contextmanager
 def time_block(label: str, callback: Callable[[float], None] | None = None):
     start = time.perf_counter()
     yield_obj = {}
     try:
-        yield yield_obj
+        with span(label):
+            yield yield_obj
     finally:
         elapsed = time.perf_counter() - start
+        yield_obj["elapsed"] = elapsed
         if callback:
             callback(elapsed)
         else:
             logger.info(f"{label} completed in {elapsed:.3f}s")
 
+def report_elapsed(label: str, elapsed: float) -> None:
+    """Log a duration measured elsewhere (e.g. inside a worker thread/process)."""
+    logger.info(f"{label} took {elapsed:.3f}s")
+
 @contextmanager
-def timed(label: str):
+def timed(label: str, **span_attrs):
     start = time.perf_counter()
     try:
-        yield
+        with span(label, **span_attrs):
+            yield
     finally:
-        elapsed = time.perf_counter() - start
-        logger.info(f"{label} took {elapsed:.3f}s")
+        report_elapsed(label, time.perf_counter() - start)
 
 def timing_decorator(label: str):
     def outer(fn: Callable):
+        @functools.wraps(fn)
         def inner(*args, **kwargs):
-            start = time.perf_counter()
-            try:
+            with timed(f"{label} ({fn.__name__})"):
                 return fn(*args, **kwargs)
-            finally:
-                elapsed = time.perf_counter() - start
-                logger.info(f"{label} ({fn.__name__}) took {elapsed:.3f}s")
         return inner
     return outer
@@ -1,34 +1,44 @@
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.svm import SVC
-from sklearn.metrics import (
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score,
-    confusion_matrix,
-    roc_auc_score,
-)
-from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.svm import SVC, LinearSVC
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.kernel_approximation import Nystroem, RBFSampler
 from sklearn.pipeline import Pipeline
+import logging
+import os
+import time
 import warnings
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from sklearn.exceptions import ConvergenceWarning
+from .budget import fit_with_budget
+from .binning import FeatureBinner
+from .cache import fingerprint_data
+from .constants import EXECUTORS, SVM_BACKENDS
 from .logging_utils import get_logger
-from .timing import timed
+from .registry import register_model, resolve_models
+from .streaming import train_streaming  # noqa: F401  (out-of-core counterpart of train_models)
+from .progressive import ProgressiveSampling, progressive_select, summarize as summarize_progressive
+from .preprocessing import SharedFeatures, as_labels, matrix_nbytes, model_inputs, with_preprocessing
+from .sampling import resampler_for, resolve_strategy
+from .metrics import base_metrics as _base_metrics, confusion_matrix_fast, roc_auc
+from .timing import timed, report_elapsed, record_span
 
 logger = get_logger("training")
 
-try:  # optional dependency
-    from tqdm import tqdm  # type: ignore
+try:  # ships with scikit-learn; used to cap BLAS/OpenMP threads per concurrent fit
+    from threadpoolctl import threadpool_limits  # type: ignore
 except Exception:  # pragma: no cover
-    tqdm = None  # fallback
+    threadpool_limits = None
 
-def _compute_extended_metrics(y_true, y_pred, model, y_proba, average="weighted"):
+
+def _compute_extended_metrics(y_true, y_pred, model, y_proba, average="weighted", cm=None):
     metrics = {}
     # Confusion matrix
     try:
-        cm = confusion_matrix(y_true, y_pred)
+        if cm is None:
+            cm, _ = confusion_matrix_fast(y_true, y_pred)
         metrics["confusion_matrix"] = cm.tolist()
     except Exception as e:  # pragma: no cover
         logger.debug(f"Could not compute confusion matrix: {e}")
@@ -36,10 +46,10 @@ def _compute_extended_metrics(y_true, y_pred, model, y_proba, average="weighted"
     if y_proba is not None:
         try:
             if y_proba.ndim == 1:  # binary as scores
-                metrics["roc_auc"] = roc_auc_score(y_true, y_proba)
+                metrics["roc_auc"] = roc_auc(y_true, y_proba)
             else:
                 # multiclass: use one-vs-rest
-                metrics["roc_auc_ovr_weighted"] = roc_auc_score(y_true, y_proba, multi_class="ovr", average=average)
+                metrics["roc_auc_ovr_weighted"] = roc_auc(y_true, y_proba, average=average)
         except Exception as e:  # pragma: no cover
             logger.debug(f"Could not compute ROC AUC: {e}")
     return metrics
@@ -54,8 +64,24 @@ def train_models(
     scale_linear_models: bool = True,
     svm_kernel: str = "rbf",
     svm_probability: bool = False,
+    svm_backend: str = "auto",
+    svm_exact_max_rows: int = 20_000,
+    svm_sgd_min_rows: int = 500_000,
+    svm_n_components: int = 300,
     show_progress: bool = False,
     extended_metrics: bool = False,
+    n_jobs: int | None = 1,
+    executor=None,
+    encoder=None,
+    resampler=None,
+    cache=None,
+    time_budget: float | None = None,
+    model_time_budget=None,
+    feature_dtype: str = "float64",
+    return_models: bool = False,
+    imbalance_strategy: str | None = None,
+    models=None,
+    progressive=None,
 ):
     """Train a suite of baseline models and return evaluation metrics.
 
@@ -68,79 +94,518 @@ def train_models(
         scale_linear_models: If True, apply StandardScaler before LR and SVM
         svm_kernel: Kernel for SVC
         svm_probability: Enable probability estimates (slower)
+        svm_backend: "auto" picks by training rows: exact SVC up to
+            svm_exact_max_rows; above that LinearSVC (linear kernel) or a
+            Nystroem kernel approximation + LinearSVC, switching the linear
+            model to SGDClassifier from svm_sgd_min_rows. Or force one of
+            "exact", "linear", "sgd", "nystroem", "rbf_sampler"
+        svm_exact_max_rows: Largest training set fitted with exact SVC in auto mode
+        svm_sgd_min_rows: Training rows from which auto mode uses SGDClassifier
+        svm_n_components: Feature map size for Nystroem / RBFSampler
         show_progress: If True and tqdm available, show a progress bar for models
         extended_metrics: If True, include confusion matrix and ROC AUC (if possible)
+        n_jobs: Total core budget. Models are fitted concurrently and the remaining
+            cores are split among them (RF n_jobs, BLAS threads). -1 uses all cores.
+        executor: "thread" (default when n_jobs != 1), "process", "loky", or any
+            concurrent.futures.Executor instance (not shut down by this function)
+        encoder: Optional transformer (e.g. ``encoding.SparseEncoder``) fitted on
+            the training split only and applied to both splits
+        resampler: Optional callable ``(X_train, y_train) -> (X, y)`` such as
+            ``apply_smote``, applied to the encoded training split only
+        cache: Optional ``cache.ModelCache``. Each model is looked up by a hash of
+            the data, split settings, its own hyper-parameters and library
+            versions; hits skip the fit and reuse the stored metrics
+        time_budget: Wall-clock seconds for all fits together. Setting this or
+            model_time_budget runs every fit in a subprocess that is cancelled
+            when its budget runs out; see ``budget.fit_with_budget``
+        model_time_budget: Seconds per model (float) or {model name: seconds}.
+            Models that run out of time report ``status="timed_out"``; Logistic
+            Regression and Random Forest are fitted in warm-started steps and
+            report their latest checkpoint with ``status="partial"``
+        feature_dtype: "float64" or "float32". After the split (and encoder /
+            resampler) features are converted once to a read-only contiguous
+            array or CSR matrix of this dtype, and a single StandardScaler is
+            fitted for all scaled models; see ``preprocessing.SharedFeatures``
+        return_models: If True, return ``(results, models)`` where models maps
+            each completed model name to a fitted estimator that accepts the
+            encoded features (shared scaler included); see ``artifact.py``
+        imbalance_strategy: One of ``IMBALANCE_STRATEGIES``, applied to the
+            training split only. "smote", "oversample" and "undersample"
+            resample it (unless ``resampler`` is given), "class_weight" and
+            "balanced_bagging" change the models instead, and "auto" picks one
+            from the class counts (``sampling.recommend_strategy``)
+        models: Names or keys of registered models to fit (list or
+            comma-separated string; see ``registry.py``). Default: Logistic
+            Regression, Random Forest and SVM. "hist_gradient_boosting" is
+            fitted on a shared uint8 binned matrix. With
+            ``encoder=FeatureBinner()`` a raw DataFrame is binned directly, its
+            categorical columns are native categories with no one-hot
+            encoding, and every model (Random Forest included) sees the bins
+        progressive: True or a ``progressive.ProgressiveSampling``: fit the
+            models on stratified subsamples of growing size first, drop the
+            ones that fall clearly behind, stop when the learning curves
+            plateau, and fit only the rest on the full training split.
+            Every model reports its ``learning_curve``; dropped models report
+            ``status="dropped"`` and ``estimated_full_fit_s``, and the fully
+            fitted ones ``progressive_fit_s`` and ``estimated_saved_s``
     """
     logger.info(
         f"Starting training pipeline test_size={test_size} stratify={stratify} scale_linear_models={scale_linear_models} extended_metrics={extended_metrics}"
     )
+    data_key = None
+    if cache is not None:
+        with timed("data_fingerprint"):
+            data_key = fingerprint_data(X, y)
     stratify_arg = y if stratify else None
     with timed("data_split"):
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=test_size, random_state=random_state, stratify=stratify_arg
         )
+    if encoder is not None:
+        with timed("encode"):
+            X_train = encoder.fit_transform(X_train, y_train)
+            X_test = encoder.transform(X_test)
+    imbalance_strategy = resolve_strategy(imbalance_strategy, y_train)
+    if resampler is None:
+        resampler = resampler_for(imbalance_strategy, random_state=random_state)
+    if resampler is not None:
+        with timed("resample"):
+            X_train, y_train = resampler(X_train, y_train)
     logger.debug(
         f"Train shape={getattr(X_train, 'shape', None)} Test shape={getattr(X_test, 'shape', None)}"
     )
+    with timed("shared_preprocessing", data=X_train):
+        shared = SharedFeatures(X_train, X_test, dtype=feature_dtype, binned=isinstance(encoder, FeatureBinner))
+        y_train, y_test = as_labels(y_train), as_labels(y_test)
+    del X_train, X_test  # models only ever see the shared read-only views
+    logger.info(
+        f"Imbalance strategy {imbalance_strategy}: training set {shared.X_train.shape[0]} rows, "
+        f"{matrix_nbytes(shared.X_train):,} bytes"
+    )
 
-    # Pipelines with optional scaling
-    if scale_linear_models:
-        logger.debug("Building pipelines with StandardScaler for LR & SVM")
-        lr_model = Pipeline([
-            ("scaler", StandardScaler(with_mean=False) if hasattr(X_train, "sparse") else StandardScaler()),
-            ("clf", LogisticRegression(max_iter=lr_max_iter))
-        ])
-        svm_model = Pipeline([
-            ("scaler", StandardScaler(with_mean=False) if hasattr(X_train, "sparse") else StandardScaler()),
-            ("clf", SVC(kernel=svm_kernel, probability=svm_probability))
-        ])
-    else:
-        lr_model = LogisticRegression(max_iter=lr_max_iter)
-        svm_model = SVC(kernel=svm_kernel, probability=svm_probability)
-
-    models = {
-        "Logistic Regression": lr_model,
-        "Random Forest": RandomForestClassifier(random_state=random_state),
-        "SVM": svm_model,
-    }
+    models, scaled = _baseline_models(
+        n_rows=shared.X_train.shape[0],
+        n_classes=len(set(y_train)),
+        lr_max_iter=lr_max_iter,
+        scale_linear_models=scale_linear_models,
+        svm_kernel=svm_kernel,
+        svm_probability=svm_probability,
+        extended_metrics=extended_metrics,
+        svm_backend=svm_backend,
+        svm_exact_max_rows=svm_exact_max_rows,
+        svm_sgd_min_rows=svm_sgd_min_rows,
+        svm_n_components=svm_n_components,
+        random_state=random_state,
+        imbalance_strategy=imbalance_strategy,
+        models=models,
+        categorical_mask=encoder.categorical_mask_ if isinstance(encoder, FeatureBinner) else None,
+    )
 
-    iterable = models.items()
-    if show_progress and tqdm is not None:
-        iterable = tqdm(iterable, desc="Training models", total=len(models))
+    outer_jobs, inner_jobs = _split_core_budget(n_jobs, len(models))
+    if inner_jobs > 1 and "Random Forest" in models:
+        models["Random Forest"].set_params(n_jobs=inner_jobs)
 
+    keys = {}
     results = {}
+    fitted = {}
+    if cache is not None:
+        for name, model in models.items():
+            keys[name] = cache.key(
+                data_key, model, test_size=test_size, random_state=random_state, stratify=stratify,
+                extended_metrics=extended_metrics, encoder=encoder, resampler=resampler,
+                scaled=scaled[name] == "scaled", feature_dtype=feature_dtype,
+                **({"binned": True} if scaled[name] == "binned" else {}),
+            )
+            hit = cache.get(keys[name])
+            if hit is not None:
+                logger.info(f"Cache hit for {name}; skipping fit")
+                results[name] = hit[1]
+                fitted[name] = hit[0]
+    pending = {name: model for name, model in models.items() if name not in results}
+    inputs = model_inputs(shared, {name: scaled[name] for name in pending})
+    scalers = {name: shared.preprocessor(scaled[name]) for name in pending}
+    if pending and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Shared feature matrices: %s bytes", f"{shared.nbytes():,}")
+
+    curves = {}
+    if progressive and pending:
+        settings = progressive if isinstance(progressive, ProgressiveSampling) else ProgressiveSampling()
+        logger.info(f"Progressive sampling over {list(pending)}: {settings}")
+        winners, curves = progressive_select(
+            pending, inputs, y_train, y_test, settings,
+            run=lambda jobs: _run_fits(jobs, executor, outer_jobs, inner_jobs), random_state=random_state,
+        )
+        for name in pending:
+            if name not in winners:
+                results[name] = curves[name]
+        pending = {name: pending[name] for name in winners}
+        spent = summarize_progressive(curves)
+        logger.info(
+            f"Progressive sampling kept {winners}: {spent['progressive_fit_s']:.1f}s of subsample fits, "
+            f"~{spent['estimated_saved_s']:.1f}s of full fits skipped"
+        )
+
+    progress = _progress_bar(len(models), len(results)) if show_progress else None
+
     with warnings.catch_warnings():
         warnings.filterwarnings("ignore", category=ConvergenceWarning)
-        for name, model in iterable:
-            with timed(f"fit_{name.replace(' ', '_').lower()}"):
-                logger.info(f"Fitting model: {name}")
-                model.fit(X_train, y_train)
-                preds = model.predict(X_test)
-                # Probabilities or decision scores
-                proba = None
-                if extended_metrics:
-                    if hasattr(model, "predict_proba"):
-                        try:
-                            proba = model.predict_proba(X_test)
-                        except Exception:  # pragma: no cover
-                            proba = None
-                    elif hasattr(model, "decision_function"):
-                        try:
-                            proba = model.decision_function(X_test)
-                        except Exception:  # pragma: no cover
-                            proba = None
-                base_metrics = {
-                    "Accuracy": accuracy_score(y_test, preds),
-                    "Precision": precision_score(y_test, preds, average='weighted', zero_division=0),
-                    "Recall": recall_score(y_test, preds, average='weighted', zero_division=0),
-                    "F1 Score": f1_score(y_test, preds, average='weighted', zero_division=0)
-                }
-                if extended_metrics:
-                    ext = _compute_extended_metrics(y_test, preds, model, proba)
-                    base_metrics.update(ext)
-                results[name] = base_metrics
-                logger.info(
-                    f"Completed {name}: Acc={base_metrics['Accuracy']:.3f} F1={base_metrics['F1 Score']:.3f}"
+        if pending and (time_budget is not None or model_time_budget is not None):
+            logger.info(
+                f"Fitting {len(pending)} models in cancellable subprocesses time_budget={time_budget} "
+                f"model_time_budget={model_time_budget} workers={outer_jobs}"
+            )
+            with timed("budgeted_training"):
+                completed = fit_with_budget(
+                    pending, inputs, y_train, y_test, _evaluate,
+                    extended_metrics=extended_metrics,
+                    time_budget=time_budget,
+                    model_time_budget=model_time_budget,
+                    max_workers=outer_jobs,
+                    n_threads=inner_jobs if outer_jobs > 1 else None,
+                    return_models=cache is not None or return_models,
                 )
+                results.update(_collect(completed, progress, cache, keys, scalers, fitted))
+        elif pending and executor is None and outer_jobs == 1:
+            completed = (
+                _fit_and_evaluate(name, model, inputs[name][0], y_train, inputs[name][1], y_test, extended_metrics)
+                for name, model in pending.items()
+            )
+            results.update(_collect(completed, progress, cache, keys, scalers, fitted))
+        elif pending:
+            workers = min(outer_jobs, len(pending))
+            pool, owned = _resolve_executor(executor, workers)
+            logger.info(
+                f"Fitting {len(pending)} models concurrently executor={type(pool).__name__} "
+                f"workers={workers} threads_per_model={inner_jobs}"
+            )
+            try:
+                with _limit_threads(pool, workers, inner_jobs) as per_fit:
+                    futures = [
+                        pool.submit(
+                            _fit_and_evaluate, name, model, inputs[name][0], y_train, inputs[name][1], y_test,
+                            extended_metrics, per_fit,
+                        )
+                        for name, model in pending.items()
+                    ]
+                    results.update(_collect((f.result() for f in as_completed(futures)), progress, cache, keys, scalers, fitted))
+            finally:
+                if owned:
+                    pool.shutdown(wait=True)
+    if progress is not None:
+        progress.close()
+    # Completion order depends on the executor; report in the canonical model order
+    results = {name: results[name] for name in models}
+    for name in pending:
+        if name in curves:
+            results[name].update(learning_curve=curves[name]["learning_curve"], **spent)
     logger.info("Training pipeline complete")
+    if return_models:
+        return results, {name: fitted[name] for name in models if name in fitted}
     return results
+
+
+def _progress_bar(total, initial):
+    """tqdm bar for model fits, or None when tqdm (optional, imported lazily) is missing."""
+    try:
+        from tqdm import tqdm  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return tqdm(desc="Training models", total=total, initial=initial)
+
+
+def _baseline_models(n_rows, n_classes, lr_max_iter, scale_linear_models, svm_kernel, svm_probability,
+                     extended_metrics, svm_backend, svm_exact_max_rows, svm_sgd_min_rows, svm_n_components,
+                     random_state, imbalance_strategy="none", models=None, categorical_mask=None):
+    """Return ({name: unfitted model}, {name: feature kind}) for the selected registered models.
+
+    The feature kind says which shared matrix a model is fitted on: "raw",
+    "scaled" (raw when ``scale_linear_models`` is False) or "binned"; see
+    ``registry.py``. ``categorical_mask`` (from a ``FeatureBinner`` encoder)
+    marks native categorical columns for models with ``categorical_features``.
+
+    ``imbalance_strategy="class_weight"`` sets ``class_weight="balanced"`` on
+    every classifier (inside pipelines and calibration too), which reweights
+    the loss without touching the data. ``"balanced_bagging"`` wraps each model
+    in imblearn's ``BalancedBaggingClassifier`` so every bag is fitted on a
+    balanced undersample.
+    """
+    options = dict(
+        n_rows=n_rows, n_classes=n_classes, lr_max_iter=lr_max_iter, svm_kernel=svm_kernel,
+        svm_probability=svm_probability, extended_metrics=extended_metrics, svm_backend=svm_backend,
+        svm_exact_max_rows=svm_exact_max_rows, svm_sgd_min_rows=svm_sgd_min_rows,
+        svm_n_components=svm_n_components, random_state=random_state,
+    )
+    specs = resolve_models(models)
+    models = {spec.name: spec.build(**options) for spec in specs}
+    # LR and SVM share one StandardScaler fitted on the training split; binned models share one binned matrix
+    scaled = {spec.name: "raw" if spec.features == "scaled" and not scale_linear_models else spec.features
+              for spec in specs}
+    if categorical_mask is not None and categorical_mask.any():
+        for model in models.values():
+            model.set_params(**{k: categorical_mask for k in model.get_params() if k.split("__")[-1] == "categorical_features"})
+    if imbalance_strategy == "class_weight":
+        for model in models.values():
+            model.set_params(**{k: "balanced" for k in model.get_params() if k.split("__")[-1] == "class_weight"})
+    elif imbalance_strategy == "balanced_bagging":
+        models = {name: _balanced_bagging(model, random_state) for name, model in models.items()}
+    return models, scaled
+
+
+def _logistic_regression(lr_max_iter, **options):
+    return LogisticRegression(max_iter=lr_max_iter)
+
+
+def _random_forest(random_state, **options):
+    return RandomForestClassifier(random_state=random_state)
+
+
+def _svm(n_rows, n_classes, svm_kernel, svm_probability, extended_metrics, svm_backend, svm_exact_max_rows,
+         svm_sgd_min_rows, svm_n_components, random_state, **options):
+    steps = _build_svm(
+        n_rows=n_rows,
+        n_classes=n_classes,
+        kernel=svm_kernel,
+        probability=svm_probability,
+        extended_metrics=extended_metrics,
+        backend=svm_backend,
+        exact_max_rows=svm_exact_max_rows,
+        sgd_min_rows=svm_sgd_min_rows,
+        n_components=svm_n_components,
+        random_state=random_state,
+    )
+    return Pipeline(steps) if len(steps) > 1 else steps[0][1]
+
+
+def _hist_gradient_boosting(random_state, **options):
+    # Input is already binned to <= 255 codes, so its own binning keeps every distinct value
+    return HistGradientBoostingClassifier(random_state=random_state)
+
+
+register_model("Logistic Regression", _logistic_regression, features="scaled")
+register_model("Random Forest", _random_forest, features="raw")
+register_model("SVM", _svm, features="scaled")
+register_model("Hist Gradient Boosting", _hist_gradient_boosting, features="binned")
+
+
+def _balanced_bagging(model, random_state, n_bags=10):
+    from imblearn.ensemble import BalancedBaggingClassifier
+
+    if isinstance(model, RandomForestClassifier):
+        # Same total number of trees as the unbagged forest
+        model.set_params(n_estimators=max(1, model.n_estimators // n_bags))
+    return BalancedBaggingClassifier(estimator=model, n_estimators=n_bags, random_state=random_state)
+
+
+def resolve_svm_backend(n_rows, kernel="rbf", backend="auto", exact_max_rows=20_000, sgd_min_rows=500_000):
+    """The SVM backend ``backend="auto"`` stands for at ``n_rows`` training rows (other values pass through)."""
+    if backend not in SVM_BACKENDS:
+        raise ValueError(f"Unknown svm_backend {backend!r}; expected one of {SVM_BACKENDS}")
+    if backend != "auto":
+        return backend
+    if n_rows <= exact_max_rows:
+        return "exact"
+    if kernel == "linear":
+        return "sgd" if n_rows >= sgd_min_rows else "linear"
+    return "nystroem"
+
+
+def _build_svm(n_rows, n_classes, kernel, probability, extended_metrics, backend, exact_max_rows,
+               sgd_min_rows, n_components, random_state):
+    """Return the SVM pipeline steps for the chosen backend.
+
+    Exact SVC costs O(n^2)-O(n^3), so large problems use a linear model
+    (kernel="linear") or an explicit kernel feature map (Nystroem / RBFSampler)
+    followed by a linear model. Approximate backends have no predict_proba;
+    they are wrapped in sigmoid calibration when probabilities are requested
+    or extended metrics need them for a multiclass ROC AUC.
+    """
+    auto = backend == "auto"
+    backend = resolve_svm_backend(n_rows, kernel, backend, exact_max_rows, sgd_min_rows)
+    if backend == "rbf_sampler" and kernel != "rbf":
+        raise ValueError("rbf_sampler backend only approximates kernel='rbf'")
+    if backend == "exact":
+        logger.info(f"SVM backend: exact SVC kernel={kernel} rows={n_rows}")
+        return [("clf", SVC(kernel=kernel, probability=probability))]
+
+    linear = (
+        SGDClassifier(loss="hinge", random_state=random_state)
+        if backend == "sgd" or (auto and n_rows >= sgd_min_rows)
+        else LinearSVC(random_state=random_state)
+    )
+    calibrate = probability or (extended_metrics and n_classes > 2)
+    clf = CalibratedClassifierCV(linear, method="sigmoid", cv=3) if calibrate else linear
+    steps = []
+    # Nystroem's gamma=None is 1/n_features, i.e. SVC's gamma="scale" on standardized features
+    if backend == "nystroem":
+        steps.append(("feature_map", Nystroem(kernel=kernel, n_components=n_components, random_state=random_state)))
+    elif backend == "rbf_sampler":
+        steps.append(("feature_map", RBFSampler(gamma="scale", n_components=n_components, random_state=random_state)))
+    steps.append(("clf", clf))
+    logger.info(
+        f"SVM backend: {' + '.join(type(est).__name__ for _, est in steps)}"
+        f"{' (calibrated ' + type(linear).__name__ + ')' if calibrate else ''} kernel={kernel} rows={n_rows}"
+    )
+    return steps
+
+
+def _split_core_budget(n_jobs, n_models):
+    """Return (concurrent fits, threads per fit) so their product stays within n_jobs."""
+    if n_jobs is None:
+        n_jobs = 1
+    if n_jobs < 0:
+        n_jobs = max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    n_jobs = max(1, int(n_jobs))
+    outer = min(n_jobs, n_models)
+    inner = max(1, n_jobs // outer)
+    return outer, inner
+
+
+def _resolve_executor(executor, max_workers):
+    """Return (executor, owned). Owned executors are shut down by the caller."""
+    if isinstance(executor, Executor):
+        return executor, False
+    kind = executor or "thread"
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers), True
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=max_workers), True
+    if kind == "loky":
+        from joblib.externals.loky import get_reusable_executor
+        # Reusable executors are shared process-wide and must not be shut down here
+        return get_reusable_executor(max_workers=max_workers), False
+    raise ValueError(f"Unknown executor {executor!r}; expected one of {EXECUTORS} or a concurrent.futures.Executor")
+
+
+@contextmanager
+def _limit_threads(pool, workers, n_threads):
+    """Cap BLAS / OpenMP threads while ``workers`` fits run concurrently on ``pool``.
+
+    Yields the ``n_threads`` to pass to each ``_fit_and_evaluate`` call, or
+    None. threadpoolctl limits are process-global, so thread workers share
+    one cap set here around the whole pool (per-fit caps would overwrite and
+    restore each other); process and loky workers each apply their own. With
+    a single worker the core budget is not split and nothing is capped.
+    """
+    if workers <= 1 or threadpool_limits is None:
+        yield None
+    elif isinstance(pool, ThreadPoolExecutor):
+        with threadpool_limits(limits=n_threads):
+            yield None
+    else:
+        yield n_threads
+
+
+def _run_fits(jobs, executor, workers, n_threads):
+    """Run ``_fit_and_evaluate`` argument tuples serially or on an executor; results in completion order."""
+    if executor is None and workers == 1:
+        return [_fit_and_evaluate(*job) for job in jobs]
+    workers = min(workers, len(jobs))
+    pool, owned = _resolve_executor(executor, workers)
+    try:
+        with _limit_threads(pool, workers, n_threads) as per_fit:
+            futures = [pool.submit(_fit_and_evaluate, *job, per_fit) for job in jobs]
+            return [f.result() for f in as_completed(futures)]
+    finally:
+        if owned:
+            pool.shutdown(wait=True)
+
+
+def _collect(completed, progress, cache=None, keys=None, scalers=None, fitted=None):
+    results = {}
+    for name, metrics, elapsed, model, stages in completed:
+        label = name.replace(' ', '_').lower()
+        report_elapsed(f"fit_{label}", elapsed)
+        start = stages[0][1] if stages else None
+        model_span = record_span(f"model_{label}", elapsed, start=start, model=name)
+        for stage, start, wall, cpu in stages or ():
+            record_span(f"{stage}_{label}", wall, start=start, cpu_s=cpu, parent_id=model_span, model=name)
+        results[name] = metrics
+        if "status" in metrics:  # time budget: timed out, partial or failed
+            logger.warning(f"{name} did not complete within its time budget: status={metrics['status']}")
+            if model is not None and fitted is not None:  # best checkpoint; returned but never cached
+                fitted[name] = with_preprocessing(model, (scalers or {}).get(name))
+        else:
+            if model is not None:
+                # Cached / returned models must accept raw features, so the shared scaler goes with them
+                model = with_preprocessing(model, (scalers or {}).get(name))
+                if cache is not None:
+                    cache.put(keys[name], model, metrics)
+                if fitted is not None:
+                    fitted[name] = model
+            logger.info(f"Completed {name}: Acc={metrics['Accuracy']:.3f} F1={metrics['F1 Score']:.3f}")
+        if progress is not None:
+            progress.set_postfix_str(name)
+            progress.update(1)
+    return results
+
+
+def _fit_and_evaluate(name, model, X_train, y_train, X_test, y_test, extended_metrics, n_threads=None):
+    """Fit a single model and score it. Runs in the caller, a thread or a worker process.
+
+    ``n_threads`` caps BLAS / OpenMP threads for this fit (worker processes
+    only; see ``_limit_threads``). None leaves the process limits alone.
+
+    Returns (name, metrics, elapsed_seconds, fitted_model, stages) where stages
+    lists ``(stage, start_epoch, wall_s, cpu_s)`` for fit / predict / metrics;
+    the caller logs and records them so that out-of-order completion is
+    reported against the right model.
+    """
+    # Worker processes do not inherit the parent's warning filters
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+    start = time.perf_counter()
+    stages = []
+    logger.info(f"Fitting model: {name}")
+    limits = threadpool_limits(limits=n_threads) if threadpool_limits is not None and n_threads else nullcontext()
+    with limits:
+        metrics = _fit_and_score(model, X_train, y_train, X_test, y_test, extended_metrics, stages)
+    return name, metrics, time.perf_counter() - start, model, stages
+
+
+@contextmanager
+def _stage(stages, label):
+    """Append ``(label, start_epoch, wall_s, cpu_s)`` to ``stages`` (a no-op when None)."""
+    if stages is None:
+        yield
+        return
+    start, wall, cpu = time.time(), time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        stages.append((label, start, time.perf_counter() - wall, time.process_time() - cpu))
+
+
+def _fit_and_score(model, X_train, y_train, X_test, y_test, extended_metrics, stages=None):
+    with _stage(stages, "fit"):
+        model.fit(X_train, y_train)
+    return _evaluate(model, X_test, y_test, extended_metrics, stages)
+
+
+def _evaluate(model, X_test, y_test, extended_metrics, stages=None):
+    with _stage(stages, "predict"):
+        preds, proba = _predict(model, X_test, extended_metrics)
+    with _stage(stages, "metrics"):
+        # One label encoding + bincount feeds every metric
+        cm, _ = confusion_matrix_fast(y_test, preds)
+        base_metrics = _base_metrics(cm, average="weighted")
+        if extended_metrics:
+            ext = _compute_extended_metrics(y_test, preds, model, proba, cm=cm)
+            base_metrics.update(ext)
+    return base_metrics
+
+
+def _predict(model, X_test, extended_metrics):
+    preds = model.predict(X_test)
+    # Probabilities or decision scores
+    proba = None
+    if extended_metrics:
+        if hasattr(model, "predict_proba"):
+            try:
+                proba = model.predict_proba(X_test)
+            except Exception:  # pragma: no cover
+                proba = None
+        elif hasattr(model, "decision_function"):
+            try:
+                proba = model.decision_function(X_test)
+            except Exception:  # pragma: no cover
+                proba = None
+    return preds, proba
@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ml_autopipeline import train_models
+from ml_autopipeline.cli import main
+from ml_pipeline.artifact import PipelineArtifact, load_artifact, predict_csv
+from ml_pipeline.encoding import SparseEncoder
+
+class TestPipelineArtifact(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.features = pd.DataFrame({
+            'num': rng.standard_normal(200),
+            'city': rng.choice(['a', 'b', 'c'], 200),
+        })
+        self.y = pd.Series((self.features['num'] + (self.features['city'] == 'a') > 0.5).astype(int))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_dense_round_trip_and_batch_scoring(self):
+        X = pd.get_dummies(self.features)
+        results, models = train_models(X, self.y, return_models=True)
+        self.assertEqual(set(models), set(results))
+        path = PipelineArtifact.from_frame(models, self.features, X, target='target', metrics=results).save(self.dir / 'a.joblib')
+        artifact = load_artifact(path)
+        expected = models['Logistic Regression'].predict(X.to_numpy(dtype=float))
+        scored = artifact.predict(self.features, 'Logistic Regression', proba=True)
+        np.testing.assert_array_equal(scored['prediction'], expected)
+        self.assertEqual(list(scored.columns), ['prediction', 'proba_0', 'proba_1'])
+        # Batches without some categories still line up with the training layout
+        only_b = self.features[self.features['city'] == 'b']
+        np.testing.assert_array_equal(artifact.predict(only_b, 'Logistic Regression')['prediction'], expected[only_b.index])
+
+        data = self.features.assign(id=range(200))
+        data.to_csv(self.dir / 'in.csv', index=False)
+        for n_jobs in (1, 2):
+            rows = predict_csv(path, self.dir / 'in.csv', self.dir / 'out.csv', model='Logistic Regression',
+                               chunksize=37, n_jobs=n_jobs, keep_columns=['id'])
+            out = pd.read_csv(self.dir / 'out.csv')
+            self.assertEqual(rows, 200)
+            np.testing.assert_array_equal(out['id'], np.arange(200))
+            np.testing.assert_array_equal(out['prediction'], expected)
+
+    def test_sparse_encoder_artifact(self):
+        encoder = SparseEncoder()
+        results, models = train_models(self.features, self.y, encoder=encoder, return_models=True)
+        artifact = PipelineArtifact.from_frame(models, self.features, encoder=encoder, metrics=results)
+        artifact.save(self.dir / 'b.joblib')
+        loaded = load_artifact(self.dir / 'b.joblib', mmap_mode=None)
+        self.assertIn(loaded.best_model, models)
+        self.assertEqual(len(loaded.predict(self.features)), 200)
+        with self.assertRaises(KeyError):
+            loaded.predict(self.features.drop(columns=['num']))
+
+    def test_save_model_rejected_with_cross_validation(self):
+        with self.assertRaisesRegex(SystemExit, '--save-model cannot be combined with --search'):
+            main(['--file', 'data.csv', '--target', 't', '--search', 'grid', '--save-model', str(self.dir / 'm.joblib')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ml_autopipeline.cli import main
+from ml_pipeline.batch import expand_jobs, run_batch, write_report
+
+
+def _job(job):
+    if job.get('mode') == 'raise':
+        raise RuntimeError('bad job')
+    if job.get('mode') == 'exit':
+        os._exit(3)
+    if job.get('mode') == 'sleep':
+        time.sleep(30)
+    return {'Model': {'F1 Score': job['cost'] / 10, 'order': time.perf_counter()}}
+
+
+class TestRunBatch(unittest.TestCase):
+    def _jobs(self, *modes, memory=0):
+        return [{'name': f'j{i}', 'cost': i, 'memory_bytes': memory, 'mode': m} for i, m in enumerate(modes)]
+
+    def test_failures_are_isolated_and_reported(self):
+        report = run_batch(self._jobs('ok', 'raise', 'exit', 'sleep', 'ok'), _job, max_workers=2, job_timeout=3)
+        self.assertEqual([r['name'] for r in report], ['j0', 'j1', 'j2', 'j3', 'j4'])
+        self.assertEqual([r['status'] for r in report], ['ok', 'failed', 'crashed', 'timed_out', 'ok'])
+        self.assertIn('RuntimeError: bad job', report[1]['error'])
+        self.assertIn('code 3', report[2]['error'])
+        self.assertEqual(report[4]['results']['Model']['F1 Score'], 0.4)
+
+    def test_largest_first_and_memory_admission(self):
+        jobs = self._jobs('ok', 'ok', 'ok', memory=60)
+        # Budget only fits one job at a time: runs serially, largest cost first
+        report = run_batch(jobs, _job, max_workers=3, memory_budget=100)
+        order = [r['results']['Model']['order'] for r in report]
+        self.assertEqual(sorted(range(3), key=order.__getitem__), [2, 1, 0])
+        for r in report:
+            self.assertEqual(r['status'], 'ok')
+
+
+class TestBatchConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'a': rng.standard_normal(150), 'b': rng.standard_normal(150)})
+        df['t1'] = (df['a'] > 0).astype(int)
+        df['t2'] = (df['b'] > 0).astype(int)
+        df.to_csv(self.dir / 'data.csv', index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_expand_jobs_merges_defaults_and_targets(self):
+        jobs = expand_jobs({
+            'defaults': {'no_cache': True, 'n_jobs': 2},
+            'jobs': [{'file': str(self.dir / 'data.csv'), 'targets': ['t1', 't2'], 'n_jobs': 1}],
+        })
+        self.assertEqual([j['target'] for j in jobs], ['t1', 't2'])
+        self.assertTrue(all(j['no_cache'] and j['n_jobs'] == 1 for j in jobs))
+        self.assertGreater(jobs[0]['memory_bytes'], 0)
+        with self.assertRaises(ValueError):
+            expand_jobs({'jobs': []})
+
+    def test_cli_batch_writes_aggregate_report(self):
+        config = self.dir / 'batch.json'
+        config.write_text(json.dumps({
+            'defaults': {'no_cache': True},
+            'jobs': [
+                {'file': str(self.dir / 'data.csv'), 'targets': ['t1', 't2']},
+                {'file': str(self.dir / 'missing.csv'), 'target': 't1'},
+            ],
+        }))
+        report_path = self.dir / 'report.csv'
+        code = main(['batch', str(config), '--max-workers', '2', '--report', str(report_path)])
+        self.assertEqual(code, 1)  # the missing file fails, the others still complete
+        with open(report_path, newline='') as fh:
+            rows = list(csv.DictReader(fh))
+        ok = [r for r in rows if r['status'] == 'ok']
+        self.assertEqual({r['target'] for r in ok}, {'t1', 't2'})
+        self.assertIn('Logistic Regression', {r['model'] for r in ok})
+        self.assertEqual([r['status'] for r in rows if r['target'] == 't1' and 'missing' in r['file']], ['failed'])
+
+        json_path = self.dir / 'report.json'
+        write_report([{'name': 'x', 'status': 'ok', 'results': {}}], json_path)
+        self.assertEqual(json.loads(json_path.read_text())['summary'], {'ok': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from ml_pipeline.benchmark import compare_results, make_synthetic, run_benchmark
+
+class TestBenchmark(unittest.TestCase):
+    def test_make_synthetic(self):
+        df = make_synthetic(rows=1000, cols=3, n_categorical=2, cardinality=4, imbalance=0.1)
+        self.assertEqual(df.shape, (1000, 6))
+        self.assertEqual(df['cat_0'].nunique(), 4)
+        self.assertEqual(int((df['target'] == 1).sum()), 100)
+
+    def test_run_and_compare(self):
+        result = run_benchmark(rows=300, cols=3, stages=['basic_report', 'check_imbalance'])
+        self.assertEqual(set(result['stages']), {'load_data', 'encode', 'basic_report', 'check_imbalance'})
+        stage = result['stages']['basic_report']
+        for key in ('wall_s', 'cpu_s', 'peak_alloc_bytes', 'peak_rss_bytes', 'rows_per_s'):
+            self.assertIn(key, stage)
+        self.assertGreater(result['stages']['encode']['peak_alloc_bytes'], 0)
+        self.assertEqual(compare_results(result, result), [])
+        slower = {'stages': {'basic_report': dict(stage, wall_s=stage['wall_s'] * 2 + 1,
+                                                  peak_rss_bytes=stage['peak_rss_bytes'] * 2)}}
+        regressions = compare_results(slower, result)
+        self.assertEqual([(r['stage'], r['metric']) for r in regressions], [('basic_report', 'wall_s')])
+        bigger = {'stages': {'basic_report': dict(stage, peak_alloc_bytes=stage['peak_alloc_bytes'] * 2 + 1)}}
+        self.assertEqual([r['metric'] for r in compare_results(bigger, result)], ['peak_alloc_bytes'])
+
+if __name__ == "__main__":
+    unittest.main()
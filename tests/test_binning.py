@@ -0,0 +1,99 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from ml_autopipeline import train_models
+from ml_autopipeline.cli import main
+from ml_pipeline.artifact import predict_csv
+from ml_pipeline.binning import FeatureBinner
+from ml_pipeline.preprocessing import SharedFeatures
+from ml_pipeline.registry import register_model, resolve_models
+
+
+class TestFeatureBinner(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'x': rng.standard_normal(2000),
+            'few': rng.integers(0, 5, 2000).astype(float),
+            'city': rng.choice(['a', 'b', 'c'], 2000, p=[0.6, 0.3, 0.1]),
+        })
+        self.df.loc[::50, 'x'] = np.nan
+        self.y = pd.Series((self.df['x'].fillna(0) > 0) ^ (self.df['city'] == 'c')).astype(int)
+
+    def test_codes_preserve_order_and_categories(self):
+        binner = FeatureBinner().fit(self.df)
+        B = binner.transform(self.df)
+        self.assertEqual(B.dtype, np.uint8)
+        self.assertFalse(B.flags.writeable)
+        self.assertEqual(binner.categorical_mask_.tolist(), [False, False, True])
+        x = self.df['x'].to_numpy()
+        order = np.argsort(x[~np.isnan(x)])
+        self.assertTrue(np.all(np.diff(B[~np.isnan(x), 0][order].astype(int)) >= 0))
+        self.assertTrue(np.all(B[np.isnan(x), 0] == 254))
+        self.assertEqual(sorted(np.unique(B[:, 1])), [0, 1, 2, 3, 4])  # one bin per distinct value
+        self.assertEqual(B[self.df['city'].to_numpy() == 'a', 2].tolist()[0], 0)  # most frequent first
+        unseen = binner.transform(self.df.head(1).assign(city='zzz'))
+        self.assertEqual(unseen[0, 2], 254)
+
+    def test_sparse_input_and_shared_view(self):
+        M = sp.random(100, 5, density=0.3, format='csr', random_state=0)
+        np.testing.assert_array_equal(FeatureBinner().fit_transform(M), FeatureBinner().fit_transform(M.toarray()))
+        shared = SharedFeatures(self.df[['x', 'few']].fillna(0), self.df[['x', 'few']].head(10).fillna(0))
+        B_train, _ = shared.views('binned')
+        self.assertIs(shared.views('binned')[0], B_train)
+        self.assertIsNotNone(shared.preprocessor('binned'))
+        sparse = SharedFeatures(M, M[:10])
+        with self.assertLogs('ml_autopipeline.preprocessing', level='WARNING'):
+            B_sparse, _ = sparse.views('binned')
+        self.assertTrue(sp.issparse(B_sparse))  # never densified
+        self.assertIsNone(sparse.preprocessor('binned'))
+
+
+class TestModelSelection(unittest.TestCase):
+    def setUp(self):
+        TestFeatureBinner.setUp(self)
+
+    def test_models_selection_and_native_categoricals(self):
+        results, fitted = train_models(self.df, self.y, encoder=FeatureBinner(), return_models=True,
+                                       models='hist_gradient_boosting,random_forest')
+        self.assertEqual(list(results), ['Hist Gradient Boosting', 'Random Forest'])
+        self.assertGreater(results['Hist Gradient Boosting']['Accuracy'], 0.9)
+        hgb = fitted['Hist Gradient Boosting']
+        self.assertEqual(hgb.categorical_features.tolist(), [False, False, True])
+        self.assertTrue(hgb.is_categorical_.tolist()[2])
+
+    def test_mixed_models_bin_the_encoded_matrix(self):
+        X = pd.get_dummies(self.df.fillna(0))
+        results, fitted = train_models(X, self.y, models=['Logistic Regression', 'hist_gradient_boosting'],
+                                       return_models=True)
+        self.assertEqual(list(results), ['Logistic Regression', 'Hist Gradient Boosting'])
+        self.assertEqual(fitted['Hist Gradient Boosting'].steps[0][0], 'binner')
+        np.testing.assert_array_equal(fitted['Hist Gradient Boosting'].predict(X.to_numpy(float)).shape, (len(X),))
+
+    def test_cli_tree_only_run_skips_one_hot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv = Path(tmp) / 'data.csv'
+            self.df.assign(target=self.y).to_csv(csv, index=False)
+            artifact = Path(tmp) / 'model.joblib'
+            with self.assertLogs('ml_autopipeline.cli', level='INFO') as logs:
+                main(['--file', str(csv), '--target', 'target', '--models', 'hist_gradient_boosting',
+                      '--no-cache', '--save-model', str(artifact), '-v'])
+            self.assertTrue(any('Binned encoding' in line for line in logs.output))
+            self.assertEqual(predict_csv(artifact, csv, Path(tmp) / 'out.csv'), len(self.df))
+
+    def test_registry(self):
+        self.assertEqual([s.key for s in resolve_models()], ['logistic_regression', 'random_forest', 'svm'])
+        self.assertEqual([s.features for s in resolve_models()], ['scaled', 'raw', 'scaled'])
+        with self.assertRaises(ValueError):
+            resolve_models(['nope'])
+        with self.assertRaises(ValueError):
+            register_model('Random Forest', lambda **_: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
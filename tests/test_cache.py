@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from ml_autopipeline import train_models
+from ml_pipeline.cache import ModelCache, fingerprint_data
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ModelCache(self.tmp.name)
+        self.X = pd.DataFrame({'f1': list(range(20)), 'f2': [i % 5 for i in range(20)]})
+        self.y = pd.Series([0, 1] * 10)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _entries(self):
+        return sorted(p for p in os.listdir(self.tmp.name) if p.endswith('.joblib'))
+
+    def test_identical_run_is_served_from_cache(self):
+        first = train_models(self.X, self.y, cache=self.cache)
+        self.assertEqual(len(self._entries()), 3)
+        second = train_models(self.X, self.y, cache=self.cache)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self._entries()), 3)
+
+    def test_per_model_invalidation(self):
+        train_models(self.X, self.y, cache=self.cache)
+        before = set(self._entries())
+        train_models(self.X, self.y, cache=self.cache, svm_kernel='linear')
+        added = set(self._entries()) - before
+        self.assertEqual(len(added), 1)  # only the SVM was refitted
+
+    def test_fingerprint_tracks_content(self):
+        y2 = self.y.copy()
+        y2.iloc[0] = 1
+        self.assertEqual(fingerprint_data(self.X, self.y), fingerprint_data(self.X.copy(), self.y.copy()))
+        self.assertNotEqual(fingerprint_data(self.X, self.y), fingerprint_data(self.X, y2))
+
+    def test_lru_eviction(self):
+        small = ModelCache(self.tmp.name, max_bytes=1)
+        small.put('a' * 40, None, {'Accuracy': 1.0})
+        small.put('b' * 40, None, {'Accuracy': 1.0})
+        self.assertEqual(self._entries(), [])
+        roomy = ModelCache(self.tmp.name, max_bytes=10 ** 9)
+        roomy.put('c' * 40, None, {'Accuracy': 0.5})
+        self.assertEqual(roomy.get('c' * 40), (None, {'Accuracy': 0.5}))
+        self.assertIsNone(roomy.get('d' * 40))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
+import os
+import tempfile
 import unittest
+import numpy as np
 import pandas as pd
-from ml_autopipeline import load_data, basic_report
+from ml_autopipeline import load_data, basic_report, streaming_report, check_imbalance
+from ml_pipeline.sketches import HyperLogLog, Moments, QuantileSketch
 
 class TestEDA(unittest.TestCase):
     def setUp(self):
@@ -17,5 +21,66 @@ class TestEDA(unittest.TestCase):
         self.assertIn('target', report['columns'])
         self.assertEqual(report['missing_values']['feature1'], 0)
 
+class TestStreamingReport(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        x = rng.normal(10, 3, n)
+        x[::50] = np.nan
+        self.df = pd.DataFrame({
+            'x': x,
+            'k': rng.integers(0, 300, n),
+            'cat': rng.choice(['a', 'b', 'c'], n, p=[0.6, 0.3, 0.1]),
+            'target': (rng.random(n) < 0.2).astype(int),
+        })
+        fd, self.path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_matches_basic_report_keys_and_values(self):
+        df = load_data(self.path)
+        expected = basic_report(df)
+        report = streaming_report(self.path, target='target', chunksize=700)
+        for key in expected:
+            self.assertIn(key, report)
+        self.assertEqual(report['shape'], expected['shape'])
+        self.assertEqual(report['columns'], expected['columns'])
+        self.assertEqual(report['missing_values'], expected['missing_values'])
+        self.assertEqual(report['data_types'], expected['data_types'])
+        self.assertEqual(report['class_distribution'], check_imbalance(df, 'target')['class_distribution'])
+
+    def test_column_stats(self):
+        stats = streaming_report(self.path, chunksize=700)['column_stats']
+        x = self.df['x']
+        self.assertAlmostEqual(stats['x']['mean'], x.mean(), places=9)
+        self.assertAlmostEqual(stats['x']['std'], x.std(), places=9)
+        self.assertEqual(stats['x']['min'], x.min())
+        self.assertAlmostEqual(stats['x']['quantiles'][0.5], x.median(), delta=0.3)
+        self.assertAlmostEqual(stats['k']['distinct_approx'], 300, delta=15)
+        self.assertEqual(stats['cat']['top_values'][0], ('a', int((self.df['cat'] == 'a').sum())))
+
+    def test_sketches_merge(self):
+        rng = np.random.default_rng(1)
+        a, b = rng.random(10_000), rng.random(10_000) + 1
+        m1, m2 = Moments(), Moments()
+        m1.update(a)
+        m2.update(b)
+        m1.merge(m2)
+        both = np.concatenate([a, b])
+        self.assertAlmostEqual(m1.variance, both.var(ddof=1), places=9)
+        q1, q2 = QuantileSketch(k=128), QuantileSketch(k=128)
+        q1.update(a)
+        q2.update(b)
+        q1.merge(q2)
+        self.assertAlmostEqual(q1.quantiles([0.5])[0.5], np.median(both), delta=0.05)
+        h1, h2 = HyperLogLog(), HyperLogLog()
+        h1.update(pd.Series(np.arange(50_000)))
+        h2.update(pd.Series(np.arange(25_000, 75_000)))
+        h1.merge(h2)
+        self.assertAlmostEqual(h1.estimate(), 75_000, delta=75_000 * 0.03)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from ml_autopipeline import apply_smote, train_models
+from ml_pipeline.encoding import SparseEncoder, is_sparse
+
+class TestSparseEncoder(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        self.X = pd.DataFrame({
+            'num': rng.normal(size=n),
+            'color': rng.choice(['red', 'green', 'blue'], n),
+            'user_id': [f"u{i}" for i in rng.integers(0, 150, n)],
+        })
+        self.y = pd.Series((self.X['num'] + (self.X['color'] == 'red') > 0.8).astype(int))
+
+    def test_onehot_matches_get_dummies(self):
+        X = self.X[['num', 'color']]
+        encoded = SparseEncoder().fit_transform(X)
+        self.assertTrue(sp.isspmatrix_csr(encoded))
+        dense = pd.get_dummies(X).astype(float)
+        np.testing.assert_array_equal(encoded.toarray(), dense.to_numpy())
+
+    def test_high_cardinality_strategies(self):
+        train, test = self.X.iloc[:150], self.X.iloc[150:]
+        for strategy, width in (("hashing", 1 + 3 + 64), ("frequency", 1 + 3 + 1), ("target", 1 + 3 + 2)):
+            enc = SparseEncoder(max_onehot_cardinality=10, high_cardinality=strategy, n_hash_features=64)
+            enc.fit(train, self.y.iloc[:150])
+            out = enc.transform(test)
+            self.assertEqual(out.shape, (50, width))
+            self.assertEqual(len(enc.get_feature_names_out()), width)
+
+    def test_target_encoding_is_out_of_fold_on_training_rows(self):
+        X = pd.DataFrame({'id': [f"r{i}" for i in range(100)]})  # every level seen once
+        y = pd.Series([0, 1] * 50)
+        enc = SparseEncoder(max_onehot_cardinality=10, high_cardinality='target')
+        train = enc.fit_transform(X, y).toarray()
+        np.testing.assert_allclose(train, np.tile(enc.prior_, (100, 1)))  # labels do not leak
+        full = enc.transform(X).toarray()  # the full-train table still knows every level
+        self.assertTrue((full[y.to_numpy() == 1, 1] > enc.prior_[1]).all())
+
+    def test_unseen_categories_encode_as_zero(self):
+        enc = SparseEncoder().fit(pd.DataFrame({'c': ['a', 'b']}))
+        out = enc.transform(pd.DataFrame({'c': ['z', None]}))
+        self.assertEqual(out.nnz, 0)
+
+    def test_train_models_end_to_end_sparse(self):
+        self.assertTrue(is_sparse(sp.csr_matrix(np.eye(2))))
+        self.assertFalse(is_sparse(self.X))
+        results = train_models(
+            self.X, self.y,
+            encoder=SparseEncoder(max_onehot_cardinality=10, n_hash_features=32),
+            resampler=apply_smote,
+            extended_metrics=True,
+        )
+        self.assertEqual(set(results), {'Logistic Regression', 'Random Forest', 'SVM'})
+        for metrics in results.values():
+            self.assertIn('confusion_matrix', metrics)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ml_autopipeline import load_data
+from ml_pipeline.formats import (
+    cached_parquet, convert_to_parquet, detect_format, iter_chunks, parse_filter, read_table,
+)
+from ml_pipeline.loading import load_data_optimized, pyarrow_available
+
+
+class _FormatsCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'a': np.arange(1000),
+            'b': rng.standard_normal(1000),
+            'city': rng.choice(['x', 'y', 'z'], 1000),
+        })
+        self.csv = self.dir / 'data.csv'
+        self.df.to_csv(self.csv, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class TestFormats(_FormatsCase):
+    def test_detect_format_and_parse_filter(self):
+        self.assertEqual(detect_format('x.PARQUET'), 'parquet')
+        self.assertEqual(detect_format('x.arrow'), 'feather')
+        self.assertEqual(detect_format('x.csv.gz'), 'csv')
+        self.assertEqual(parse_filter('age >= 30'), ('age', '>=', 30))
+        self.assertEqual(parse_filter('city in ["a", "b"]'), ('city', 'in', ['a', 'b']))
+        self.assertEqual(parse_filter('city = x'), ('city', '==', 'x'))
+        with self.assertRaises(ValueError):
+            parse_filter('city in x')
+
+    def test_csv_filters_and_sample(self):
+        df = load_data(self.csv, usecols=['b'], filters=['a < 100', 'city != z'])
+        expected = self.df[(self.df['a'] < 100) & (self.df['city'] != 'z')]
+        self.assertEqual(df.columns.tolist(), ['b'])
+        np.testing.assert_allclose(df['b'].to_numpy(), expected['b'].to_numpy())
+        sampled = read_table(self.csv, sample=0.25)
+        self.assertTrue(150 < len(sampled) < 350)
+        pd.testing.assert_frame_equal(sampled, read_table(self.csv, sample=0.25))
+        with self.assertRaises(ValueError):
+            read_table(self.csv, sample=1.5)
+
+    def test_npy_memory_mapped(self):
+        arr = np.zeros(5, dtype=[('x', 'f8'), ('label', 'i4')])
+        arr['x'] = np.arange(5)
+        np.save(self.dir / 'rec.npy', arr)
+        df = load_data(self.dir / 'rec.npy', filters=[('x', '>', 1)])
+        self.assertEqual(df['x'].tolist(), [2.0, 3.0, 4.0])
+        np.save(self.dir / 'plain.npy', np.arange(12.0).reshape(4, 3))
+        self.assertEqual(read_table(self.dir / 'plain.npy', usecols=['2']).columns.tolist(), ['2'])
+        self.assertEqual(sum(len(c) for c in iter_chunks(self.dir / 'plain.npy', chunksize=3)), 4)
+
+
+@unittest.skipUnless(pyarrow_available(), "pyarrow not installed")
+class TestColumnarFormats(_FormatsCase):
+    def test_parquet_conversion_pruning_and_cache(self):
+        drift = self.df.assign(a=self.df['a'].where(self.df['a'] < 900))  # ints gain NaN late in the file
+        drift.to_csv(self.csv, index=False)
+        path = convert_to_parquet(self.csv, self.dir / 'data.parquet', chunksize=300, row_group_size=100)
+        pd.testing.assert_frame_equal(read_table(path), pd.read_csv(self.csv))
+
+        df = read_table(path, usecols=['b', 'city'], filters=['a < 150'])
+        self.assertEqual(df.columns.tolist(), ['b', 'city'])
+        self.assertEqual(len(df), 150)
+        sampled = read_table(path, sample=0.3)
+        self.assertEqual(len(sampled) % 100, 0)  # whole row groups
+        self.assertEqual(sum(len(c) for c in iter_chunks(path, chunksize=128, usecols=['a'])), 1000)
+        single = convert_to_parquet(self.csv, self.dir / 'single.parquet', row_group_size=10_000)
+        self.assertTrue(200 < len(read_table(single, sample=0.3)) < 400)  # rows within the one row group
+        parts = self.dir / 'parts'
+        parts.mkdir()
+        for i, part in enumerate((self.df.iloc[:400], self.df.iloc[400:])):
+            part.to_parquet(parts / f'part-{i}.parquet', index=False)
+        self.assertEqual(len(read_table(parts, fmt='parquet')), 1000)
+        self.assertEqual(len(read_table(parts, fmt='parquet', filters=['a >= 900'])), 100)
+        optimized, report = load_data_optimized(path, usecols=['a', 'city'])
+        self.assertEqual(report['engine'], 'parquet')
+        self.assertEqual(str(optimized['city'].dtype), 'category')
+
+        cached = cached_parquet(self.csv, self.dir / 'cache')
+        mtime = cached.stat().st_mtime_ns
+        self.assertEqual(cached_parquet(self.csv, self.dir / 'cache'), cached)
+        self.assertEqual(cached.stat().st_mtime_ns, mtime)
+
+    def test_feather_memory_mapped(self):
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        path = self.dir / 'data.arrow'
+        feather.write_feather(pa.Table.from_pandas(self.df, preserve_index=False), path, compression='uncompressed')
+        df = read_table(path, usecols=['b'], filters=[('city', '==', 'x')])
+        np.testing.assert_allclose(df['b'].to_numpy(), self.df.loc[self.df['city'] == 'x', 'b'].to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from ml_autopipeline.cli import main
+from ml_pipeline.benchmark import make_synthetic, TARGET
+from ml_pipeline.incremental import complete_size, train_incremental
+from ml_pipeline.streaming import ChunkForest
+
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.path = self.dir / 'log.csv'
+        self.state = self.dir / 'state.joblib'
+        self.df = make_synthetic(rows=3000, cols=6, n_categorical=2, cardinality=5, imbalance=0.3, n_classes=2, seed=1)
+        self.df.iloc[:2000].to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, rows, text=''):
+        rows.to_csv(self.path, index=False, header=False, mode='a')
+        with open(self.path, 'a') as fh:
+            fh.write(text)
+
+    def test_append_only_updates_match_full_statistics(self):
+        first = train_incremental(self.path, TARGET, state_path=self.state, chunksize=500)
+        self.assertEqual((first['mode'], first['rows']), ('full', 2000))
+        forest = first['results']['Random Forest']
+
+        partial_line = ','.join(map(str, self.df.iloc[2500].tolist()))[:5]
+        self._append(self.df.iloc[2000:2500], partial_line)  # a line still being written
+        second = train_incremental(self.path, TARGET, state_path=self.state, chunksize=500)
+        self.assertEqual((second['mode'], second['rows'], second['new_rows']), ('incremental', 2500, 500))
+        expected = self.df.iloc[:2500]
+        self.assertEqual(second['eda']['class_distribution'], expected[TARGET].value_counts().to_dict())
+        self.assertEqual(second['eda']['missing_values'], expected.isna().sum().to_dict())
+        self.assertIn('Accuracy', second['results']['Random Forest'])
+        self.assertNotEqual(second['results']['Random Forest'], forest)
+
+        unchanged = train_incremental(self.path, TARGET, state_path=self.state)
+        self.assertEqual((unchanged['mode'], unchanged['new_rows']), ('unchanged', 0))
+        self.assertEqual(complete_size(self.path), self.path.stat().st_size - len(partial_line))
+
+    def test_changed_prefix_or_options_fall_back_to_full_run(self):
+        train_incremental(self.path, TARGET, state_path=self.state)
+        data = self.path.read_bytes()
+        self.path.write_bytes(data.replace(b'\n', b'\n\n', 1))  # rewrite inside the processed prefix
+        with self.assertLogs('ml_autopipeline.incremental', level='WARNING'):
+            self.assertEqual(train_incremental(self.path, TARGET, state_path=self.state)['mode'], 'full')
+        self.assertEqual(train_incremental(self.path, TARGET, state_path=self.state, test_size=0.2)['mode'], 'full')
+        with self.assertRaises(ValueError):
+            train_incremental(self.dir / 'x.parquet', TARGET, state_path=self.state)
+
+    def test_chunk_forest_keeps_all_classes(self):
+        X = np.arange(40, dtype=float).reshape(-1, 1)
+        forest = ChunkForest(trees_per_chunk=3).partial_fit(X[:20], np.zeros(20), classes=[0, 1, 2])
+        forest.partial_fit(X[20:], np.where(X[20:, 0] > 30, 2, 1))
+        self.assertEqual(forest.n_estimators_, 6)
+        self.assertEqual(forest.predict_proba(X).shape, (40, 3))
+        # Each chunk's trees vote with their own classes, weighted by tree count
+        np.testing.assert_allclose(forest.predict_proba(X[-1:]), [[0.5, 0.0, 0.5]])
+
+    def test_cli_incremental(self):
+        argv = ['--file', str(self.path), '--target', TARGET, '--incremental', '--state-file', str(self.state)]
+        main(argv)
+        self._append(self.df.iloc[2000:])
+        with self.assertLogs('ml_autopipeline.cli', level='INFO') as logs:
+            main(argv + ['-v'])
+        self.assertTrue(any('mode=incremental' in line and '1000 processed' in line for line in logs.output))
+
+
+if __name__ == '__main__':
+    unittest.main()
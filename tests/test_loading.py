@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from ml_pipeline import loading
+from ml_pipeline.loading import load_data_optimized, pyarrow_available
+from ml_autopipeline import load_data
+
+class TestLoading(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 1000
+        self.df = pd.DataFrame({
+            'small_int': rng.integers(0, 100, n),
+            'big_int': rng.integers(0, 100_000, n),
+            'value': rng.random(n),
+            'color': rng.choice(['red', 'green', 'blue'], n),
+            'uid': [f"id{i}" for i in range(n)],
+            'target': rng.integers(0, 2, n),
+        })
+        fd, self.path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_compact_dtypes_across_chunks(self):
+        df, report = load_data_optimized(self.path, chunksize=128, engine='c')
+        self.assertEqual(len(df), len(self.df))
+        self.assertEqual(str(df['small_int'].dtype), 'int8')
+        self.assertEqual(str(df['big_int'].dtype), 'int32')
+        self.assertEqual(str(df['value'].dtype), 'float32')
+        self.assertEqual(str(df['color'].dtype), 'category')
+        self.assertNotEqual(str(df['uid'].dtype), 'category')
+        self.assertEqual(df['color'].astype(str).tolist(), self.df['color'].tolist())
+        self.assertGreater(report['columns']['color']['saved_bytes'], 0)
+        self.assertEqual(report['saved_bytes'], report['original_bytes'] - report['optimized_bytes'])
+
+    @unittest.skipUnless(pyarrow_available(), "pyarrow not installed")
+    def test_pyarrow_streams_record_batches(self):
+        expected, _ = load_data_optimized(self.path, chunksize=128, engine='c')
+        with mock.patch.object(loading, 'PYARROW_BLOCK_BYTES', 4096), \
+                mock.patch.object(loading, '_compact_frame', wraps=loading._compact_frame) as compact:
+            df, report = load_data_optimized(self.path)
+        self.assertEqual(report['engine'], 'pyarrow')
+        self.assertGreater(compact.call_count, 5)  # never one full-size uncompacted frame
+        pd.testing.assert_frame_equal(df, expected)
+        # A value that does not fit the sampled types falls back to the C engine
+        self.df['small_int'] = self.df['small_int'].astype(object)
+        self.df.loc[900, 'small_int'] = 'n/a?'
+        self.df.to_csv(self.path, index=False)
+        with mock.patch.object(loading, 'PYARROW_BLOCK_BYTES', 4096):
+            df, report = load_data_optimized(self.path, sample_rows=100, engine='pyarrow')
+        self.assertEqual((report['engine'], len(df)), ('c', len(self.df)))
+
+    def test_usecols(self):
+        df = load_data(self.path, usecols=['color', 'target'], optimize_dtypes=True, chunksize=300)
+        self.assertEqual(sorted(df.columns), ['color', 'target'])
+
+if __name__ == "__main__":
+    unittest.main()
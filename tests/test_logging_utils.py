@@ -0,0 +1,127 @@
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from ml_pipeline import logging_utils
+from ml_pipeline.logging_utils import (
+    LOGGER_NAME, BatchingFileHandler, RateLimitFilter, configure_logging, get_logger, stop_queue_logging,
+)
+from ml_pipeline.timing import span
+
+
+class _Counting:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "counted"
+
+
+class TestLoggingUtils(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_file = Path(self.tmp.name) / 'run.log'
+        self.package = logging.getLogger(LOGGER_NAME)
+        self.saved = (list(self.package.handlers), self.package.level, logging_utils._RATE_LIMIT)
+        self.package.handlers = []
+
+    def tearDown(self):
+        stop_queue_logging()
+        for h in self.package.handlers:
+            h.close()
+        self.package.handlers, level, logging_utils._RATE_LIMIT = self.saved
+        self.package.setLevel(level)
+        self.tmp.cleanup()
+
+    def _lines(self):
+        return self.log_file.read_text(encoding='utf-8').splitlines()
+
+    def test_queue_mode_writes_on_a_background_thread_and_stays_idempotent(self):
+        configure_logging(logging.DEBUG, log_file=str(self.log_file))
+        configure_logging(logging.DEBUG, log_file=str(self.log_file), queue_mode=True, json_logs=True)
+        configure_logging(logging.DEBUG, log_file=str(self.log_file), queue_mode=True, json_logs=True)
+        self.assertEqual(len(self.package.handlers), 1)
+        self.assertEqual(len(logging_utils._LISTENER.handlers), 2)  # stream + file, not duplicated
+
+        writers = []
+        handler = next(h for h in logging_utils._LISTENER.handlers if isinstance(h, BatchingFileHandler))
+        emit = handler.emit
+        handler.emit = lambda record: (writers.append(threading.current_thread().name), emit(record))[1]
+        log = get_logger('hot')
+        with span('stage'):
+            for i in range(500):
+                log.debug("chunk %d", i)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            log.exception('failed')
+        stop_queue_logging()
+
+        lines = self._lines()
+        self.assertEqual(len(lines), 501)
+        self.assertIn('"message": "chunk 499"', lines[499])
+        self.assertIn('"span_id"', lines[0])
+        self.assertIn('ValueError: boom', lines[500])
+        self.assertNotIn(threading.current_thread().name, writers)
+        # Back to synchronous handlers once stopped
+        self.assertIn(handler, self.package.handlers)
+        self.assertEqual(handler.batch_size, 1)
+
+    def test_disabled_levels_and_rate_limits_skip_formatting(self):
+        configure_logging(logging.INFO, log_file=str(self.log_file), queue_mode=True,
+                          rate_limits={'hot': 1000})
+        value = _Counting()
+        get_logger('hot').debug("value %s", value)  # below INFO: never formatted
+        self.assertEqual(value.calls, 0)
+        configure_logging(logging.DEBUG, log_file=str(self.log_file))
+        log, other = get_logger('hot'), get_logger('cold')
+        for i in range(100):
+            log.debug("chunk %d", i)
+            other.debug("other %d", i)
+        log.info("info is not limited")
+        stop_queue_logging()
+        lines = self._lines()
+        hot = [l for l in lines if 'ml_autopipeline.hot' in l]
+        self.assertLess(len(hot), 30)
+        self.assertIn('info is not limited', hot[-1])
+        self.assertEqual(sum('ml_autopipeline.cold' in l for l in lines), 100)
+
+    def test_rate_limit_reports_suppressed_records(self):
+        clock = [0.0]
+        limiter = RateLimitFilter({'ml_autopipeline.streaming': 1}, burst=2)
+        logging_utils.time.monotonic, real = (lambda: clock[0]), logging_utils.time.monotonic
+        try:
+            records = [logging.LogRecord('ml_autopipeline.streaming.x', logging.DEBUG, '', 0, 'm%d', (i,), None)
+                       for i in range(5)]
+            self.assertEqual([limiter.filter(r) for r in records], [True, True, False, False, False])
+            clock[0] = 1.0
+            late = logging.LogRecord('ml_autopipeline.streaming.x', logging.DEBUG, '', 0, 'late', None, None)
+            self.assertTrue(limiter.filter(late))
+            self.assertEqual(late.getMessage(), 'late [3 similar messages suppressed]')
+            self.assertTrue(limiter.filter(late))  # a record is only counted once, however many handlers see it
+        finally:
+            logging_utils.time.monotonic = real
+
+    def test_forked_child_logs_synchronously(self):
+        if not hasattr(os, 'fork'):
+            self.skipTest('no fork')
+        configure_logging(logging.INFO, log_file=str(self.log_file), queue_mode=True)
+        get_logger('parent').info('before fork')
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - child
+            get_logger('child').info('from child')
+            os._exit(0 if logging_utils._LISTENER is None else 1)
+        _, status = os.waitpid(pid, 0)
+        stop_queue_logging()
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        lines = self._lines()
+        self.assertEqual(sum('before fork' in l for l in lines), 1)
+        self.assertEqual(sum('from child' in l for l in lines), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from sklearn.metrics import (
+    accuracy_score, confusion_matrix, f1_score, precision_score, recall_score, roc_auc_score,
+)
+from ml_pipeline.metrics import base_metrics, classification_metrics, confusion_matrix_fast, roc_auc
+
+class TestMetricsEngine(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.labels = np.array(['ant', 'bee', 'cat', 'dog'])
+        self.y_true = self.labels[rng.integers(0, 4, 2000)]
+        self.y_pred = np.where(rng.random(2000) < 0.6, self.y_true, self.labels[rng.integers(0, 3, 2000)])
+        proba = rng.random((2000, 4))
+        self.proba = proba / proba.sum(axis=1, keepdims=True)
+
+    def test_matches_sklearn_exactly(self):
+        cm, classes = confusion_matrix_fast(self.y_true, self.y_pred)
+        np.testing.assert_array_equal(cm, confusion_matrix(self.y_true, self.y_pred))
+        np.testing.assert_array_equal(classes, self.labels)
+        m = base_metrics(cm)
+        self.assertEqual(m['Accuracy'], accuracy_score(self.y_true, self.y_pred))
+        for key, fn in (('Precision', precision_score), ('Recall', recall_score), ('F1 Score', f1_score)):
+            self.assertEqual(m[key], fn(self.y_true, self.y_pred, average='weighted', zero_division=0))
+        macro = classification_metrics(self.y_true, self.y_pred)
+        self.assertEqual(macro['F1 Score (macro)'], f1_score(self.y_true, self.y_pred, average='macro', zero_division=0))
+
+    def test_zero_division_class(self):
+        # 'c' is never predicted, 'd' never occurs in y_true
+        y_true = ['a', 'b', 'c', 'a']
+        y_pred = ['a', 'b', 'd', 'b']
+        m = base_metrics(confusion_matrix_fast(y_true, y_pred)[0])
+        self.assertEqual(m['Precision'], precision_score(y_true, y_pred, average='weighted', zero_division=0))
+        self.assertEqual(m['F1 Score'], f1_score(y_true, y_pred, average='weighted', zero_division=0))
+
+    def test_roc_auc(self):
+        self.assertAlmostEqual(
+            roc_auc(self.y_true, self.proba),
+            roc_auc_score(self.y_true, self.proba, multi_class='ovr', average='weighted'),
+            places=12,
+        )
+        y = np.array([0, 1, 1, 0, 1, 0, 1])
+        scores = np.array([0.1, 0.9, 0.4, 0.4, 0.8, 0.2, 0.4])  # includes ties
+        self.assertAlmostEqual(roc_auc(y, scores), roc_auc_score(y, scores), places=12)
+        with self.assertRaises(ValueError):
+            roc_auc([0, 0, 0], [0.1, 0.2, 0.3])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from ml_autopipeline.cli import main
+from ml_pipeline.benchmark import make_synthetic, TARGET
+from ml_pipeline.planner import peak_bytes, plan_run, sample_input
+
+
+class TestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.path = self.dir / 'data.csv'
+        self.df = make_synthetic(rows=20_000, cols=10, n_categorical=2, cardinality=15, imbalance=0.2, seed=0)
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_estimates_from_a_sample(self):
+        sample, rows, exact = sample_input(self.path, sample_rows=2000)
+        self.assertEqual(len(sample), 2000)
+        self.assertFalse(exact)
+        self.assertLess(abs(rows - 20_000) / 20_000, 0.05)
+        self.assertEqual(sample_input(self.path, sample_rows=50_000)[1:], (20_000, True))
+        np.save(self.dir / 'data.npy', self.df[[f'num_{i}' for i in range(10)]].to_numpy())
+        self.assertEqual(sample_input(self.dir / 'data.npy', sample_rows=100)[1:], (20_000, True))
+
+        plan = plan_run(self.path, TARGET, memory_bytes=2**34, n_cpus=2, sample_rows=2000)
+        est = plan['estimates']
+        self.assertEqual(est['encoded_width'], pd_dummies_width(self.df))
+        self.assertEqual(est['categorical_levels'], {'cat_0': 15, 'cat_1': 15})
+        self.assertEqual(set(est['models']), {'logistic_regression', 'random_forest', 'svm'})
+        self.assertEqual(est['svm_backend'], 'exact')
+        self.assertGreater(est['peak_bytes']['dense'], est['peak_bytes']['sparse'])
+        self.assertTrue(plan['fits'])
+        self.assertEqual(plan['settings'], {'optimize_dtypes': False, 'encoding': 'dense', 'feature_dtype': 'float64', 'n_jobs': 2})
+
+    def test_limits_pick_cheaper_settings_and_keep_explicit_options(self):
+        loose = plan_run(self.path, TARGET, memory_bytes=2**34, sample_rows=2000)
+        dense = loose['estimates']['peak_bytes']['dense']
+        tight = plan_run(self.path, TARGET, memory_bytes=dense // 2, n_cpus=4, sample_rows=2000,
+                         options={'models': 'logistic_regression,svm', 'time_budget': 1})
+        self.assertEqual(tight['settings']['encoding'], 'sparse')
+        self.assertTrue(tight['settings']['optimize_dtypes'])
+        self.assertNotEqual(tight['settings']['svm_backend'], 'exact')
+        self.assertTrue(tight['notes'])
+
+        fixed = plan_run(self.path, TARGET, memory_bytes=1, sample_rows=2000,
+                         options={'encoding': 'dense', 'n_jobs': 3, 'apply_smote': True})
+        self.assertFalse(fixed['fits'])
+        self.assertNotIn('encoding', fixed['settings'])
+        self.assertNotIn('n_jobs', fixed['settings'])
+        self.assertAlmostEqual(fixed['estimates']['smote_rows'], 32_000, delta=500)  # 80% majority, from the sample
+        data = dict(loose['estimates'], _numeric_row_bytes={False: 80, True: 40})
+        self.assertGreater(peak_bytes(data, 'dense', smote=True), peak_bytes(data, 'dense'))
+
+    def test_cli_dry_run_prints_plan_without_training(self):
+        out = io.StringIO()
+        cache = self.dir / 'cache'
+        with contextlib.redirect_stdout(out):
+            main(['--file', str(self.path), '--target', TARGET, '--dry-run', '--memory-limit', '8',
+                  '--cache-dir', str(cache)])
+        plan = json.loads(out.getvalue())
+        self.assertEqual(plan['limits']['memory_bytes'], 8 * 2**30)
+        self.assertIn('encoding', plan['settings'])
+        self.assertFalse(cache.exists())
+
+
+def pd_dummies_width(df):
+    import pandas as pd
+
+    return pd.get_dummies(df.drop(columns=[TARGET])).shape[1]
+
+
+if __name__ == "__main__":
+    unittest.main()
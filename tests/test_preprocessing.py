@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import StandardScaler
+from ml_pipeline.preprocessing import SharedFeatures, as_model_matrix, with_preprocessing
+from sklearn.linear_model import LogisticRegression
+
+class TestSharedPreprocessing(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.train = pd.DataFrame(rng.standard_normal((50, 4)), columns=list('abcd'))
+        self.test = pd.DataFrame(rng.standard_normal((20, 4)), columns=list('abcd'))
+
+    def test_dense_views_are_readonly_and_contiguous(self):
+        X = as_model_matrix(self.train, 'float32')
+        self.assertEqual(X.dtype, np.float32)
+        self.assertTrue(X.flags.c_contiguous)
+        with self.assertRaises(ValueError):
+            X[0, 0] = 1.0
+        with self.assertRaises(ValueError):
+            as_model_matrix(self.train, 'int8')
+
+    def test_scaler_fitted_once_and_matches_sklearn(self):
+        shared = SharedFeatures(self.train, self.test)
+        X_train, X_test = shared.views(scaled=True)
+        self.assertIs(shared.views(scaled=True)[0], X_train)
+        expected = StandardScaler().fit(self.train.to_numpy())
+        np.testing.assert_allclose(X_test, expected.transform(self.test.to_numpy()))
+        self.assertFalse(X_train.flags.writeable)
+
+    def test_sparse_input_stays_csr_and_is_not_centred(self):
+        shared = SharedFeatures(sp.csr_matrix(self.train.clip(lower=0).to_numpy()), sp.csc_matrix(self.test.to_numpy()))
+        X_train, X_test = shared.views(scaled=True)
+        self.assertTrue(sp.isspmatrix_csr(X_train) and sp.isspmatrix_csr(X_test))
+        self.assertFalse(shared.scaler.with_mean)
+        with self.assertRaises(ValueError):
+            X_train.data[0] = 1.0
+
+    def test_with_preprocessing_accepts_raw_features(self):
+        shared = SharedFeatures(self.train, self.test)
+        X_train, _ = shared.views(scaled=True)
+        y = (self.train['a'] > 0).astype(int).to_numpy()
+        model = LogisticRegression().fit(X_train, y)
+        full = with_preprocessing(model, shared.scaler)
+        np.testing.assert_array_equal(full.predict(self.test.to_numpy()), model.predict(shared.views(True)[1]))
+        self.assertIs(with_preprocessing(model, None), model)
+
+if __name__ == '__main__':
+    unittest.main()
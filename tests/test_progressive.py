@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ml_pipeline.progressive import ProgressiveSampling, stratified_rows
+from ml_pipeline.training import train_models
+
+
+def _xor(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.uniform(-1, 1, size=(rows, 4)), columns=[f"x{i}" for i in range(4)])
+    y = pd.Series(np.where(X["x0"] * X["x1"] > 0, "a", "b"))
+    return X, y
+
+
+class TestProgressive(unittest.TestCase):
+    def test_sizes_and_stratified_rows(self):
+        self.assertEqual(ProgressiveSampling(start=1000, factor=4).sizes(20_000), [1000, 4000])
+        self.assertEqual(ProgressiveSampling(start=1000, factor=4).sizes(64_000), [1000, 4000, 16000])
+        self.assertEqual(ProgressiveSampling(start=1000).sizes(3999), [])
+        y = np.array(["a"] * 900 + ["b"] * 100)
+        rows = stratified_rows(y, 100, random_state=0)
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(int((y[rows] == "b").sum()), 10)
+        self.assertTrue(np.all(np.diff(rows) > 0))
+        with self.assertRaises(ValueError):
+            ProgressiveSampling(factor=1)
+
+    def test_weak_model_is_dropped_before_the_full_fit(self):
+        X, y = _xor(20_000)
+        settings = ProgressiveSampling(start=1000, factor=4, margin=0.05)
+        results = train_models(X, y, models=["logistic_regression", "random_forest"], progressive=settings)
+        self.assertEqual(list(results), ["Logistic Regression", "Random Forest"])
+        dropped, kept = results["Logistic Regression"], results["Random Forest"]
+        self.assertEqual(dropped["status"], "dropped")
+        self.assertEqual(dropped["dropped_at_rows"], 1000)
+        self.assertGreater(dropped["estimated_full_fit_s"], 0)
+        self.assertNotIn("Accuracy", dropped)
+        self.assertEqual([p["rows"] for p in dropped["learning_curve"]], [1000])
+        # Only one candidate left after the first rung: straight to the full fit
+        self.assertEqual([p["rows"] for p in kept["learning_curve"]], [1000])
+        self.assertGreater(kept["F1 Score"], 0.9)
+        self.assertIn("estimated_saved_s", kept)
+
+    def test_plateau_stops_growing(self):
+        X, y = _xor(20_000)
+        settings = ProgressiveSampling(start=500, factor=2, tolerance=1.0, margin=1.0)
+        results = train_models(X, y, models=["random_forest", "hist_gradient_boosting"], progressive=settings)
+        for name in ("Random Forest", "Hist Gradient Boosting"):
+            self.assertNotIn("status", results[name])
+            self.assertEqual([p["rows"] for p in results[name]["learning_curve"]], [500, 1000])
+            self.assertIn("F1 Score", results[name]["learning_curve"][-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
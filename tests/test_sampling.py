@@ -1,6 +1,10 @@
 import unittest
+import numpy as np
 import pandas as pd
 from ml_autopipeline import check_imbalance, apply_smote
+from ml_pipeline.sampling import (
+    imbalance_from_counts, iter_smote_batches, random_oversample, random_undersample, recommend_strategy,
+)
 
 class TestSampling(unittest.TestCase):
     def setUp(self):
@@ -28,5 +32,47 @@ class TestSampling(unittest.TestCase):
         # After SMOTE, classes should be balanced
         self.assertEqual(sum(y_res == 0), sum(y_res == 1))
 
+    def test_apply_smote_approximate(self):
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.random((500, 4)), columns=list('abcd'))
+        y = pd.Series([0] * 450 + [1] * 50, name='target')
+        X_res, y_res = apply_smote(X, y, method='approximate', partition_size=20, n_components=2)
+        self.assertEqual(list(X_res.columns), list('abcd'))
+        self.assertEqual(sum(y_res == 0), sum(y_res == 1))
+        # Synthetic rows interpolate between minority samples
+        minority = X[y == 1]
+        synthetic = X_res.iloc[500:]
+        self.assertTrue((synthetic.min() >= minority.min() - 1e-12).all())
+        self.assertTrue((synthetic.max() <= minority.max() + 1e-12).all())
+
+    def test_approximate_single_sample_fallback(self):
+        X = self.df_imbalanced[['feature']]
+        y = self.df_imbalanced['target']
+        X_res, y_res = apply_smote(X, y, method='approximate')
+        self.assertEqual(sum(y_res == 0), sum(y_res == 1))
+
+    def test_iter_smote_batches_is_bounded(self):
+        X = np.arange(200, dtype=float).reshape(100, 2)
+        y = np.array([0] * 80 + [1] * 20)
+        batches = list(iter_smote_batches(X, y, batch_size=16))
+        self.assertTrue(all(len(b[0]) <= 16 for b in batches))
+        self.assertEqual(sum(len(b[1]) for b in batches), 60)
+
+    def test_random_under_and_oversampling(self):
+        X = pd.DataFrame({'feature': range(20)}, index=range(100, 120))
+        y = pd.Series([0] * 16 + [1] * 4, index=X.index)
+        X_under, y_under = random_undersample(X, y)
+        self.assertEqual(y_under.value_counts().to_dict(), {0: 4, 1: 4})
+        self.assertTrue((X_under.index == y_under.index).all())
+        self.assertTrue(set(X_under['feature'][y_under == 1]) == {16, 17, 18, 19})
+        X_over, y_over = random_oversample(X.to_numpy(), y.to_numpy())
+        self.assertEqual(np.bincount(y_over).tolist(), [16, 16])
+        self.assertTrue((X_over[:20, 0] == np.arange(20)).all())
+
+    def test_recommended_strategy(self):
+        self.assertEqual(imbalance_from_counts({0: 50, 1: 50})['recommended_strategy'], 'none')
+        self.assertEqual(imbalance_from_counts({0: 900, 1: 100})['recommended_strategy'], 'class_weight')
+        self.assertEqual(recommend_strategy({0: 990_000, 1: 10_000}), 'undersample')
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import pandas as pd
+from ml_pipeline.search import _halving_rungs, cross_validate_models
+
+class TestCrossValidation(unittest.TestCase):
+    def setUp(self):
+        self.X = pd.DataFrame({'feat1': list(range(90)), 'feat2': [i % 7 for i in range(90)]})
+        self.y = pd.Series([0, 1, 1] * 30)
+
+    def test_cv_reports_mean_and_std(self):
+        results = cross_validate_models(self.X, self.y, cv=3, extended_metrics=True)
+        self.assertEqual(list(results), ['Logistic Regression', 'Random Forest', 'SVM'])
+        lr = results['Logistic Regression']
+        self.assertIn('F1 Score (std)', lr)
+        self.assertEqual(lr['cv_folds'], 3)
+        self.assertEqual(lr['best_params'], {})
+        # Summed over folds: every row is tested exactly once
+        self.assertEqual(sum(map(sum, lr['confusion_matrix'])), len(self.y))
+
+    def test_search_strategies(self):
+        grids = {'Logistic Regression': {'C': [0.001, 1.0]}, 'Random Forest': {'n_estimators': [5, 10]}}
+        grid = cross_validate_models(self.X, self.y, cv=3, search='grid', param_grids=grids, n_jobs=2)
+        self.assertEqual(grid['Logistic Regression']['n_candidates'], 2)
+        self.assertIn(grid['Random Forest']['best_params']['n_estimators'], (5, 10))
+        rand = cross_validate_models(self.X, self.y, cv=3, search='random', param_grids=grids, n_iter=1)
+        self.assertEqual(rand['Logistic Regression']['n_candidates'], 1)
+        halving = cross_validate_models(self.X, self.y, cv=3, search='halving', param_grids=grids, min_resources=20)
+        self.assertIn('Accuracy', halving['SVM'])
+        with self.assertRaises(ValueError):
+            cross_validate_models(self.X, self.y, search='bayes')
+
+    def test_halving_rungs(self):
+        self.assertEqual(_halving_rungs(9, 900, 3, 50), [100, 300, None])
+        self.assertEqual(_halving_rungs(27, 900, 3, 50), [100, 300, None])
+        self.assertEqual(_halving_rungs(1, 900, 3, 50), [None])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ml_autopipeline.cli import _serve_job
+from ml_pipeline.logging_utils import get_logger
+from ml_pipeline.service import DatasetCache, JobServer, request, submit
+
+
+def _echo_job(job, datasets):
+    get_logger("test").warning(f"running {job['name']}")
+    if job.get('fail'):
+        raise RuntimeError('boom')
+    if job.get('exit'):
+        raise SystemExit(1)
+    return {'name': job['name']}
+
+
+class TestDatasetCache(unittest.TestCase):
+    def test_lru_and_mtime_invalidation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'a.csv'
+            path.write_text('x\n1\n')
+            cache = DatasetCache(max_bytes=10_000)
+            loads = []
+
+            def loader():
+                loads.append(1)
+                return np.zeros(1000)  # 8000 bytes
+
+            cache.get_or_load(path, loader, stage='load')
+            cache.get_or_load(path, loader, stage='load')
+            self.assertEqual((len(loads), cache.hits), (1, 1))
+            cache.get_or_load(path, loader, stage='encode')  # different options: new entry, evicts the LRU one
+            self.assertEqual(cache.stats()['entries'], 1)
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+            cache.get_or_load(path, loader, stage='encode')
+            self.assertEqual(len(loads), 3)
+
+
+class TestJobServer(unittest.TestCase):
+    def _start(self, run_job):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket = str(Path(self.tmp.name) / 'server.sock')
+        server = JobServer(run_job, max_workers=2)
+        ready = threading.Event()
+        self.thread = threading.Thread(
+            target=lambda: asyncio.run(server.serve(socket_path=self.socket, ready=lambda _: ready.set())), daemon=True
+        )
+        self.thread.start()
+        self.assertTrue(ready.wait(10))
+        return server
+
+    def tearDown(self):
+        request({'op': 'shutdown'}, socket_path=self.socket)
+        self.thread.join(10)
+        self.tmp.cleanup()
+
+    def test_results_logs_and_failures(self):
+        self._start(_echo_job)
+        logs = []
+        reply = submit({'name': 'a', 'verbose': 0}, on_log=logs.append, socket_path=self.socket)
+        self.assertEqual(reply['status'], 'ok')
+        self.assertEqual(reply['results'], {'name': 'a'})
+        self.assertEqual([e['message'] for e in logs], ['running a'])
+        failed = submit({'name': 'b', 'fail': True}, socket_path=self.socket)
+        self.assertEqual(failed['status'], 'failed')
+        self.assertIn('RuntimeError: boom', failed['error'])
+        self.assertEqual(submit({'name': 'c', 'exit': True}, socket_path=self.socket)['status'], 'failed')
+        stats = request({'op': 'stats'}, socket_path=self.socket)
+        self.assertEqual((stats['completed'], stats['failed']), (1, 2))
+
+    def test_pipeline_jobs_reuse_cached_data(self):
+        self._start(_serve_job)
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'a': rng.standard_normal(120), 'city': rng.choice(['x', 'y'], 120)})
+        df['t'] = (df['a'] > 0).astype(int)
+        path = Path(self.tmp.name) / 'data.csv'
+        df.to_csv(path, index=False)
+        job = {'file': str(path), 'target': 't', 'no_cache': True, 'verbose': 1}
+        first = submit(job, socket_path=self.socket)
+        logs = []
+        second = submit(job, on_log=logs.append, socket_path=self.socket)
+        self.assertEqual(first['status'], 'ok', first.get('traceback'))
+        self.assertEqual(second['results'], first['results'])
+        self.assertEqual(sum('Dataset cache hit' in e['message'] for e in logs), 2)  # loaded and encoded frames
+        conflict = submit({**job, 'apply_smote': True, 'imbalance_strategy': 'smote'}, socket_path=self.socket)
+        self.assertIn('ValueError: --apply_smote', conflict['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import re
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Generous enough for slow CI machines; importing scikit-learn alone takes over a second
+BUDGET_MS = float(os.environ.get("ML_AUTOPIPELINE_IMPORT_BUDGET_MS", 500))
+HEAVY = ("pandas", "numpy", "scipy", "sklearn", "imblearn", "joblib", "tqdm", "yaml")
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _importtime(*args):
+    """Run the CLI under ``-X importtime``; return ({module: cumulative us}, total top-level us)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "ml_autopipeline.cli", *args],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    modules, total = {}, 0
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            modules[m.group(4)] = int(m.group(2))
+            if len(m.group(3)) == 1:  # top-level import: cumulative time includes its children
+                total += int(m.group(2))
+    return proc, modules, total
+
+
+class TestCliStartup(unittest.TestCase):
+    def test_help_does_not_import_heavy_dependencies(self):
+        proc, modules, total = _importtime("--help")
+        self.assertEqual(proc.returncode, 0, proc.stderr[-2000:])
+        loaded = sorted(m for m in modules if m.split(".")[0] in HEAVY)
+        self.assertEqual(loaded, [], f"--help imported heavy modules: {loaded[:10]}")
+        self.assertLess(total / 1000, BUDGET_MS, f"cold import time {total / 1000:.0f} ms exceeds {BUDGET_MS:.0f} ms")
+
+    def test_argument_errors_stay_light(self):
+        for args in (["--file", "x.csv"], ["predict"], ["batch"], ["submit", "--file", "x.csv"], ["--config", "missing.yml"]):
+            proc, modules, _ = _importtime(*args)
+            self.assertNotEqual(proc.returncode, 0)
+            self.assertFalse([m for m in modules if m.split(".")[0] in HEAVY], args)
+
+    def test_lazy_package_attributes(self):
+        code = (
+            "import sys, ml_autopipeline; assert 'sklearn' not in sys.modules; "
+            "from ml_autopipeline import train_models; assert 'sklearn' in sys.modules; "
+            "print(train_models.__module__)"
+        )
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                             env={**os.environ, "PYTHONPATH": str(ROOT)})
+        self.assertEqual(out.stdout.strip(), "ml_pipeline.training", out.stderr[-2000:])
+
+
+if __name__ == "__main__":
+    unittest.main()
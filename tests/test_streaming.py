@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ml_pipeline.benchmark import make_synthetic, TARGET
+from ml_pipeline.streaming import hash_split, train_streaming
+
+class TestStreamingTraining(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'data.csv'
+        self.df = make_synthetic(rows=3000, cols=6, n_categorical=2, cardinality=5, imbalance=0.3, n_classes=2, seed=1)
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hash_split_ignores_chunking(self):
+        whole = hash_split(self.df, 0.3)
+        parts = np.concatenate([hash_split(self.df.iloc[i:i + 700], 0.3) for i in range(0, len(self.df), 700)])
+        np.testing.assert_array_equal(whole, parts)
+        self.assertAlmostEqual(whole.mean(), 0.3, delta=0.05)
+        self.assertFalse(np.array_equal(whole, hash_split(self.df, 0.3, random_state=7)))
+        # Per-chunk dtype inference (int, float with NaN, object with a stray string) does not move rows
+        df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+        widened = pd.DataFrame({'a': [1.0, 2.0, 3.0, None], 'b': ['x', 'y', 'z', 'w']})
+        mixed = pd.DataFrame({'a': ['1', '2', '3', 'n/a'], 'b': ['x', 'y', 'z', 'w']}, dtype=object)
+        np.testing.assert_array_equal(hash_split(df, 0.5), hash_split(widened, 0.5)[:3])
+        np.testing.assert_array_equal(hash_split(df, 0.5), hash_split(mixed, 0.5)[:3])
+
+    def test_train_streaming(self):
+        small = train_streaming(self.path, TARGET, chunksize=250, epochs=2, extended_metrics=True)
+        large = train_streaming(self.path, TARGET, chunksize=5000, extended_metrics=True)
+        self.assertEqual(set(small), {'SGD Logistic Regression', 'SGD Linear SVM', 'Naive Bayes'})
+        for name in small:
+            # Same held-out rows whatever the chunk size
+            self.assertEqual(np.sum(small[name]['confusion_matrix']), np.sum(large[name]['confusion_matrix']))
+        self.assertGreater(small['SGD Logistic Regression']['Accuracy'], 0.8)
+
+if __name__ == '__main__':
+    unittest.main()
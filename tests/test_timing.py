@@ -0,0 +1,85 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from ml_pipeline.logging_utils import JsonFormatter, SpanFilter
+from ml_pipeline.timing import RECORDER, span, timed, record_span, current_span_id
+
+
+class TestSpans(unittest.TestCase):
+    def setUp(self):
+        RECORDER.reset()
+        RECORDER.configure_profiling()
+
+    def tearDown(self):
+        RECORDER.reset()
+        RECORDER.configure_profiling()
+
+    def test_nesting_and_shape(self):
+        with span("outer") as outer_id:
+            with timed("inner", data=np.zeros((7, 3))):
+                inner_id = current_span_id()
+            record_span("worker_fit", 0.5, model="m")
+        self.assertIsNone(current_span_id())
+        spans = {s["name"]: s for s in RECORDER.to_json()["spans"]}
+        self.assertEqual(spans["inner"]["span_id"], inner_id)
+        self.assertEqual(spans["inner"]["parent_id"], outer_id)
+        self.assertEqual((spans["inner"]["rows"], spans["inner"]["cols"]), (7, 3))
+        self.assertEqual(spans["worker_fit"]["parent_id"], outer_id)
+        self.assertIsNone(spans["outer"]["parent_id"])
+        self.assertGreaterEqual(spans["outer"]["wall_s"], spans["inner"]["wall_s"])
+
+    def test_tracemalloc_and_cprofile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            RECORDER.configure_profiling(cprofile=["work"], tracemalloc_stages=["work"], output_dir=tmp)
+            with span("work") as span_id:
+                blob = bytearray(2_000_000)
+            del blob
+            record = RECORDER.to_json()["spans"][0]
+            self.assertEqual(record["mem_source"], "tracemalloc")
+            self.assertGreaterEqual(record["peak_mem_delta_bytes"], 2_000_000)
+            self.assertTrue((Path(tmp) / f"work-{span_id}.prof").exists())
+
+    def test_nested_tracemalloc_spans_keep_outer_peak(self):
+        RECORDER.configure_profiling(tracemalloc_stages=["outer", "inner"])
+        with span("outer"):
+            blob = bytearray(3_000_000)
+            del blob
+            with span("inner"):
+                small = bytearray(100_000)
+            del small
+        spans = {s["name"]: s for s in RECORDER.to_json()["spans"]}
+        self.assertGreaterEqual(spans["outer"]["peak_mem_delta_bytes"], 3_000_000)
+        self.assertLess(spans["inner"]["peak_mem_delta_bytes"], 1_000_000)
+
+    def test_exports(self):
+        with span("load", rows=10, cols=2):
+            pass
+        with span("load", rows=5, cols=2):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            RECORDER.export(Path(tmp) / "s.json", "chrome")
+            events = json.loads((Path(tmp) / "s.json").read_text())["traceEvents"]
+            self.assertEqual([e["ph"] for e in events], ["X", "X"])
+            RECORDER.export(Path(tmp) / "s.prom", "prometheus")
+            prom = (Path(tmp) / "s.prom").read_text()
+            self.assertIn('ml_autopipeline_stage_rows{stage="load"} 15', prom)
+            self.assertIn('ml_autopipeline_stage_count{stage="load"} 2', prom)
+            with self.assertRaises(ValueError):
+                RECORDER.export(Path(tmp) / "x", "csv")
+
+    def test_log_records_carry_span_id(self):
+        record = logging.LogRecord("ml_autopipeline.test", logging.INFO, __file__, 1, "hello", None, None)
+        with span("stage") as span_id:
+            SpanFilter().filter(record)
+        out = json.loads(JsonFormatter().format(record))
+        self.assertEqual(out["span_id"], span_id)
+        self.assertEqual(out["trace_id"], RECORDER.trace_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
+from contextlib import contextmanager
+from unittest import mock
+
 import pandas as pd
 from ml_autopipeline import train_models
+from ml_pipeline import training
 
 class TestTraining(unittest.TestCase):
     def setUp(self):
@@ -18,5 +22,109 @@ class TestTraining(unittest.TestCase):
         self.assertIn('Logistic Regression', results)
         self.assertIn('Accuracy', results['Logistic Regression'])
 
+    def test_parallel_executors_match_serial(self):
+        X = pd.DataFrame({'feat1': list(range(20)), 'feat2': [i % 7 for i in range(20)]})
+        y = pd.Series([0, 1] * 10)
+        serial = train_models(X, y, extended_metrics=True)
+        for executor in ("thread", "process"):
+            parallel = train_models(X, y, extended_metrics=True, n_jobs=4, executor=executor)
+            self.assertEqual(list(parallel), list(serial))
+            self.assertEqual(parallel, serial)
+
+    def test_thread_limits_follow_the_core_budget(self):
+        X = pd.DataFrame({'feat1': list(range(20)), 'feat2': [i % 7 for i in range(20)]})
+        y = pd.Series([0, 1] * 10)
+        calls = []
+
+        @contextmanager
+        def record(limits):
+            calls.append(limits)
+            yield
+
+        with mock.patch.object(training, 'threadpool_limits', record):
+            train_models(X, y)
+            self.assertEqual(calls, [])  # unsplit budget: BLAS keeps its own threads
+            train_models(X, y, n_jobs=6, executor='thread')
+            self.assertEqual(calls, [2])  # one process-wide cap around the pool, not one per fit
+
+    def test_svm_backend_selection(self):
+        X = pd.DataFrame({'feat1': list(range(60)), 'feat2': [i % 7 for i in range(60)]})
+        y = pd.Series([0, 1, 2] * 20)
+        for backend in ("linear", "sgd", "nystroem", "rbf_sampler"):
+            results = train_models(X, y, svm_backend=backend, svm_n_components=20, extended_metrics=True)
+            self.assertIn('Accuracy', results['SVM'])
+            # multiclass extended metrics get calibrated probabilities
+            self.assertIn('roc_auc_ovr_weighted', results['SVM'])
+        # auto mode: 42 training rows exceed the exact threshold -> kernel approximation
+        with self.assertLogs('ml_autopipeline.training', level='INFO') as logs:
+            train_models(X, y, svm_exact_max_rows=10, svm_n_components=20)
+        self.assertTrue(any('Nystroem' in line for line in logs.output))
+        with self.assertRaises(ValueError):
+            train_models(X, y, svm_backend='quantum')
+
+    def test_time_budget(self):
+        X = pd.DataFrame({'feat1': list(range(40)), 'feat2': [i % 7 for i in range(40)]})
+        y = pd.Series([0, 1] * 20)
+        serial = train_models(X, y)
+        budgeted, models = train_models(X, y, time_budget=60, return_models=True)
+        # Checkpointed fits hand back models with the requested settings, not the step sizes
+        lr, rf = models['Logistic Regression'][-1], models['Random Forest']
+        self.assertEqual((lr.max_iter, lr.warm_start), (2000, False))
+        self.assertEqual((rf.n_estimators, rf.warm_start), (100, False))
+        self.assertEqual(budgeted['Random Forest'], serial['Random Forest'])
+        self.assertEqual(budgeted['SVM'], serial['SVM'])
+        self.assertAlmostEqual(budgeted['Logistic Regression']['Accuracy'], serial['Logistic Regression']['Accuracy'])
+        timed_out = train_models(X, y, model_time_budget={'SVM': 0})
+        self.assertEqual(timed_out['SVM']['status'], 'timed_out')
+        self.assertNotIn('status', timed_out['Random Forest'])
+
+    def test_checkpoints_ship_the_best_model(self):
+        from sklearn.ensemble import RandomForestClassifier
+        from ml_pipeline import budget
+
+        class Conn:
+            def __init__(self):
+                self.sent = []
+
+            def send(self, msg):
+                self.sent.append(msg)
+
+            def close(self):
+                pass
+
+        X = pd.DataFrame({'feat1': list(range(40)), 'feat2': [i % 7 for i in range(40)]})
+        y = pd.Series([0, 1] * 20)
+        scores = iter([0.5, 0.7, 0.6, 0.7, 0.9])
+        evaluate = lambda model, X_test, y_test, extended: {'F1 Score': next(scores, 0.0)}
+        conn = Conn()
+        rf = RandomForestClassifier(n_estimators=5, random_state=0)
+        budget._worker(conn, rf, X, y, X, y, evaluate, False, None, True)
+        checkpoints = [msg for msg in conn.sent if msg[0] == 'checkpoint']
+        # Only improvements are sent, each with a model that refits with the requested settings
+        self.assertEqual([m['F1 Score'] for _, m, _ in checkpoints], [0.5, 0.7, 0.9])
+        label, model = checkpoints[-1][2]
+        self.assertEqual(label, 'n_estimators=5')
+        self.assertEqual((model.n_estimators, model.warm_start), (5, False))
+
+    def test_imbalance_strategies(self):
+        X = pd.DataFrame({'feat1': list(range(100)), 'feat2': [i % 7 for i in range(100)]})
+        y = pd.Series([1 if i % 10 == 0 else 0 for i in range(100)])
+        results, models = train_models(X, y, imbalance_strategy='class_weight', svm_backend='nystroem',
+                                       svm_n_components=20, return_models=True)
+        weights = [v for m in models.values() for k, v in m.get_params().items() if k.endswith('class_weight')]
+        self.assertEqual(weights, ['balanced'] * 3)
+        with self.assertLogs('ml_autopipeline.training', level='INFO') as logs:
+            train_models(X, y, imbalance_strategy='undersample')
+        # 70 training rows, 7 of them minority -> 14 rows after undersampling
+        self.assertTrue(any('undersample: training set 14 rows' in line for line in logs.output))
+        bagged = train_models(X, y, imbalance_strategy='balanced_bagging')
+        self.assertIn('F1 Score', bagged['Random Forest'])
+        with self.assertRaises(ValueError):
+            train_models(X, y, imbalance_strategy='magic')
+
+    def test_unknown_executor_rejected(self):
+        with self.assertRaises(ValueError):
+            train_models(self.X, self.y, n_jobs=2, executor="gpu")
+
 if __name__ == "__main__":
     unittest.main()